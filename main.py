@@ -15,11 +15,36 @@ def setup_data():
 
     print("Setting up sample data...")
     loader = DataLoader()
-    loader.load_all_data()
+    try:
+        loader.load_all_data()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
     print("Data setup complete!")
 
+    # Answers built from documents that just changed are rebuilt
+    from src.config import Config
+    if Config.FAQ_ENABLED and os.path.exists(Config.FAQ_STORE_PATH):
+        from src.api.support_agent import SupportAgent
+        from src.cache import FaqBuilder
+
+        agent = SupportAgent()
+        FaqBuilder(agent, agent.faq_store).refresh()
+
+def build_faq():
+    """Precompute answers for the suggested and demo questions"""
+    from src.api.support_agent import SupportAgent
+    from src.cache import FaqStore, FaqBuilder, canonical_questions
+
+    store = FaqStore()
+    agent = SupportAgent(faq_store=store)
+    questions = canonical_questions()
+    print(f"Building FAQ answers for {len(questions)} questions...")
+    built = FaqBuilder(agent, store).build(questions)
+    print(f"Stored {built} answers in {store.path}")
+
 def run_server():
-    """Run the FastAPI server"""
+    """Run the FastAPI server with auto-reload for development"""
     import uvicorn
     from src.config import Config
 
@@ -34,6 +59,84 @@ def run_server():
         reload=True
     )
 
+def serve(args):
+    """Run the production server: several workers, no reload"""
+    from src.config import Config
+
+    workers = args.workers or Config.API_WORKERS
+    if workers > 1 and Config.STATE_BACKEND == "memory":
+        print("Warning: STATE_BACKEND=memory keeps sessions per worker; use sqlite or redis to share them")
+
+    print(f"Serving Smart Customer Support Agent with {workers} {args.server} workers "
+          f"on http://{Config.API_HOST}:{Config.API_PORT}")
+
+    if args.server == 'gunicorn':
+        # gunicorn manages worker processes; each worker runs the app lifespan
+        os.execvp("gunicorn", [
+            "gunicorn", "src.api.main:app",
+            "--worker-class", "uvicorn.workers.UvicornWorker",
+            "--workers", str(workers),
+            "--bind", f"{Config.API_HOST}:{Config.API_PORT}",
+            "--timeout", "120",
+        ])
+
+    import uvicorn
+    uvicorn.run(
+        "src.api.main:app",
+        host=Config.API_HOST,
+        port=Config.API_PORT,
+        workers=workers,
+        reload=False,
+        log_level="info"
+    )
+
+def run_batch(args):
+    """Answer a JSONL file of messages, writing NDJSON results"""
+    import json
+    import time
+    from src.api.support_agent import SupportAgent, parse_batch_line
+
+    source = sys.stdin if args.input == '-' else open(args.input)
+    sink = sys.stdout if not args.output else open(args.output, "w")
+    items = (item for item in map(parse_batch_line, source) if item is not None)
+
+    agent = SupportAgent()
+    answered = failed = 0
+    start = time.perf_counter()
+    try:
+        for result in agent.process_batch(items, concurrency=args.concurrency):
+            sink.write(json.dumps(result, default=str) + "\n")
+            if "error" in result:
+                failed += 1
+            else:
+                answered += 1
+    finally:
+        agent.flush()
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Answered {answered} messages ({failed} failed) in {elapsed:.1f}s", file=sys.stderr)
+
+def export_analytics(args):
+    """Export the conversation turns saved in TURN_STORE_DIR"""
+    from src.config import Config
+    from src.analytics import TurnStore
+
+    if not Config.TURN_STORE_DIR:
+        print("TURN_STORE_DIR is not set; turns are only kept in memory by the server")
+        sys.exit(1)
+
+    output = args.output or "turns.csv"
+    try:
+        rows = TurnStore(directory=Config.TURN_STORE_DIR).export(output)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"✅ Exported {rows} turns to {output}")
+
 def run_tests():
     """Run test queries"""
     from src.data import DataLoader
@@ -53,22 +156,123 @@ def run_tests():
         print(f"\n{'='*50}")
         loader.search_test(query)
 
+def run_benchmark(args):
+    """Run the load-testing benchmark against stub or live backends"""
+    import json
+    from src.benchmark import BenchmarkRunner, save_results, compare_results, print_report, parse_mix
+
+    runner = BenchmarkRunner(
+        target=args.target,
+        concurrency=args.concurrency or 4,
+        total_requests=args.requests,
+        mix=parse_mix(args.mix) if args.mix else None,
+        llm_latency=args.llm_latency,
+        search_latency=args.search_latency,
+        jitter=args.jitter,
+        seed=args.seed,
+        url=args.url,
+        llm_backend=args.llm_backend
+    )
+
+    print("Running benchmark...")
+    results = runner.run()
+    print_report(results)
+
+    output = save_results(results, args.output)
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print(f"\nCompared to {args.compare}:")
+        for line in compare_results(baseline, results):
+            print(line)
+
+def run_evaluation(args):
+    """Evaluate retrieval configurations for quality and latency"""
+    import json
+    from src.evaluation import RetrievalEvaluator, DEFAULT_CONFIGS, print_summary
+
+    search_client = None
+    if args.backend == 'stub':
+        from src.benchmark import StubSearchClient
+        search_client = StubSearchClient()
+
+    configs = DEFAULT_CONFIGS
+    if args.configs:
+        with open(args.configs) as f:
+            configs = json.load(f)
+
+    evaluator = RetrievalEvaluator(search_client=search_client, k=args.k, workers=args.concurrency or 4)
+    print(f"Evaluating {len(configs)} retrieval configurations over {len(evaluator.eval_set)} queries...")
+    report = evaluator.run(configs, repeats=args.repeats)
+    print_summary(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.output}")
+
 def main():
     parser = argparse.ArgumentParser(description="Smart Customer Support Agent")
     parser.add_argument(
         'command',
-        choices=['setup', 'run', 'test'],
+        choices=['setup', 'run', 'serve', 'test', 'benchmark', 'evaluate', 'build-faq', 'batch', 'export-analytics'],
         help='Command to execute'
     )
 
+    server = parser.add_argument_group('serve options')
+    server.add_argument('--workers', type=int, default=None, help='Worker processes (default: API_WORKERS)')
+    server.add_argument('--server', choices=['uvicorn', 'gunicorn'], default='uvicorn',
+                        help='Process manager; gunicorn must be installed separately')
+
+    bench = parser.add_argument_group('benchmark options')
+    bench.add_argument('--target', choices=['agent', 'app', 'http'], default='agent',
+                       help='Drive SupportAgent directly, the in-process /chat app, or a live server')
+    bench.add_argument('--url', default=None, help='Base URL for --target http')
+    bench.add_argument('--concurrency', type=int, default=None,
+                       help='Concurrent clients, default 4 (also used by evaluate and batch)')
+    bench.add_argument('--requests', type=int, default=200)
+    bench.add_argument('--mix', default=None, help="Query mix, e.g. 'demo=0.5,suggested=0.3,tickets=0.2'")
+    bench.add_argument('--llm-latency', type=float, default=0.0, help='Stub LLM latency in seconds')
+    bench.add_argument('--llm-backend', default='stub',
+                       help='LLM backend for agent/app targets: stub (mock with injected latency) or any LLM_BACKEND name')
+    bench.add_argument('--search-latency', type=float, default=0.0, help='Stub search latency in seconds')
+    bench.add_argument('--jitter', type=float, default=0.0, help='Uniform latency jitter in seconds')
+    bench.add_argument('--seed', type=int, default=42)
+    bench.add_argument('--output', default=None,
+                       help='Path for the JSON results (also used by evaluate, batch and export-analytics)')
+    bench.add_argument('--compare', default=None, help='Previous results JSON to compare against')
+
+    evaluate = parser.add_argument_group('evaluate options')
+    evaluate.add_argument('--configs', default=None, help='JSON file with a list of retrieval configurations')
+    evaluate.add_argument('--k', type=int, default=5, help='Cutoff for recall@k and nDCG@k')
+    evaluate.add_argument('--repeats', type=int, default=1, help='Times each query runs per configuration')
+    evaluate.add_argument('--backend', choices=['elastic', 'stub'], default='elastic')
+
+    batch = parser.add_argument_group('batch options')
+    batch.add_argument('--input', default='-', help="JSONL file of messages to answer, or '-' for stdin")
+
     args = parser.parse_args()
 
     if args.command == 'setup':
         setup_data()
     elif args.command == 'run':
         run_server()
+    elif args.command == 'serve':
+        serve(args)
     elif args.command == 'test':
         run_tests()
+    elif args.command == 'benchmark':
+        run_benchmark(args)
+    elif args.command == 'evaluate':
+        run_evaluation(args)
+    elif args.command == 'build-faq':
+        build_faq()
+    elif args.command == 'batch':
+        run_batch(args)
+    elif args.command == 'export-analytics':
+        export_analytics(args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,3 +1,5 @@
-from .gemini_mock import GeminiClient
+from .llm_client import LLMClient
+from .conversation import ConversationMemory
+from .backends import LLMBackend, create_backend, register_backend
 
-__all__ = ["GeminiClient"]
\ No newline at end of file
+__all__ = ["LLMClient", "ConversationMemory", "LLMBackend", "create_backend", "register_backend"]
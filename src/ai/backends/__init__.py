@@ -0,0 +1,37 @@
+"""
+Registry of LLM backends, selected with LLM_BACKEND. Backend modules are
+imported only when created so unused SDKs never load.
+"""
+import importlib
+from typing import Callable, Dict, Union
+from .base import LLMBackend
+from ...config import Config
+
+BACKENDS: Dict[str, Union[str, Callable[[], LLMBackend]]] = {
+    "mock": "mock:MockBackend",
+    "vertex": "vertex:VertexBackend",
+    "vertex_rest": "vertex_rest:VertexRestBackend",
+    "openai": "openai_compat:OpenAICompatibleBackend",
+}
+
+
+def register_backend(name: str, factory: Callable[[], LLMBackend]):
+    """Make a custom backend selectable by name"""
+    BACKENDS[name] = factory
+
+
+def create_backend(name: str = None) -> LLMBackend:
+    """Build the backend selected by LLM_BACKEND"""
+    name = (name or Config.LLM_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM_BACKEND '{name}', expected one of {sorted(BACKENDS)}")
+
+    factory = BACKENDS[name]
+    if isinstance(factory, str):
+        module_name, class_name = factory.split(":")
+        module = importlib.import_module(f".{module_name}", __name__)
+        factory = getattr(module, class_name)
+    return factory()
+
+
+__all__ = ["LLMBackend", "BACKENDS", "register_backend", "create_backend"]
@@ -0,0 +1,46 @@
+"""
+Transport interface shared by all LLM backends
+"""
+from typing import List, Dict, Any, Iterator
+
+
+class LLMBackend:
+    """
+    Thin transport to a generation and embedding service. Prompting, JSON
+    parsing, fallbacks and circuit breaking live in LLMClient; a backend
+    only moves text and vectors.
+    """
+    name = "base"
+    breaker_name = "llm"
+    # embed() accepts up to max_batch_size texts in one request
+    supports_batch = False
+    max_batch_size = 1
+    # stream() yields partial text as it is generated
+    supports_stream = False
+
+    def available(self) -> bool:
+        """Whether the backend is configured and reachable enough to try"""
+        return True
+
+    def generate(self, prompt: str, temperature: float = 0.2, max_tokens: int = 1024, **hints) -> str:
+        """
+        Return the completion for a prompt. hints carry the task ("intent",
+        "response" or "summary") and the raw query; remote backends ignore them.
+        """
+        raise NotImplementedError
+
+    def stream(self, prompt: str, temperature: float = 0.2, max_tokens: int = 1024, **hints) -> Iterator[str]:
+        """Yield the completion in chunks; backends without streaming yield it whole"""
+        yield self.generate(prompt, temperature, max_tokens, **hints)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """Return one 768-dimensional embedding per text"""
+        raise NotImplementedError
+
+    def capabilities(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "batch": self.supports_batch,
+            "max_batch_size": self.max_batch_size,
+            "stream": self.supports_stream
+        }
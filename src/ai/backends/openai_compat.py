@@ -0,0 +1,69 @@
+"""
+Any server speaking the OpenAI chat completions and embeddings API, such as
+a local llama.cpp, vLLM or Ollama instance. The embedding model must return
+768 dimensions to match the index mappings.
+"""
+import json
+from typing import List, Dict, Any, Iterator
+from .base import LLMBackend
+from ...config import Config
+from ...reliability import timeout_for
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    name = "openai"
+    supports_batch = True
+    max_batch_size = 64
+    supports_stream = True
+
+    def __init__(self):
+        self.base_url = Config.LLM_BASE_URL.rstrip("/")
+        self.model = Config.LLM_MODEL
+        self.embedding_model = Config.LLM_EMBEDDING_MODEL
+        self._session = None
+
+    def available(self) -> bool:
+        return bool(self.base_url)
+
+    def _post(self, path: str, payload: Dict[str, Any], stream: bool = False):
+        import requests
+
+        if self._session is None:
+            self._session = requests.Session()
+            if Config.LLM_API_KEY:
+                self._session.headers["Authorization"] = f"Bearer {Config.LLM_API_KEY}"
+        response = self._session.post(f"{self.base_url}{path}", json=payload,
+                                      timeout=timeout_for(Config.LLM_TIMEOUT), stream=stream)
+        if response.status_code != 200:
+            raise requests.HTTPError(f"{response.status_code} - {response.text}")
+        return response
+
+    def _payload(self, prompt: str, temperature: float, max_tokens: int, stream: bool) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": stream
+        }
+
+    def generate(self, prompt: str, temperature: float = 0.2, max_tokens: int = 1024, **hints) -> str:
+        response = self._post("/chat/completions", self._payload(prompt, temperature, max_tokens, False))
+        return response.json()["choices"][0]["message"]["content"] or ""
+
+    def stream(self, prompt: str, temperature: float = 0.2, max_tokens: int = 1024, **hints) -> Iterator[str]:
+        response = self._post("/chat/completions", self._payload(prompt, temperature, max_tokens, True), stream=True)
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            delta = json.loads(data)["choices"][0].get("delta", {})
+            if delta.get("content"):
+                yield delta["content"]
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        response = self._post("/embeddings", {"model": self.embedding_model, "input": texts})
+        data = sorted(response.json()["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
@@ -0,0 +1,73 @@
+"""
+Vertex AI through the google-cloud-aiplatform SDK
+"""
+import threading
+from typing import List, Iterator
+from .base import LLMBackend
+from ...config import Config
+
+
+class VertexBackend(LLMBackend):
+    name = "vertex"
+    breaker_name = "vertex_ai"
+    supports_batch = True
+    max_batch_size = 100
+    supports_stream = True
+
+    def __init__(self):
+        # The SDK is imported and the models loaded on first use, so
+        # constructing the backend (and importing this module) stays cheap
+        self._available = None
+        self._init_lock = threading.Lock()
+        self.model = None
+        self.embedding_model = None
+
+    def available(self) -> bool:
+        if self._available is None:
+            with self._init_lock:
+                if self._available is None:
+                    self._available = self._init_vertex()
+        return self._available
+
+    def _init_vertex(self) -> bool:
+        """Import the Vertex AI SDK and load the generation and embedding models"""
+        try:
+            import vertexai
+            try:
+                from vertexai.generative_models import GenerativeModel
+                from vertexai.language_models import TextEmbeddingModel
+            except ImportError:
+                from vertexai.preview.generative_models import GenerativeModel
+                from vertexai.preview.language_models import TextEmbeddingModel
+        except ImportError:
+            print("❌ Vertex AI SDK not available, using fallbacks")
+            return False
+
+        try:
+            vertexai.init(project=Config.GOOGLE_CLOUD_PROJECT, location=Config.VERTEX_LOCATION)
+            self.model = GenerativeModel(Config.GEMINI_MODEL)
+            self.embedding_model = TextEmbeddingModel.from_pretrained(Config.GEMINI_EMBEDDING_MODEL)
+            print("✅ Vertex AI initialized successfully!")
+            return True
+        except Exception as e:
+            print(f"❌ Vertex AI initialization failed: {e}")
+            return False
+
+    def _config(self, temperature: float, max_tokens: int):
+        return {"temperature": temperature, "max_output_tokens": max_tokens}
+
+    def generate(self, prompt: str, temperature: float = 0.2, max_tokens: int = 1024, **hints) -> str:
+        response = self.model.generate_content(prompt, generation_config=self._config(temperature, max_tokens))
+        return response.text
+
+    def stream(self, prompt: str, temperature: float = 0.2, max_tokens: int = 1024, **hints) -> Iterator[str]:
+        responses = self.model.generate_content(
+            prompt,
+            generation_config=self._config(temperature, max_tokens),
+            stream=True
+        )
+        for chunk in responses:
+            yield chunk.text
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [embedding.values for embedding in self.embedding_model.get_embeddings(texts)]
@@ -0,0 +1,132 @@
+"""
+Vertex AI over its REST API, authenticated with the gcloud CLI
+"""
+import json
+import subprocess
+import threading
+import time
+from typing import List, Dict, Any, Iterator, Optional
+from .base import LLMBackend
+from ...config import Config
+from ...reliability import timeout_for
+
+# Access tokens are valid for an hour; refresh well before that
+TOKEN_LIFETIME = 45 * 60
+# How long gcloud may take, and how long to wait before retrying after it fails
+TOKEN_COMMAND_TIMEOUT = 10.0
+TOKEN_FAILURE_BACKOFF = 30.0
+
+
+class VertexRestBackend(LLMBackend):
+    name = "vertex_rest"
+    breaker_name = "vertex_ai"
+    supports_batch = True
+    max_batch_size = 100
+    supports_stream = True
+
+    def __init__(self):
+        self.project_id = Config.GOOGLE_CLOUD_PROJECT
+        self.location = Config.VERTEX_LOCATION
+        self.model_id = Config.GEMINI_MODEL
+        self.embedding_model_id = Config.GEMINI_EMBEDDING_MODEL
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+        self._token_retry_at = 0.0
+        self._token_lock = threading.Lock()
+        self._session = None
+
+    def _model_url(self, model_id: str, method: str) -> str:
+        return (f"https://{self.location}-aiplatform.googleapis.com/v1/projects/{self.project_id}"
+                f"/locations/{self.location}/publishers/google/models/{model_id}:{method}")
+
+    def _get_access_token(self) -> Optional[str]:
+        """
+        Get an access token using gcloud, cached instead of spawning a process
+        per call. A failure is cached too, for TOKEN_FAILURE_BACKOFF seconds.
+        """
+        with self._token_lock:
+            now = time.monotonic()
+            if self._token and now < self._token_expires:
+                return self._token
+            if now < self._token_retry_at:
+                return None
+            timeout = timeout_for(TOKEN_COMMAND_TIMEOUT)
+            try:
+                result = subprocess.run(
+                    ["gcloud", "auth", "application-default", "print-access-token"],
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                    timeout=timeout
+                )
+                self._token = result.stdout.strip() or None
+                self._token_expires = time.monotonic() + TOKEN_LIFETIME
+            except subprocess.TimeoutExpired as e:
+                print(f"Error getting access token: {e}")
+                self._token = None
+                # Cut short by the request's deadline rather than gcloud hanging: retry on the next call
+                if timeout >= TOKEN_COMMAND_TIMEOUT:
+                    self._token_retry_at = time.monotonic() + TOKEN_FAILURE_BACKOFF
+            except Exception as e:
+                print(f"Error getting access token: {e}")
+                self._token = None
+                self._token_retry_at = time.monotonic() + TOKEN_FAILURE_BACKOFF
+            return self._token
+
+    def available(self) -> bool:
+        return bool(self.project_id) and self._get_access_token() is not None
+
+    def _post(self, url: str, payload: Dict[str, Any], stream: bool = False):
+        """POST with a pooled session; any non-200 status raises"""
+        import requests
+
+        if self._session is None:
+            self._session = requests.Session()
+        response = self._session.post(
+            url,
+            headers={"Authorization": f"Bearer {self._get_access_token()}"},
+            json=payload,
+            timeout=timeout_for(Config.LLM_TIMEOUT),
+            stream=stream
+        )
+        if response.status_code != 200:
+            raise requests.HTTPError(f"{response.status_code} - {response.text}")
+        return response
+
+    def _payload(self, prompt: str, temperature: float, max_tokens: int) -> Dict[str, Any]:
+        return {
+            "contents": [
+                {
+                    "role": "user",
+                    "parts": [{"text": prompt}]
+                }
+            ],
+            "generationConfig": {
+                "temperature": temperature,
+                "topP": 0.95,
+                "topK": 20,
+                "maxOutputTokens": max_tokens
+            }
+        }
+
+    @staticmethod
+    def _candidate_text(result: Dict[str, Any]) -> str:
+        parts = result["candidates"][0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    def generate(self, prompt: str, temperature: float = 0.2, max_tokens: int = 1024, **hints) -> str:
+        response = self._post(self._model_url(self.model_id, "generateContent"),
+                              self._payload(prompt, temperature, max_tokens))
+        return self._candidate_text(response.json())
+
+    def stream(self, prompt: str, temperature: float = 0.2, max_tokens: int = 1024, **hints) -> Iterator[str]:
+        response = self._post(self._model_url(self.model_id, "streamGenerateContent") + "?alt=sse",
+                              self._payload(prompt, temperature, max_tokens), stream=True)
+        for line in response.iter_lines(decode_unicode=True):
+            if line and line.startswith("data:"):
+                yield self._candidate_text(json.loads(line[5:]))
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        response = self._post(self._model_url(self.embedding_model_id, "predict"),
+                              {"instances": [{"content": text} for text in texts]})
+        return [prediction["embeddings"]["values"] for prediction in response.json()["predictions"]]
@@ -0,0 +1,101 @@
+"""
+Multi-turn context for response generation: a rolling summary per session
+plus the last few turns, within a fixed token budget. The summary is folded
+forward in the background after each turn, so building the context costs
+the same however long a conversation gets.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Set
+from ..config import Config
+from ..monitoring import log_prefix
+from .prompt_builder import estimate_tokens, truncate_to_tokens
+
+
+class ConversationMemory:
+    def __init__(self,
+                 state,
+                 ai_client,
+                 recent_turns: int = None,
+                 context_tokens: int = None,
+                 summary_tokens: int = None,
+                 workers: int = 2):
+        self.state = state
+        self.ai_client = ai_client
+        self.recent_turns = Config.CONVERSATION_RECENT_TURNS if recent_turns is None else recent_turns
+        self.context_tokens = context_tokens or Config.CONVERSATION_CONTEXT_TOKENS
+        self.summary_tokens = min(summary_tokens or Config.CONVERSATION_SUMMARY_TOKENS, self.context_tokens // 2)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="conversation-summary")
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"summary:{session_id}"
+
+    def summary(self, session_id: str) -> Dict[str, Any]:
+        """The session's summary record: text, turns folded in and the last folded turn's timestamp"""
+        return self.state.cache_get(self._key(session_id)) or {"text": "", "turns": 0, "through": ""}
+
+    def context(self, session_id: str) -> str:
+        """Summary and recent turns to send with the next question; empty for a new session"""
+        record = self.summary(session_id)
+        # Turns already folded into the summary are not repeated
+        recent = [turn for turn in self.state.get_recent(session_id, self.recent_turns)
+                  if str(turn.get("timestamp", "")) > record["through"]]
+        if not record["text"] and not recent:
+            return ""
+
+        summary = f"Summary: {record['text']}" if record["text"] else ""
+        remaining = self.context_tokens - estimate_tokens(summary)
+        # Newest turns first, each answer capped so one long reply cannot crowd out the rest
+        answer_tokens = max(32, remaining // max(len(recent), 1) - 32)
+        lines: List[str] = []
+        for turn in reversed(recent):
+            answer = (turn.get("response") or {}).get("response", "")
+            text = f"Customer: {turn.get('user_query', '')}\nAgent: {truncate_to_tokens(answer, answer_tokens)}"
+            cost = estimate_tokens(text) + 1
+            if cost > remaining:
+                break
+            lines.insert(0, text)
+            remaining -= cost
+        return "\n".join(part for part in [summary] + lines if part)
+
+    def schedule(self, session_id: str):
+        """Update the session's summary in the background; one update per session at a time"""
+        with self._lock:
+            if session_id in self._pending:
+                return
+            self._pending.add(session_id)
+        self._pool.submit(self._run_update, session_id)
+
+    def _run_update(self, session_id: str):
+        try:
+            self.update(session_id)
+        except Exception as e:
+            print(f"{log_prefix()}Conversation summary for {session_id} failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(session_id)
+
+    def update(self, session_id: str) -> bool:
+        """Fold turns older than the recent window into the summary; returns whether it changed"""
+        record = self.summary(session_id)
+        unsummarized = [turn for turn in self.state.get_history(session_id)
+                        if str(turn.get("timestamp", "")) > record["through"]]
+        fold = unsummarized[:max(len(unsummarized) - self.recent_turns, 0)]
+        if not fold:
+            return False
+
+        turns = [(turn.get("user_query", ""), (turn.get("response") or {}).get("response", "")) for turn in fold]
+        text = self.ai_client.summarize_conversation(record["text"], turns, self.summary_tokens)
+        self.state.cache_set(self._key(session_id), {
+            "text": text,
+            "turns": record["turns"] + len(fold),
+            "through": str(fold[-1].get("timestamp", ""))
+        }, Config.CONVERSATION_SUMMARY_TTL)
+        return True
+
+    def close(self):
+        """Finish the scheduled updates, e.g. on worker shutdown"""
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,349 @@
+"""
+LLM pipeline shared by every backend: prompts, JSON parsing, fallbacks,
+circuit breaking and tracing. Backends only move text and vectors.
+"""
+import time
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from ..config import Config
+from ..reliability import get_breaker, CircuitOpenError, budget_below
+from ..monitoring import record_fallback, record_prompt_tokens, traced, current_span, log_prefix
+from ..cache import EmbeddingCache
+from .prompt_builder import PromptBuilder, extractive_summary, truncate_to_tokens
+from .structured_output import IncrementalJSONParser, validate_output
+from .backends import LLMBackend, create_backend
+from .backends.mock import canned_intent, canned_response, deterministic_embedding
+
+INTENT_PROMPT = """
+Analyze this customer support query and extract:
+1. Intent category (billing, technical, account, feature_request, general)
+2. Urgency level (low, medium, high, critical)
+3. Key entities mentioned (product names, error codes, etc.)
+4. Emotional tone (frustrated, neutral, positive)
+5. Confidence that the intent category is right (0.0 to 1.0)
+
+Query: "{query}"
+
+Return only valid JSON:
+{{
+    "intent": "category",
+    "urgency": "level",
+    "entities": ["entity1", "entity2"],
+    "tone": "emotional_state",
+    "keywords": ["key1", "key2"],
+    "confidence": 0.0
+}}
+"""
+
+SUMMARY_PROMPT = """
+You keep a running summary of a customer support conversation for the agent
+answering the next question. Update the summary with the new exchanges.
+Keep the customer's problem, account details they gave, what was already
+tried or suggested, and anything still unresolved. Drop greetings and
+repetition. Use at most {words} words of plain text.
+
+Current summary: {summary}
+
+New exchanges:
+{turns}
+
+Updated summary:
+"""
+
+ESCALATION_RESPONSE = {
+    "response": "I understand you need help. Let me connect you with a human agent who can assist you better.",
+    "confidence": 0.1,
+    "suggested_actions": ["Contact human support"],
+    "escalate": True,
+    "follow_up_questions": []
+}
+
+
+class LLMClient:
+    def __init__(self, backend: LLMBackend = None):
+        self.backend = backend or create_backend()
+        self.breaker = get_breaker(self.backend.breaker_name)
+        self.prompt_builder = PromptBuilder()
+        # Faster paths are used only where the backend supports them
+        self.batch_enabled = Config.LLM_BATCH_EMBEDDINGS and self.backend.supports_batch
+        self.stream_enabled = Config.LLM_STREAMING and self.backend.supports_stream
+        # Query vectors, pre-filled at startup for suggested and demo questions
+        self.embedding_cache = EmbeddingCache(
+            name="embedding",
+            max_size=Config.EMBEDDING_CACHE_SIZE,
+            ttl=Config.EMBEDDING_CACHE_TTL
+        )
+
+    def describe(self) -> Dict[str, Any]:
+        """Backend name and which fast paths are active, for reports"""
+        info = self.backend.capabilities()
+        info["batch_enabled"] = self.batch_enabled
+        info["stream_enabled"] = self.stream_enabled
+        return info
+
+    def stream_text(self, prompt: str, temperature: float = 0.2, **hints) -> Iterator[str]:
+        """Yield completion chunks, accounting the whole stream against the breaker"""
+        if not self.breaker.allow_request():
+            raise CircuitOpenError(self.breaker.name, self.breaker.retry_after())
+
+        start = time.perf_counter()
+        try:
+            for chunk in self.backend.stream(prompt, temperature, **hints):
+                yield chunk
+        except GeneratorExit:
+            # The consumer stopped early, e.g. once it had the fields it needed
+            self.breaker.record_success(time.perf_counter() - start)
+            raise
+        except Exception:
+            self.breaker.record_failure(time.perf_counter() - start)
+            raise
+        self.breaker.record_success(time.perf_counter() - start)
+
+    def complete_json(self, prompt: str, temperature: float = 0.2, **hints) -> IncrementalJSONParser:
+        """
+        Run a prompt that should answer with a JSON object. When streaming,
+        reading stops as soon as the object closes, so trailing text is
+        never waited for.
+        """
+        parser = IncrementalJSONParser()
+        if not self.stream_enabled:
+            parser.feed(self.breaker.call(self.backend.generate, prompt, temperature, **hints))
+            return parser
+
+        stream = self.stream_text(prompt, temperature, **hints)
+        try:
+            for chunk in stream:
+                if parser.feed(chunk):
+                    break
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            if not parser.started:
+                raise
+            # Keep what arrived; result() closes the truncated object
+            print(f"{log_prefix()}Stream interrupted, keeping partial output: {e}")
+        finally:
+            stream.close()
+        return parser
+
+    def _structured(self, parser: IncrementalJSONParser, schema_name: str) -> Optional[Dict[str, Any]]:
+        """Validate the parsed object, counting outputs that needed repair"""
+        from . import schemas
+
+        result = validate_output(parser.result(), getattr(schemas, schema_name))
+        if result is not None and parser.repaired:
+            record_fallback("json_repair")
+            if not parser.complete:
+                result["truncated"] = True
+        return result
+
+    @traced("LLMClient.generate_embedding")
+    def generate_embedding(self, text: str) -> List[float]:
+        """Generate an embedding, falling back to a deterministic one"""
+        if not self.backend.available():
+            record_fallback("embedding")
+            return deterministic_embedding(text)
+
+        cached = self.embedding_cache.get(text)
+        if cached:
+            return cached["embedding"]
+
+        try:
+            embedding = self.breaker.call(self.backend.embed, [text])[0]
+        except CircuitOpenError:
+            record_fallback("embedding")
+            return deterministic_embedding(text)
+        except Exception as e:
+            print(f"{log_prefix()}Embedding generation error: {e}")
+            record_fallback("embedding")
+            return deterministic_embedding(text)
+        self.embedding_cache.put(text, {"embedding": embedding})
+        return embedding
+
+    @traced("LLMClient.batch_generate_embeddings")
+    def batch_generate_embeddings(self, texts: List[str], batch_size: int = None) -> List[List[float]]:
+        """Generate embeddings for many texts, in batched requests when supported"""
+        if not self.batch_enabled or not self.backend.available():
+            return [self.generate_embedding(text) for text in texts]
+
+        batch_size = min(batch_size or self.backend.max_batch_size, self.backend.max_batch_size)
+        embeddings = [None] * len(texts)
+        missing = []
+        for position, text in enumerate(texts):
+            cached = self.embedding_cache.get(text)
+            if cached:
+                embeddings[position] = cached["embedding"]
+            else:
+                missing.append(position)
+
+        for i in range(0, len(missing), batch_size):
+            positions = missing[i:i + batch_size]
+            batch = [texts[position] for position in positions]
+            try:
+                vectors = self.breaker.call(self.backend.embed, batch)
+            except Exception as e:
+                print(f"{log_prefix()}Batch embedding error: {e}")
+                record_fallback("embedding", len(batch))
+                vectors = [deterministic_embedding(text) for text in batch]
+            else:
+                for text, vector in zip(batch, vectors):
+                    self.embedding_cache.put(text, {"embedding": vector})
+            for position, vector in zip(positions, vectors):
+                embeddings[position] = vector
+
+        return embeddings
+
+    @traced("LLMClient.analyze_intent")
+    def analyze_intent(self, user_query: str) -> Dict[str, Any]:
+        """Analyze user intent and extract key information"""
+        current_span().set_attribute("llm_backend", self.backend.name)
+        if not self.backend.available() or self.breaker.is_open:
+            return self._fallback_intent(user_query)
+        if budget_below(Config.DEADLINE_INTENT_MIN_SECONDS):
+            # Leave the request's remaining time to retrieval and generation
+            current_span().set_attribute("deadline_fallback", True)
+            return self._fallback_intent(user_query)
+
+        try:
+            parser = self.complete_json(INTENT_PROMPT.format(query=user_query), 0.1, task="intent", query=user_query)
+        except Exception as e:
+            if not isinstance(e, CircuitOpenError):
+                print(f"{log_prefix()}Intent analysis error: {e}")
+            return self._fallback_intent(user_query)
+
+        parsed = self._structured(parser, "IntentResult")
+        if parsed is None:
+            return self._fallback_intent(user_query)
+        return parsed
+
+    def enhance_search_query(self, user_query: str, intent_data: Dict[str, Any]) -> str:
+        """Enhance search query based on intent analysis"""
+        keywords = intent_data.get("keywords", [])
+        entities = intent_data.get("entities", [])
+        intent = intent_data.get("intent", "general")
+
+        # Combine original query with extracted keywords and entities
+        enhanced_terms = [user_query] + keywords + entities + [intent]
+        return " ".join(set(enhanced_terms))
+
+    @traced("LLMClient.summarize_conversation")
+    def summarize_conversation(self,
+                               summary: str,
+                               turns: List[Tuple[str, str]],
+                               max_tokens: int = None) -> str:
+        """Fold (question, answer) turns into a running summary of at most max_tokens"""
+        max_tokens = max_tokens or Config.CONVERSATION_SUMMARY_TOKENS
+        if not self.backend.available() or self.breaker.is_open:
+            return extractive_summary(summary, turns, max_tokens)
+
+        prompt = SUMMARY_PROMPT.format(
+            words=max_tokens * 3 // 4,
+            summary=summary or "None yet",
+            turns="\n".join(f"Customer: {question}\nAgent: {answer}" for question, answer in turns)
+        )
+        try:
+            text = self.breaker.call(self.backend.generate, prompt, 0.1, task="summary",
+                                     summary=summary, turns=turns, max_tokens=max_tokens)
+        except Exception as e:
+            print(f"{log_prefix()}Conversation summary error: {e}")
+            record_fallback("summary")
+            return extractive_summary(summary, turns, max_tokens)
+        return truncate_to_tokens(text.strip(), max_tokens) or extractive_summary(summary, turns, max_tokens)
+
+    @traced("LLMClient.generate_response")
+    def generate_response(self,
+                          user_query: str,
+                          search_results: List[Dict[str, Any]],
+                          user_context: Dict[str, Any] = None,
+                          conversation: str = "") -> Dict[str, Any]:
+        """Generate contextual response using search results and the conversation so far"""
+        span = current_span()
+        span.set_attribute("llm_backend", self.backend.name)
+        if not self.backend.available() or self.breaker.is_open:
+            return self._degraded_response(user_query)
+        if budget_below(Config.DEADLINE_GENERATION_MIN_SECONDS):
+            span.set_attribute("deadline_fallback", True)
+            record_fallback("deadline_generation")
+            return self._degraded_response(user_query)
+
+        # Assemble the prompt within the context token budget
+        prompt_data = self.prompt_builder.build_response_prompt(user_query, search_results, user_context,
+                                                                conversation)
+        record_prompt_tokens(prompt_data["prompt_tokens"])
+        span.set_attribute("prompt_tokens", prompt_data["prompt_tokens"])
+
+        try:
+            parser = self.complete_json(prompt_data["prompt"], 0.3, task="response", query=user_query)
+        except CircuitOpenError:
+            return self._degraded_response(user_query)
+        except Exception as e:
+            print(f"{log_prefix()}Response generation error: {e}")
+            record_fallback("generation")
+            return dict(ESCALATION_RESPONSE)
+
+        result = self._structured(parser, "GeneratedResponse")
+        if result is None:
+            text = parser.raw_text
+            if parser.started or not text.strip():
+                record_fallback("generation")
+                return dict(ESCALATION_RESPONSE)
+            # Keep a plain-text answer rather than discarding the generation
+            result = {
+                "response": text.strip(),
+                "confidence": 0.8,
+                "suggested_actions": [],
+                "escalate": False,
+                "follow_up_questions": []
+            }
+        result["prompt_tokens"] = prompt_data["prompt_tokens"]
+        return result
+
+    def stream_response(self,
+                        user_query: str,
+                        search_results: List[Dict[str, Any]],
+                        user_context: Dict[str, Any] = None,
+                        conversation: str = "") -> Iterator[Dict[str, Any]]:
+        """
+        Yield the response fields as they complete, e.g. the answer text
+        before the follow-up questions, then the validated result.
+        """
+        if not self.stream_enabled or not self.backend.available() or self.breaker.is_open:
+            yield {"final": self.generate_response(user_query, search_results, user_context, conversation)}
+            return
+
+        prompt_data = self.prompt_builder.build_response_prompt(user_query, search_results, user_context,
+                                                                conversation)
+        record_prompt_tokens(prompt_data["prompt_tokens"])
+        parser = IncrementalJSONParser()
+        seen = 0
+        try:
+            for chunk in self.stream_text(prompt_data["prompt"], 0.3, task="response", query=user_query):
+                done = parser.feed(chunk)
+                fields = parser.completed_fields()
+                if len(fields) > seen:
+                    seen = len(fields)
+                    yield {"partial": fields}
+                if done:
+                    break
+        except CircuitOpenError:
+            yield {"final": self._degraded_response(user_query)}
+            return
+        except Exception as e:
+            print(f"{log_prefix()}Response streaming error: {e}")
+
+        result = self._structured(parser, "GeneratedResponse")
+        if result is None:
+            record_fallback("generation")
+            result = dict(ESCALATION_RESPONSE)
+        result["prompt_tokens"] = prompt_data["prompt_tokens"]
+        yield {"final": result}
+
+    def _fallback_intent(self, user_query: str) -> Dict[str, Any]:
+        """Keyword-based intent used when the model is unavailable or unparseable"""
+        record_fallback("intent")
+        return canned_intent(user_query)
+
+    def _degraded_response(self, user_query: str) -> Dict[str, Any]:
+        """Canned pattern-based answer used while the backend is unavailable"""
+        response = canned_response(user_query)
+        response["degraded"] = True
+        return response
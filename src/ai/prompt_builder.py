@@ -0,0 +1,176 @@
+"""
+Token-budgeted prompt assembly for response generation
+"""
+import re
+from typing import List, Dict, Any, Optional, Tuple
+from ..config import Config
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"[a-z0-9]+")
+# Passages whose body would get fewer tokens than this are left out
+MIN_PASSAGE_TOKENS = 16
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English prose)"""
+    return max(1, (len(text) + 3) // 4) if text else 0
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Truncate at a sentence boundary, falling back to a word boundary"""
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    kept = []
+    used = 0
+    for sentence in _SENTENCE_SPLIT.split(text):
+        cost = estimate_tokens(sentence) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(sentence)
+        used += cost
+    if kept:
+        return " ".join(kept)
+
+    # A single run-on sentence: cut on a word boundary instead
+    cut = text[:max_tokens * 4]
+    return cut[:cut.rfind(" ")].rstrip(",;:") + "..." if " " in cut else cut
+
+
+def extractive_summary(summary: str, turns: List[Tuple[str, str]], max_tokens: int) -> str:
+    """
+    Model-free rolling summary: each turn's question and the first sentence
+    of its answer, appended to the previous summary, keeping the newest
+    sentences that fit the budget
+    """
+    sentences = _SENTENCE_SPLIT.split(summary) if summary else []
+    for question, answer in turns:
+        first = _SENTENCE_SPLIT.split(answer.strip())[0] if answer.strip() else "no answer"
+        sentences.append(f"Customer asked: {question.strip().rstrip('?.')}?")
+        sentences.append(f"Agent: {first}")
+
+    kept = []
+    used = 0
+    for sentence in reversed(sentences):
+        cost = estimate_tokens(sentence) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(sentence)
+        used += cost
+    return " ".join(reversed(kept))
+
+
+def _shingles(text: str) -> set:
+    words = _WORD.findall(text.lower())
+    return {" ".join(words[i:i + 3]) for i in range(max(1, len(words) - 2))}
+
+
+# Static instructions are built once and sent before the per-request context,
+# so they form a stable prompt prefix
+RESPONSE_PREAMBLE = """You are a helpful customer support agent for CloudFlow, a project management SaaS platform.
+
+Instructions:
+1. Provide a helpful, accurate response based on the knowledge base
+2. Be conversational and empathetic
+3. If the information isn't sufficient, ask clarifying questions
+4. Suggest next steps or escalation if needed
+5. Keep responses concise but complete
+
+Respond with JSON only, in this format:
+{
+    "response": "Your helpful response here",
+    "confidence": 0.95,
+    "suggested_actions": ["action1", "action2"],
+    "escalate": false,
+    "follow_up_questions": ["question1", "question2"]
+}"""
+RESPONSE_PREAMBLE_TOKENS = estimate_tokens(RESPONSE_PREAMBLE)
+
+
+class PromptBuilder:
+    def __init__(self,
+                 context_budget: int = None,
+                 passage_budget: int = None,
+                 max_passages: int = None,
+                 dedupe_threshold: float = 0.8):
+        self.context_budget = context_budget or Config.PROMPT_CONTEXT_TOKENS
+        self.passage_budget = passage_budget or Config.PROMPT_PASSAGE_TOKENS
+        self.max_passages = max_passages or Config.PROMPT_MAX_PASSAGES
+        self.dedupe_threshold = dedupe_threshold
+
+    @staticmethod
+    def passage_text(source: Dict[str, Any]) -> str:
+        return source.get("content") or source.get("solution") or ""
+
+    def select_passages(self, search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Pick passages by fused score, skipping near-duplicates, within the token budget"""
+        ranked = sorted(search_results, key=lambda hit: hit.get("_score", 0), reverse=True)
+
+        selected = []
+        seen_shingles: List[set] = []
+        remaining = self.context_budget
+        for hit in ranked:
+            if len(selected) >= self.max_passages or remaining < 32:
+                break
+            source = hit.get("_source", {})
+            text = self.passage_text(source)
+            if not text:
+                continue
+
+            shingles = _shingles(text)
+            if any(len(shingles & other) / (len(shingles | other) or 1) >= self.dedupe_threshold
+                   for other in seen_shingles):
+                continue
+
+            title = source.get("title") or source.get("problem") or "N/A"
+            header = f"Title: {title}\nCategory: {source.get('category', 'N/A')}\nContent: "
+            body_budget = min(self.passage_budget, remaining - estimate_tokens(header))
+            if body_budget < MIN_PASSAGE_TOKENS:
+                # A long title would leave no room for the passage itself
+                continue
+            body = truncate_to_tokens(text, body_budget)
+            passage = header + body
+            cost = estimate_tokens(passage)
+
+            selected.append({
+                "id": hit.get("_id"),
+                "text": passage,
+                "tokens": cost,
+                "truncated": body != text
+            })
+            seen_shingles.append(shingles)
+            remaining -= cost
+        return selected
+
+    def build_response_prompt(self,
+                              user_query: str,
+                              search_results: List[Dict[str, Any]],
+                              user_context: Optional[Dict[str, Any]] = None,
+                              conversation: str = "") -> Dict[str, Any]:
+        """Assemble the generation prompt, with any earlier conversation, and report its token count"""
+        passages = self.select_passages(search_results)
+        context = "\n\n---\n\n".join(p["text"] for p in passages) or "No specific documentation found."
+
+        user_info = ""
+        if user_context:
+            user_info = f"User context: {user_context.get('subscription_tier', 'Free')} plan, "
+            user_info += f"Previous issues: {user_context.get('issue_history', 'None')}\n\n"
+
+        history = f"Conversation so far:\n{conversation}\n\n" if conversation else ""
+
+        request_part = (
+            f"\n\nRelevant Knowledge Base Information:\n{context}\n\n"
+            f"{user_info}"
+            f"{history}"
+            f"Customer Question: \"{user_query}\""
+        )
+
+        return {
+            "prompt": RESPONSE_PREAMBLE + request_part,
+            "prompt_tokens": RESPONSE_PREAMBLE_TOKENS + estimate_tokens(request_part),
+            "context_tokens": sum(p["tokens"] for p in passages),
+            "passages": [p["id"] for p in passages],
+            "truncated": any(p["truncated"] for p in passages)
+        }
@@ -0,0 +1,51 @@
+"""
+Pydantic schemas for structured LLM output. Imported on first validation;
+building the models is a noticeable share of cold start.
+"""
+from typing import List
+from pydantic import BaseModel, field_validator
+
+
+class IntentResult(BaseModel):
+    intent: str = "general"
+    urgency: str = "medium"
+    entities: List[str] = []
+    tone: str = "neutral"
+    keywords: List[str] = []
+    confidence: float = 0.5
+
+    @field_validator("entities", "keywords", mode="before")
+    @classmethod
+    def _as_list(cls, value):
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [value]
+        return [str(item) for item in value]
+
+    @field_validator("confidence", mode="after")
+    @classmethod
+    def _clamp(cls, value):
+        return min(max(value, 0.0), 1.0)
+
+
+class GeneratedResponse(BaseModel):
+    response: str
+    confidence: float = 0.5
+    suggested_actions: List[str] = []
+    escalate: bool = False
+    follow_up_questions: List[str] = []
+
+    @field_validator("suggested_actions", "follow_up_questions", mode="before")
+    @classmethod
+    def _as_list(cls, value):
+        if value is None:
+            return []
+        if isinstance(value, str):
+            return [value]
+        return [str(item) for item in value]
+
+    @field_validator("confidence", mode="after")
+    @classmethod
+    def _clamp(cls, value):
+        return min(max(value, 0.0), 1.0)
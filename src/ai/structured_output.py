@@ -0,0 +1,170 @@
+"""
+Tolerant extraction of JSON objects from LLM output, including streamed and
+truncated output, validated against pydantic schemas
+"""
+import json
+import re
+from typing import List, Dict, Any, Optional
+
+# Characters that can change nesting or string state; everything else is skipped
+_SPECIAL = re.compile(r'[\\"{}\[\],]')
+_TRAILING_COMMA = re.compile(r',(\s*[}\]])')
+_OPENERS = {"{": "}", "[": "]"}
+
+
+class IncrementalJSONParser:
+    """
+    Scans model output chunk by chunk for the first JSON object, tracking
+    string and nesting state so completion is detected without reparsing.
+    Works the same on a whole response fed as one chunk.
+    """
+
+    def __init__(self):
+        self.raw: List[str] = []
+        self.text = ""
+        self.started = False
+        self.complete = False
+        self.repaired = False
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        # (offset, depth) of every comma outside strings
+        self._commas: List[tuple] = []
+
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; returns True once the object is closed"""
+        self.raw.append(chunk)
+        if self.complete:
+            return True
+        if not self.started:
+            start = chunk.find("{")
+            if start < 0:
+                return False
+            chunk = chunk[start:]
+            self.started = True
+
+        offset = len(self.text)
+        skip = -1
+        if self._escape:
+            skip, self._escape = 0, False
+
+        for match in _SPECIAL.finditer(chunk):
+            i = match.start()
+            if i <= skip:
+                continue
+            ch = chunk[i]
+            if self._in_string:
+                if ch == "\\":
+                    if i + 1 < len(chunk):
+                        skip = i + 1
+                    else:
+                        self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in _OPENERS:
+                self._stack.append(_OPENERS[ch])
+            elif ch == ",":
+                self._commas.append((offset + i, len(self._stack)))
+            elif ch in "}]":
+                # Be lenient about mismatched closers; pop the innermost level
+                if self._stack:
+                    self._stack.pop()
+                if not self._stack:
+                    self.text += chunk[:i + 1]
+                    self.complete = True
+                    return True
+
+        self.text += chunk
+        return False
+
+    @property
+    def raw_text(self) -> str:
+        return "".join(self.raw)
+
+    def _loads(self, text: str) -> Optional[Dict[str, Any]]:
+        """json.loads, retrying once without trailing commas"""
+        for candidate in (text, None):
+            if candidate is None:
+                candidate = _strip_trailing_commas(text)
+                if candidate == text:
+                    return None
+                self.repaired = True
+            try:
+                value = json.loads(candidate)
+            except ValueError:
+                continue
+            return value if isinstance(value, dict) else None
+        return None
+
+    def _close(self, text: str, stack: List[str], in_string: bool, escape: bool) -> Optional[Dict[str, Any]]:
+        """Close an unterminated prefix, trying fillers for a dangling key or colon"""
+        if escape:
+            text = text[:-1]
+        if in_string:
+            text += '"'
+        closers = "".join(reversed(stack))
+        stripped = text.rstrip()
+        if stripped.endswith(","):
+            stripped = stripped[:-1]
+        for filler in ("", "null", ":null"):
+            value = self._loads(stripped + filler + closers)
+            if value is not None:
+                return value
+        return None
+
+    def result(self) -> Optional[Dict[str, Any]]:
+        """Best-effort object from everything fed so far, repairing truncation"""
+        if not self.started:
+            return None
+        if self.complete:
+            return self._loads(self.text)
+
+        self.repaired = True
+        value = self._close(self.text, self._stack, self._in_string, self._escape)
+        if value is not None:
+            return value
+
+        # Drop the incomplete trailing element and close what remains
+        for offset, _ in reversed(self._commas[-8:]):
+            prefix = IncrementalJSONParser()
+            prefix.feed(self.text[:offset])
+            value = self._close(prefix.text, prefix._stack, prefix._in_string, prefix._escape)
+            if value is not None:
+                return value
+        return None
+
+    def completed_fields(self) -> Dict[str, Any]:
+        """Top-level fields whose values are fully received"""
+        if self.complete:
+            return self.result() or {}
+        top_level = [offset for offset, depth in self._commas if depth == 1]
+        if not top_level:
+            return {}
+        return self._loads(self.text[:top_level[-1]] + "}") or {}
+
+
+def _strip_trailing_commas(text: str) -> str:
+    """Remove commas directly before a closing bracket, outside of strings"""
+    parts = re.split(r'("(?:[^"\\]|\\.)*")', text)
+    return "".join(part if i % 2 else _TRAILING_COMMA.sub(r"\1", part) for i, part in enumerate(parts))
+
+
+def validate_output(data: Optional[Dict[str, Any]], schema) -> Optional[Dict[str, Any]]:
+    """Coerce parsed output into a pydantic schema, or None when it does not fit"""
+    if data is None:
+        return None
+    try:
+        return schema.model_validate(data).model_dump()
+    except ValueError:
+        # pydantic's ValidationError is a ValueError
+        return None
+
+
+def parse_structured(text: str, schema=None) -> Optional[Dict[str, Any]]:
+    """Extract the first JSON object from text, optionally validated against a schema"""
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    data = parser.result()
+    return validate_output(data, schema) if schema else data
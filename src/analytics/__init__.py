@@ -0,0 +1,3 @@
+from .turn_store import TurnStore
+
+__all__ = ["TurnStore"]
@@ -0,0 +1,341 @@
+"""
+Columnar store of conversation turns for analytics. Turns are appended to a
+small row buffer, frozen into NumPy segments (optionally written as .npz
+files shared by all workers) and aggregated with vectorized operations.
+"""
+import io
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Optional
+import numpy as np
+
+NUMERIC_COLUMNS = {
+    "timestamp": np.float64,
+    "confidence": np.float32,
+    "latency_ms": np.float32,
+    "escalate": np.bool_,
+    "degraded": np.bool_,
+    "faq": np.bool_,
+}
+# Dictionary-encoded string columns
+CATEGORICAL_COLUMNS = ("session", "intent", "urgency")
+LOW_CONFIDENCE = 0.5
+SEGMENT_PREFIX = "turns-"
+
+
+class _Dictionary:
+    """Maps string values to dense integer codes"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.index: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self.index.get(value)
+        if code is None:
+            code = self.index[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, values) -> np.ndarray:
+        """Translation table from another dictionary's codes to ours"""
+        return np.array([self.encode(str(value)) for value in values], dtype=np.int32)
+
+
+class TurnStore:
+    def __init__(self,
+                 directory: str = None,
+                 segment_size: int = 65536,
+                 flush_interval: float = 60.0):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.flush_interval = flush_interval
+        self.dictionaries = {name: _Dictionary() for name in CATEGORICAL_COLUMNS + ("source",)}
+        self._segments: List[Dict[str, np.ndarray]] = []
+        self._loaded_files = set()
+        self._buffer = self._empty_buffer()
+        self._last_flush = time.monotonic()
+        self._prefix = f"{SEGMENT_PREFIX}{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._sequence = 0
+        self._lock = threading.RLock()
+        self._cache = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def _empty_buffer() -> Dict[str, list]:
+        columns = list(NUMERIC_COLUMNS) + list(CATEGORICAL_COLUMNS) + ["source_ids"]
+        return {name: [] for name in columns}
+
+    def __len__(self) -> int:
+        return len(self.columns()["timestamp"])
+
+    def append(self, session_id: str, entry: Dict[str, Any]):
+        """Record one conversation entry as stored in the session history"""
+        intent = entry.get("intent") or {}
+        response = entry.get("response") or {}
+        with self._lock:
+            buffer = self._buffer
+            buffer["timestamp"].append(time.time())
+            buffer["confidence"].append(response.get("confidence") or 0.0)
+            buffer["latency_ms"].append(entry.get("latency_ms") or 0.0)
+            buffer["escalate"].append(bool(response.get("escalate")))
+            buffer["degraded"].append(bool(entry.get("degraded")))
+            buffer["faq"].append(bool(entry.get("faq")))
+            buffer["session"].append(self.dictionaries["session"].encode(session_id))
+            buffer["intent"].append(self.dictionaries["intent"].encode(intent.get("intent", "unknown")))
+            buffer["urgency"].append(self.dictionaries["urgency"].encode(intent.get("urgency", "unknown")))
+            buffer["source_ids"].append([self.dictionaries["source"].encode(str(source_id))
+                                         for source_id in entry.get("source_ids", [])])
+            self._cache = None
+
+            if len(buffer["timestamp"]) >= self.segment_size or (
+                    self.directory and time.monotonic() - self._last_flush > self.flush_interval):
+                self.flush()
+
+    def _freeze(self, buffer: Dict[str, list]) -> Dict[str, np.ndarray]:
+        """Turn a row buffer into a segment of column arrays"""
+        segment = {name: np.array(buffer[name], dtype=dtype) for name, dtype in NUMERIC_COLUMNS.items()}
+        for name in CATEGORICAL_COLUMNS:
+            segment[name] = np.array(buffer[name], dtype=np.int32)
+        # Ragged source ids: flat codes plus row offsets
+        lengths = np.array([len(ids) for ids in buffer["source_ids"]], dtype=np.int64)
+        segment["source_offsets"] = np.concatenate(([0], np.cumsum(lengths)))
+        segment["source_codes"] = np.array([code for ids in buffer["source_ids"] for code in ids], dtype=np.int32)
+        return segment
+
+    def flush(self):
+        """Freeze buffered turns into a segment, writing it out when a directory is set"""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._buffer["timestamp"]:
+                return
+            segment = self._freeze(self._buffer)
+            self._buffer = self._empty_buffer()
+            self._segments.append(segment)
+            if self.directory:
+                self._write_segment(segment)
+
+    def _write_segment(self, segment: Dict[str, np.ndarray]):
+        """Write a segment with its dictionaries so other processes can decode it"""
+        name = f"{self._prefix}-{self._sequence:06d}.npz"
+        self._sequence += 1
+        arrays = dict(segment)
+        for column, dictionary in self.dictionaries.items():
+            arrays[f"dict_{column}"] = np.array(dictionary.values, dtype=str)
+
+        data = io.BytesIO()
+        np.savez_compressed(data, **arrays)
+        path = os.path.join(self.directory, name)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data.getvalue())
+        os.replace(path + ".tmp", path)
+        self._loaded_files.add(name)
+
+    def _load_new_segments(self):
+        """Pick up segments flushed by other workers, re-encoding their codes"""
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        for name in sorted(os.listdir(self.directory)):
+            if not (name.startswith(SEGMENT_PREFIX) and name.endswith(".npz")) or name in self._loaded_files:
+                continue
+            with np.load(os.path.join(self.directory, name)) as data:
+                segment = {column: data[column] for column in NUMERIC_COLUMNS}
+                for column in CATEGORICAL_COLUMNS:
+                    lookup = self.dictionaries[column].lookup(data[f"dict_{column}"])
+                    segment[column] = lookup[data[column]] if len(lookup) else data[column]
+                lookup = self.dictionaries["source"].lookup(data["dict_source"])
+                segment["source_offsets"] = data["source_offsets"]
+                segment["source_codes"] = lookup[data["source_codes"]] if len(lookup) else data["source_codes"]
+            self._segments.append(segment)
+            self._loaded_files.add(name)
+            self._cache = None
+
+    def columns(self, since: float = None) -> Dict[str, np.ndarray]:
+        """All turns as column arrays, optionally only those after a Unix timestamp"""
+        with self._lock:
+            self._load_new_segments()
+            if self._cache is None:
+                parts = list(self._segments)
+                if self._buffer["timestamp"]:
+                    parts.append(self._freeze(self._buffer))
+                if not parts:
+                    parts.append(self._freeze(self._empty_buffer()))
+                columns = {name: np.concatenate([part[name] for part in parts])
+                           for name in list(NUMERIC_COLUMNS) + list(CATEGORICAL_COLUMNS)}
+                offsets, base = [], 0
+                for part in parts:
+                    offsets.append(part["source_offsets"][:-1] + base)
+                    base += len(part["source_codes"])
+                columns["source_offsets"] = np.concatenate(offsets + [np.array([base])])
+                columns["source_codes"] = np.concatenate([part["source_codes"] for part in parts])
+                self._cache = columns
+            columns = self._cache
+
+        if since is None:
+            return columns
+        mask = columns["timestamp"] >= since
+        selected = {name: columns[name][mask] for name in list(NUMERIC_COLUMNS) + list(CATEGORICAL_COLUMNS)}
+        # Keep sources for the selected rows only
+        starts, ends = columns["source_offsets"][:-1][mask], columns["source_offsets"][1:][mask]
+        lengths = ends - starts
+        selected["source_offsets"] = np.concatenate(([0], np.cumsum(lengths)))
+        selected["source_codes"] = columns["source_codes"][
+            np.repeat(starts, lengths) + np.arange(lengths.sum()) - np.repeat(selected["source_offsets"][:-1], lengths)
+        ] if lengths.sum() else np.array([], dtype=np.int32)
+        return selected
+
+    def summary(self, since: float = None) -> Dict[str, Any]:
+        """Overall totals in the shape of the /analytics response"""
+        columns = self.columns(since)
+        total = len(columns["timestamp"])
+        if total == 0:
+            return {"total_conversations": 0}
+
+        intent_counts = np.bincount(columns["intent"], minlength=len(self.dictionaries["intent"].values))
+        top = np.argsort(intent_counts)[::-1][:5]
+        return {
+            "total_conversations": total,
+            "average_confidence": round(float(columns["confidence"].mean()), 2),
+            "escalation_rate": round(float(columns["escalate"].mean()) * 100, 2),
+            "top_intents": [(self.dictionaries["intent"].values[code], int(intent_counts[code]))
+                            for code in top if intent_counts[code]],
+            "active_sessions": int(len(np.unique(columns["session"]))),
+            "p95_latency_ms": round(float(np.percentile(columns["latency_ms"], 95)), 1)
+        }
+
+    def group_by(self, column: str = "intent", since: float = None) -> List[Dict[str, Any]]:
+        """Per-value counts, confidence, escalation rate and latency for intent or urgency"""
+        if column not in CATEGORICAL_COLUMNS or column == "session":
+            raise ValueError(f"Cannot group by '{column}', expected intent or urgency")
+        columns = self.columns(since)
+        codes = columns[column]
+        size = len(self.dictionaries[column].values)
+        counts = np.bincount(codes, minlength=size)
+        confidence = np.bincount(codes, weights=columns["confidence"], minlength=size)
+        escalations = np.bincount(codes, weights=columns["escalate"], minlength=size)
+        latency = np.bincount(codes, weights=columns["latency_ms"], minlength=size)
+
+        # p95 latency per group from one sort by (group, latency)
+        order = np.lexsort((columns["latency_ms"], codes))
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        p95_positions = starts + np.floor(0.95 * np.maximum(counts - 1, 0)).astype(np.int64)
+        sorted_latency = columns["latency_ms"][order]
+
+        groups = []
+        for code in np.flatnonzero(counts):
+            groups.append({
+                column: self.dictionaries[column].values[code],
+                "turns": int(counts[code]),
+                "average_confidence": round(float(confidence[code] / counts[code]), 3),
+                "escalation_rate": round(float(escalations[code] / counts[code]) * 100, 2),
+                "average_latency_ms": round(float(latency[code] / counts[code]), 1),
+                "p95_latency_ms": round(float(sorted_latency[p95_positions[code]]), 1)
+            })
+        groups.sort(key=lambda group: group["turns"], reverse=True)
+        return groups
+
+    def timeline(self, bucket_seconds: float = 3600, since: float = None) -> List[Dict[str, Any]]:
+        """Turns, confidence and escalations per time bucket"""
+        columns = self.columns(since)
+        if not len(columns["timestamp"]):
+            return []
+        buckets = (columns["timestamp"] // bucket_seconds).astype(np.int64)
+        keys, inverse = np.unique(buckets, return_inverse=True)
+        counts = np.bincount(inverse)
+        confidence = np.bincount(inverse, weights=columns["confidence"])
+        escalations = np.bincount(inverse, weights=columns["escalate"])
+        # Distinct sessions per bucket from unique (bucket, session) pairs
+        session_count = len(self.dictionaries["session"].values) or 1
+        pairs = np.unique(inverse.astype(np.int64) * session_count + columns["session"])
+        sessions = np.bincount(pairs // session_count, minlength=len(keys))
+
+        return [
+            {
+                "start": datetime.fromtimestamp(key * bucket_seconds, timezone.utc).isoformat(),
+                "turns": int(counts[i]),
+                "sessions": int(sessions[i]),
+                "average_confidence": round(float(confidence[i] / counts[i]), 3),
+                "escalations": int(escalations[i])
+            }
+            for i, key in enumerate(keys)
+        ]
+
+    def escalation_funnel(self, since: float = None) -> Dict[str, Any]:
+        """How turns and sessions progress from answered to escalated"""
+        columns = self.columns(since)
+        total = len(columns["timestamp"])
+        if total == 0:
+            return {"turns": {}, "sessions": {}}
+
+        low_confidence = columns["confidence"] < LOW_CONFIDENCE
+        _, session_index = np.unique(columns["session"], return_inverse=True)
+        sessions_low = np.bincount(session_index, weights=low_confidence) > 0
+        sessions_escalated = np.bincount(session_index, weights=columns["escalate"]) > 0
+
+        # First turn of each session, by time
+        order = np.lexsort((columns["timestamp"], session_index))
+        first = order[np.concatenate(([0], np.flatnonzero(np.diff(session_index[order])) + 1))]
+
+        return {
+            "turns": {
+                "total": total,
+                "faq_answers": int(columns["faq"].sum()),
+                "degraded": int(columns["degraded"].sum()),
+                "low_confidence": int(low_confidence.sum()),
+                "escalated": int(columns["escalate"].sum())
+            },
+            "sessions": {
+                "total": int(len(sessions_low)),
+                "with_low_confidence": int(sessions_low.sum()),
+                "escalated": int(sessions_escalated.sum()),
+                "escalated_on_first_turn": int(columns["escalate"][first].sum())
+            }
+        }
+
+    def export(self, path: str, since: float = None) -> int:
+        """Write turns to .parquet (needs pyarrow), .csv or .npz; returns the row count"""
+        columns = self.columns(since)
+        decoded = {name: columns[name] for name in NUMERIC_COLUMNS}
+        for name in ("confidence", "latency_ms"):
+            decoded[name] = np.round(decoded[name].astype(np.float64), 4)
+        for name in CATEGORICAL_COLUMNS:
+            values = np.array(self.dictionaries[name].values or [""], dtype=object)
+            decoded[name] = values[columns[name]]
+        sources = np.array(self.dictionaries["source"].values or [""], dtype=object)[columns["source_codes"]]
+        offsets = columns["source_offsets"]
+        decoded["source_ids"] = [list(sources[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+        rows = len(columns["timestamp"])
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        if path.endswith(".parquet"):
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise RuntimeError("Parquet export requires pyarrow: pip install pyarrow")
+            table = pa.table({name: list(values) if name == "source_ids" else values
+                              for name, values in decoded.items()})
+            pq.write_table(table, path)
+        elif path.endswith(".csv"):
+            import csv
+            names = list(decoded)
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(names)
+                decoded["source_ids"] = [";".join(ids) for ids in decoded["source_ids"]]
+                writer.writerows(zip(*(decoded[name].tolist() if hasattr(decoded[name], "tolist")
+                                       else decoded[name] for name in names)))
+        else:
+            decoded["source_ids"] = [";".join(ids) for ids in decoded["source_ids"]]
+            for name in CATEGORICAL_COLUMNS + ("source_ids",):
+                decoded[name] = np.array(decoded[name], dtype=str)
+            np.savez_compressed(path, **decoded)
+        return rows
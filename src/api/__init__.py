@@ -1,4 +1,16 @@
-from .support_agent import SupportAgent
-from .main import app
+"""
+The FastAPI app and SupportAgent are imported on first access so CLI commands
+that only need the agent never load the web stack.
+"""
 
-__all__ = ["SupportAgent", "app"]
\ No newline at end of file
+__all__ = ["SupportAgent", "app"]
+
+
+def __getattr__(name):
+    if name == "SupportAgent":
+        from .support_agent import SupportAgent
+        return SupportAgent
+    if name == "app":
+        from .main import app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
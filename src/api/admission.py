@@ -0,0 +1,220 @@
+"""
+Admission control for the expensive routes: a per-worker concurrency limit
+with a bounded, time-limited queue in front of it, plus token-bucket rate
+limits per client and per session. Requests that cannot be served soon are
+turned away at once with 429/503 and Retry-After instead of piling up
+behind slow model calls.
+"""
+import asyncio
+import json
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional, Tuple
+from starlette.responses import JSONResponse
+from ..config import Config
+from ..monitoring import record_admission, ADMISSION_QUEUE_WAIT
+
+# Only bodies this small are parsed for a session id
+MAX_SESSION_BODY = 64 * 1024
+
+
+class TokenBuckets:
+    """Token bucket per key (`rate` tokens/second up to `burst`), keeping the most recent `max_keys`"""
+
+    def __init__(self, rate: float, burst: float, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = max(burst, 1.0)
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def take(self, key: str) -> float:
+        """Take a token for `key`; returns 0 when allowed, else seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            wait = 0.0
+            if tokens >= 1.0:
+                tokens -= 1.0
+            else:
+                wait = (1.0 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class ConcurrencyLimiter:
+    """At most `limit` requests run at once; up to `max_queue` more wait at most `max_wait` seconds"""
+
+    def __init__(self, limit: int, max_queue: int, max_wait: float):
+        self.limit = limit
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.active = 0
+        self._waiters: deque = deque()
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> Optional[str]:
+        """Take a slot; returns None when admitted, else the reason it was refused"""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return None
+        if len(self._waiters) >= self.max_queue or self.max_wait <= 0:
+            return "queue_full"
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # A released slot is handed straight to the waiter, so `active` is unchanged
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_wait)
+            return None
+        except asyncio.TimeoutError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot arrived just as the wait timed out; keep it
+                return None
+            waiter.cancel()
+            return "queue_timeout"
+        except asyncio.CancelledError:
+            # The client went away while queued; pass on a slot it was already handed
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            waiter.cancel()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.active -= 1
+
+    def retry_after(self) -> float:
+        """Rough time until the queue drains, for Retry-After"""
+        return max(1.0, self.max_wait * (1 + self.queued / max(self.limit, 1)))
+
+
+class AdmissionControl:
+    """ASGI middleware applying the limits to routes under `paths`; everything else passes through"""
+
+    def __init__(self, app, paths: Tuple[str, ...] = None):
+        self.app = app
+        self.paths = paths if paths is not None else tuple(Config.ADMISSION_PATHS)
+        self.limiter = ConcurrencyLimiter(
+            Config.ADMISSION_MAX_CONCURRENT, Config.ADMISSION_MAX_QUEUE, Config.ADMISSION_MAX_WAIT
+        )
+        self.client_buckets = TokenBuckets(Config.RATE_LIMIT_CLIENT_RPS, Config.RATE_LIMIT_CLIENT_BURST)
+        self.session_buckets = TokenBuckets(Config.RATE_LIMIT_SESSION_RPS, Config.RATE_LIMIT_SESSION_BURST)
+
+    def _controlled(self, scope: Dict[str, Any]) -> bool:
+        return (Config.ADMISSION_ENABLED and scope["type"] == "http"
+                and any(scope["path"] == path or scope["path"].startswith(path + "/") for path in self.paths))
+
+    async def __call__(self, scope, receive, send):
+        if not self._controlled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        if self.client_buckets.enabled:
+            wait = self.client_buckets.take(f"client:{_client_key(scope, headers)}")
+            if wait:
+                await self._reject(scope, send, 429, "client_rate", wait, "Too many requests from this client")
+                return
+
+        if self.session_buckets.enabled and scope["method"] == "POST":
+            receive, session_id = await _peek_session(receive, headers)
+            if session_id:
+                wait = self.session_buckets.take(f"session:{session_id}")
+                if wait:
+                    await self._reject(scope, send, 429, "session_rate", wait,
+                                       "Too many messages in this conversation")
+                    return
+
+        started = time.monotonic()
+        refused = await self.limiter.acquire()
+        if refused:
+            await self._reject(scope, send, 503, refused, self.limiter.retry_after(),
+                               "Server busy, please retry shortly")
+            return
+        ADMISSION_QUEUE_WAIT.observe(time.monotonic() - started)
+        record_admission("admitted", self.limiter.active, self.limiter.queued)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
+
+    async def _reject(self, scope, send, status: int, reason: str, retry_after: float, detail: str):
+        record_admission(reason, self.limiter.active, self.limiter.queued)
+        response = JSONResponse(
+            {"detail": detail, "reason": reason},
+            status_code=status,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+        await response(scope, None, send)
+
+
+def _client_key(scope: Dict[str, Any], headers: Dict[str, str]) -> str:
+    """
+    The calling client: the peer address, or behind RATE_LIMIT_TRUSTED_PROXIES
+    proxies the X-Forwarded-For hop the outermost one appended. Hops to the
+    left of that are set by the client and not trusted.
+    """
+    trusted = Config.RATE_LIMIT_TRUSTED_PROXIES
+    forwarded = headers.get("x-forwarded-for") if trusted > 0 else None
+    if forwarded:
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        if hops:
+            return hops[-min(trusted, len(hops))]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+async def _peek_session(receive, headers: Dict[str, str]):
+    """
+    Read a small JSON body for its session_id and return a receive callable
+    that replays it to the route
+    """
+    if "json" not in headers.get("content-type", "") or "ndjson" in headers.get("content-type", ""):
+        return receive, None
+    if int(headers.get("content-length") or MAX_SESSION_BODY + 1) > MAX_SESSION_BODY:
+        return receive, None
+
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    body = b"".join(chunks)
+
+    replayed = False
+
+    async def replay():
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    try:
+        session_id = json.loads(body).get("session_id")
+    except (ValueError, AttributeError):
+        session_id = None
+    return replay, session_id if isinstance(session_id, str) else None
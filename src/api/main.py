@@ -1,21 +1,87 @@
 """
 FastAPI main application
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from pydantic import BaseModel
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
 from typing import Optional, Dict, Any, List
+from contextlib import asynccontextmanager
+import asyncio
+import json
 import os
-from .support_agent import SupportAgent
+import time
+from .support_agent import SupportAgent, parse_batch_line
+from .warmup import Warmup
+from .admission import AdmissionControl
+from ..config import Config
+from ..reliability import breaker_states
+from ..monitoring import render_metrics, record_typeahead, TRACER, EXPORTER
+from ..data.sample_data import DEMO_SCENARIOS
+from ..cache import FaqBuilder, TypeaheadBuilder
+from ..search import close_es_client
+from ..background import close_background_queue
+
+# Built once per worker by the lifespan hook, not at import time, so a
+# pre-forking server does not construct clients in the master process
+support_agent: Optional[SupportAgent] = None
+warmup: Optional[Warmup] = None
+
+def get_support_agent() -> SupportAgent:
+    """Return this worker's agent, creating it on first use"""
+    global support_agent
+    if support_agent is None:
+        support_agent = SupportAgent()
+    return support_agent
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load and warm up the agent before serving traffic and keep FAQ answers in sync"""
+    global warmup
+    agent = get_support_agent()
+    warmup = Warmup(agent)
+    if Config.WARMUP_ENABLED:
+        warmup.start()
+        # Startup (and so the listening socket) waits for warm-up, up to the timeout
+        if not await asyncio.to_thread(warmup.ready.wait, Config.WARMUP_TIMEOUT):
+            print(f"Worker {os.getpid()} warm-up still running after {Config.WARMUP_TIMEOUT:.0f}s; "
+                  "serving, /health/ready reports 503 until it finishes")
+    else:
+        warmup.skip()
+    stop_refresh = None
+    if agent.faq_store is not None and len(agent.faq_store):
+        stop_refresh = FaqBuilder(agent, agent.faq_store).start_auto_refresh()
+    stop_typeahead = None
+    if agent.typeahead is not None:
+        typeahead = TypeaheadBuilder(agent, agent.typeahead)
+        await asyncio.to_thread(typeahead.refresh)
+        stop_typeahead = typeahead.start_auto_refresh()
+    print(f"Worker {os.getpid()} ready (state backend: {agent.state.name})")
+    yield
+    if stop_refresh is not None:
+        stop_refresh.set()
+    if stop_typeahead is not None:
+        stop_typeahead.set()
+    # Finish queued history and analytics writes before closing their stores
+    agent.flush(Config.BACKGROUND_DRAIN_TIMEOUT)
+    if agent.memory is not None:
+        agent.memory.close()
+    close_background_queue(Config.BACKGROUND_DRAIN_TIMEOUT)
+    agent.state.close()
+    close_es_client()
 
 app = FastAPI(
     title="Smart Customer Support Agent",
     description="AI-powered customer support using Elastic Search + Google Cloud AI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Shed load on the chat routes before it queues up behind model calls
+# (added first so CORS headers still wrap its 429/503 responses)
+app.add_middleware(AdmissionControl)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -25,9 +91,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize support agent
-support_agent = SupportAgent()
-
 # Request/Response models
 class ChatRequest(BaseModel):
     message: str
@@ -44,6 +107,12 @@ class ChatResponse(BaseModel):
     follow_up_questions: List[str]
     sources: List[Dict[str, str]]
     timestamp: str
+    degraded: bool = False
+    trace_id: Optional[str] = None
+
+class BatchChatRequest(BaseModel):
+    messages: List[ChatRequest]
+    concurrency: Optional[int] = None
 
 class HealthResponse(BaseModel):
     status: str
@@ -60,9 +129,11 @@ async def health_check():
     """Health check endpoint"""
     try:
         # Test basic functionality
-        test_response = support_agent.process_query(
+        # Probe turns are not stored, summarized or offered as suggestions
+        test_response = get_support_agent().process_query(
             "test health check",
-            session_id="health_check"
+            session_id="health_check",
+            record=False
         )
         return HealthResponse(
             status="healthy",
@@ -74,15 +145,50 @@ async def health_check():
             detail=f"Service unhealthy: {str(e)}"
         )
 
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: 503 until this worker has finished warming up"""
+    status = warmup.status() if warmup is not None else {"ready": False}
+    if not status["ready"]:
+        raise HTTPException(status_code=503, detail=status)
+    return status
+
+@app.get("/health/dependencies")
+async def dependency_health():
+    """Circuit breaker state for each downstream dependency"""
+    return {
+        "circuit_breakers": breaker_states()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics endpoint"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+def client_timeout(requested: Optional[float]) -> Optional[float]:
+    """
+    A client's requested budget, which may only tighten REQUEST_TIMEOUT;
+    missing or non-positive values keep the server's budget
+    """
+    if requested is None or not requested > 0:
+        return None
+    return min(requested, Config.REQUEST_TIMEOUT) if Config.REQUEST_TIMEOUT > 0 else requested
+
 @app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
-    """Main chat endpoint"""
+async def chat(request: ChatRequest,
+               traceparent: Optional[str] = Header(None),
+               x_request_timeout: Optional[float] = Header(None)):
+    """Main chat endpoint; X-Request-Timeout (seconds) can shorten the latency budget"""
     try:
-        response = support_agent.process_query(
-            user_query=request.message,
-            session_id=request.session_id,
-            user_context=request.user_context
-        )
+        with TRACER.start_span("POST /chat", traceparent=traceparent):
+            # Off the event loop, so admission control and light routes keep responding
+            response = await asyncio.to_thread(
+                get_support_agent().process_query,
+                user_query=request.message,
+                session_id=request.session_id,
+                user_context=request.user_context,
+                timeout=client_timeout(x_request_timeout)
+            )
 
         return ChatResponse(**response)
 
@@ -92,58 +198,125 @@ async def chat(request: ChatRequest):
             detail=f"Error processing chat request: {str(e)}"
         )
 
+@app.post("/chat/batch")
+async def chat_batch(request: Request, traceparent: Optional[str] = Header(None)):
+    """
+    Answer many messages in one request. Accepts {"messages": [...]} JSON or
+    NDJSON lines and streams NDJSON results as they finish, each tagged with
+    the item's index; failed items carry an "error" field.
+    """
+    body = await request.body()
+    concurrency = None
+    if "ndjson" in request.headers.get("content-type", ""):
+        items = [item for item in map(parse_batch_line, body.decode().splitlines()) if item is not None]
+    else:
+        try:
+            batch = BatchChatRequest.model_validate_json(body)
+        except ValidationError as e:
+            raise HTTPException(status_code=422, detail=e.errors())
+        items = [message.model_dump() for message in batch.messages]
+        concurrency = batch.concurrency and min(batch.concurrency, Config.BATCH_CONCURRENCY)
+
+    if len(items) > Config.BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch of {len(items)} items exceeds the limit of {Config.BATCH_MAX_ITEMS}"
+        )
+
+    agent = get_support_agent()
+
+    def stream_results():
+        for result in agent.process_batch(items, concurrency=concurrency, traceparent=traceparent):
+            yield json.dumps(result, default=str) + "\n"
+
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
+@app.get("/debug/traces")
+async def debug_traces(limit: int = 20, order: str = "slowest"):
+    """Inspect recent traces from the in-process ring buffer"""
+    traces = EXPORTER.recent(limit) if order == "recent" else EXPORTER.slowest(limit)
+    return {
+        "order": order,
+        "traces": traces
+    }
+
+@app.get("/debug/traces/{trace_id}")
+async def debug_trace(trace_id: str):
+    """Get a single trace by id"""
+    trace = EXPORTER.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="Trace not found")
+    return trace
+
 @app.get("/suggestions")
 async def get_suggestions():
     """Get suggested questions"""
     return {
-        "suggestions": support_agent.get_suggested_questions()
+        "suggestions": get_support_agent().get_suggested_questions()
     }
 
+@app.get("/suggestions/typeahead")
+async def typeahead(q: str = "", limit: int = 8):
+    """
+    Completions for a partly typed question: suggested questions, KB titles
+    and frequent past queries. Items with an "answer" can be shown without
+    calling /chat.
+    """
+    agent = get_support_agent()
+    if agent.typeahead is None:
+        return {"query": q, "suggestions": []}
+    start = time.perf_counter()
+    suggestions = agent.typeahead.suggest(q, max(1, min(limit, 20)))
+    elapsed = time.perf_counter() - start
+    record_typeahead(elapsed, suggestions)
+    return {"query": q, "suggestions": suggestions, "took_ms": round(elapsed * 1000, 3)}
+
 @app.get("/conversation/{session_id}")
 async def get_conversation(session_id: str):
     """Get conversation history for a session"""
-    history = support_agent.get_conversation_history(session_id)
+    history = get_support_agent().get_conversation_history(session_id)
     return {
         "session_id": session_id,
         "conversation_history": history
     }
 
 @app.get("/analytics")
-async def get_analytics():
+async def get_analytics(hours: Optional[float] = None):
     """Get conversation analytics"""
-    return support_agent.analyze_conversation_trends()
+    return get_support_agent().analyze_conversation_trends(hours)
+
+def _since(hours: Optional[float]) -> Optional[float]:
+    return time.time() - hours * 3600 if hours else None
+
+@app.get("/analytics/intents")
+async def get_intent_analytics(group_by: str = "intent", hours: Optional[float] = None):
+    """Turns, confidence, escalation rate and latency per intent or urgency"""
+    try:
+        groups = get_support_agent().turns.group_by(group_by, since=_since(hours))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"group_by": group_by, "groups": groups}
+
+@app.get("/analytics/timeline")
+async def get_analytics_timeline(bucket: int = 3600, hours: Optional[float] = 24):
+    """Conversation volume and escalations per time bucket (seconds)"""
+    if bucket <= 0:
+        raise HTTPException(status_code=400, detail="bucket must be positive")
+    return {
+        "bucket_seconds": bucket,
+        "buckets": get_support_agent().turns.timeline(bucket, since=_since(hours))
+    }
+
+@app.get("/analytics/funnel")
+async def get_escalation_funnel(hours: Optional[float] = None):
+    """How many turns and sessions reach low confidence and escalation"""
+    return get_support_agent().turns.escalation_funnel(since=_since(hours))
 
 @app.get("/demo")
 async def demo_scenarios():
     """Get demo scenarios for testing"""
     return {
-        "demo_scenarios": [
-            {
-                "title": "Password Reset",
-                "query": "I can't log into my account, I think I need to reset my password",
-                "expected_category": "account"
-            },
-            {
-                "title": "Billing Issue",
-                "query": "Why was I charged twice this month? I only have one subscription",
-                "expected_category": "billing"
-            },
-            {
-                "title": "Integration Problem",
-                "query": "My Slack integration stopped working, notifications aren't coming through",
-                "expected_category": "integrations"
-            },
-            {
-                "title": "Performance Issue",
-                "query": "The dashboard is really slow, taking forever to load my projects",
-                "expected_category": "technical"
-            },
-            {
-                "title": "Team Management",
-                "query": "How do I give my team member access to edit our shared project?",
-                "expected_category": "team_management"
-            }
-        ]
+        "demo_scenarios": DEMO_SCENARIOS
     }
 
 # Serve static files for frontend
@@ -1,101 +1,557 @@
 """
 Core support agent logic integrating search and AI
 """
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterable, Iterator
 from ..search import ElasticSearchClient
-from ..ai import GeminiClient
+from ..ai import LLMClient, ConversationMemory
 from ..config import Config
+from ..data.sample_data import SUGGESTED_QUESTIONS
+from ..cache import ResponseCache, FaqStore, TypeaheadIndex
+from ..reliability import get_breaker, deadline_scope, budget_below
+from ..state import StateBackend, create_state_backend
+from ..background import BackgroundQueue, get_background_queue
+from ..monitoring import (
+    stage_timer, record_fallback, record_ticket_leg, TRACER, current_span, current_trace_id, log_prefix
+)
+import contextvars
+import json
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from itertools import islice
+
+# Document categories that can answer each intent, for filtered retrieval
+INTENT_CATEGORIES = {
+    "account": ["account", "security", "team_management"],
+    "billing": ["billing", "product"],
+    "technical": ["technical", "data_management", "integrations"],
+    "feature_request": ["integrations", "product"],
+}
+
+
+def parse_batch_line(line: str) -> Optional[Dict[str, Any]]:
+    """One JSONL input line as a batch item; plain text lines are taken as the message"""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        value = json.loads(line)
+    except ValueError:
+        return {"message": line}
+    if isinstance(value, str):
+        return {"message": value}
+    return value if isinstance(value, dict) else {}
+
+def _run_in(context: contextvars.Context, func, *args):
+    """Call func in a copy of `context`, e.g. to keep a pool worker in the caller's trace"""
+    return context.copy().run(func, *args)
+
 
 class SupportAgent:
-    def __init__(self):
-        self.elastic_client = ElasticSearchClient()
-        self.ai_client = GeminiClient()
-        self.conversation_history: Dict[str, List[Dict]] = {}
+    def __init__(self,
+                 elastic_client: ElasticSearchClient = None,
+                 ai_client: LLMClient = None,
+                 faq_store: FaqStore = None,
+                 state: StateBackend = None,
+                 turn_store=None,
+                 memory: ConversationMemory = None,
+                 background: BackgroundQueue = None):
+        self.elastic_client = elastic_client or ElasticSearchClient()
+        self.ai_client = ai_client or LLMClient()
+        if faq_store is None and Config.FAQ_ENABLED:
+            faq_store = FaqStore.load()
+        self.faq_store = faq_store
+        # Sessions and analytics live in the state backend so any worker can serve them
+        self.state = state or create_state_backend()
+        self.response_cache = ResponseCache(
+            name="response",
+            max_size=Config.RESPONSE_CACHE_SIZE,
+            ttl=Config.RESPONSE_CACHE_TTL,
+            backend=None if self.state.name == "memory" else self.state
+        )
+        self.llm_breaker = getattr(self.ai_client, "breaker", None) or get_breaker("llm")
+        if turn_store is None:
+            # NumPy is only loaded once an agent is built, not on import
+            from ..analytics import TurnStore
+            turn_store = TurnStore(directory=Config.TURN_STORE_DIR or None)
+        self.turns = turn_store
+        # Earlier turns of a session, summarized off the request path
+        if memory is None and Config.CONVERSATION_CONTEXT_ENABLED:
+            memory = ConversationMemory(self.state, self.ai_client)
+        self.memory = memory
+        # History, analytics and cache writes happen after the response is returned
+        self.background = background or get_background_queue()
+        # Filled by TypeaheadBuilder at startup; learns frequent queries as they arrive
+        self.typeahead = TypeaheadIndex() if Config.TYPEAHEAD_ENABLED else None
 
     def process_query(self,
                      user_query: str,
                      session_id: str = None,
-                     user_context: Dict[str, Any] = None) -> Dict[str, Any]:
+                     user_context: Dict[str, Any] = None,
+                     timeout: float = None,
+                     record: bool = True) -> Dict[str, Any]:
         """
-        Main method to process user query and generate response
+        Main method to process user query and generate response. Every stage
+        works within `timeout` seconds (default REQUEST_TIMEOUT, 0 for none).
+        With record=False (health checks and other internal traffic) the turn
+        is not stored, summarized or learned by typeahead.
         """
         if not session_id:
             session_id = str(uuid.uuid4())
+        timeout = Config.REQUEST_TIMEOUT if timeout is None else timeout
+
+        with TRACER.start_span("SupportAgent.process_query", session_id=session_id) as span:
+            try:
+                with stage_timer("request"), deadline_scope(timeout):
+                    return self._run_pipeline(user_query, session_id, user_context, record)
+            except Exception as e:
+                print(f"{log_prefix()}Error processing query: {e}")
+                span.record_exception(e)
+                record_fallback("error_response")
+                return self._error_response(session_id, user_query)
+
+    def _run_pipeline(self,
+                      user_query: str,
+                      session_id: str,
+                      user_context: Dict[str, Any] = None,
+                      record: bool = True) -> Dict[str, Any]:
+        """
+        Answer from the FAQ store when possible, otherwise run the full
+        pipeline with the session's earlier turns, then queue the session's
+        summary update
+        """
+        started = time.perf_counter()
+        faq_entry = self.faq_store.lookup(user_query) if self.faq_store else None
+        if faq_entry:
+            current_span().set_attribute("faq_hit", True)
+            response = self._faq_response(session_id, user_query, faq_entry, started, record)
+        else:
+            conversation = ""
+            if self.memory is not None and record:
+                with stage_timer("context"):
+                    conversation = self.memory.context(session_id)
+            answer = self.answer_query(user_query, user_context, conversation)
+            response = self._record_answer(session_id, user_query, answer, started, record)
+
+        if not record:
+            return response
+        if self.memory is not None:
+            # Queued behind this turn's history write, so the summary sees it
+            self.background.submit("summary", self.memory.schedule, session_id)
+        if self.typeahead is not None:
+            self.background.submit("typeahead", self.typeahead.record_query, user_query)
+        return response
+
+    def _record_answer(self,
+                       session_id: str,
+                       user_query: str,
+                       answer: Dict[str, Any],
+                       started: float = None,
+                       record: bool = True) -> Dict[str, Any]:
+        """Store the exchange and format the final response (steps 8-9)"""
+        intent_data = answer["intent"]
+        all_results = answer["results"]
+        response_data = answer["response"]
+
+        # Step 8: Store conversation
+        conversation_entry = {
+            "timestamp": datetime.now().isoformat(),
+            "user_query": user_query,
+            "intent": intent_data,
+            "response": response_data,
+            "search_results_count": len(all_results),
+            "source_ids": self._source_ids(all_results),
+            "degraded": answer["degraded"],
+            "prompt_tokens": response_data.get("prompt_tokens")
+        }
+        if record:
+            self._store_turn(session_id, conversation_entry, started)
 
-        # Initialize conversation history for new sessions
-        if session_id not in self.conversation_history:
-            self.conversation_history[session_id] = []
+        # Step 9: Format final response
+        final_response = {
+            "session_id": session_id,
+            "response": response_data.get("response", "I'm sorry, I couldn't generate a proper response."),
+            "confidence": response_data.get("confidence", 0.5),
+            "intent": intent_data,
+            "suggested_actions": response_data.get("suggested_actions", []),
+            "escalate": response_data.get("escalate", False),
+            "follow_up_questions": response_data.get("follow_up_questions", []),
+            "sources": self._format_sources(all_results[:2]),  # Top 2 sources
+            "timestamp": datetime.now().isoformat(),
+            "degraded": answer["degraded"],
+            "trace_id": current_trace_id()
+        }
 
-        try:
-            # Step 1: Analyze user intent
+        return final_response
+
+    def answer_query(self,
+                     user_query: str,
+                     user_context: Dict[str, Any] = None,
+                     conversation: str = "") -> Dict[str, Any]:
+        """
+        Run intent analysis, retrieval and generation (steps 1-7) without
+        touching conversation state; `conversation` is the earlier context
+        for the prompt. Returns intent, raw search results,
+        the generated response and whether any dependency was degraded.
+        """
+        # Step 1: Analyze user intent
+        with stage_timer("intent"):
             intent_data = self.ai_client.analyze_intent(user_query)
 
-            # Step 2: Enhance search query
-            enhanced_query = self.ai_client.enhance_search_query(user_query, intent_data)
+        # Step 2: Enhance search query
+        enhanced_query = self.ai_client.enhance_search_query(user_query, intent_data)
 
-            # Step 3: Generate query embedding
+        # Step 3: Generate query embedding
+        with stage_timer("embedding"):
             query_embedding = self.ai_client.generate_embedding(user_query)
 
-            # Step 4: Search knowledge base
-            kb_results = self.elastic_client.hybrid_search(
-                query=enhanced_query,
-                query_embedding=query_embedding,
-                index=Config.KNOWLEDGE_BASE_INDEX,
-                size=5
-            )
-
-            # Step 5: Search support tickets for similar issues
-            ticket_results = self.elastic_client.hybrid_search(
-                query=enhanced_query,
-                query_embedding=query_embedding,
-                index=Config.SUPPORT_TICKETS_INDEX,
-                size=3
-            )
+        # Steps 4-5: Search knowledge base (best passage per article when
+        # chunked), narrowed to the intent's categories when the intent is
+        # confident, then support tickets unless the KB answer is decisive
+        with stage_timer("search"):
+            kb_search = self._kb_search(enhanced_query, query_embedding, intent_data)
+            short_on_time = budget_below(Config.DEADLINE_SEARCH_MIN_SECONDS)
+            if short_on_time:
+                # Fewer KB hits and no ticket search when the budget is nearly spent
+                record_fallback("deadline_search")
+                kb_search["size"] = 3
+            kb_results = self._search(kb_search)
+            if short_on_time or self._kb_decisive(kb_results, intent_data):
+                ticket_results = {"hits": {"hits": []}, "skipped": True}
+            else:
+                ticket_results = self._search(self._ticket_search(enhanced_query, query_embedding, intent_data))
+
+        return self._complete_answer(user_query, intent_data, kb_results, ticket_results, user_context,
+                                     conversation)
+
+    def _kb_search(self,
+                   enhanced_query: str,
+                   query_embedding: List[float],
+                   intent_data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """hybrid_search arguments for the knowledge base leg"""
+        if Config.SEARCH_USE_CHUNKS:
+            return {
+                "query": enhanced_query,
+                "query_embedding": query_embedding,
+                "index": Config.KNOWLEDGE_BASE_CHUNKS_INDEX,
+                "size": 5,
+                "collapse_field": "parent_id",
+                **self._category_options(intent_data)
+            }
+        return {
+            "query": enhanced_query,
+            "query_embedding": query_embedding,
+            "index": Config.KNOWLEDGE_BASE_INDEX,
+            "size": 5,
+            **self._category_options(intent_data)
+        }
 
-            # Step 6: Combine search results
-            all_results = self._combine_search_results(kb_results, ticket_results)
+    def _ticket_search(self,
+                       enhanced_query: str,
+                       query_embedding: List[float],
+                       intent_data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """hybrid_search arguments for the support ticket leg"""
+        return {
+            "query": enhanced_query,
+            "query_embedding": query_embedding,
+            "index": Config.SUPPORT_TICKETS_INDEX,
+            "size": 3,
+            **self._category_options(intent_data)
+        }
 
-            # Step 7: Generate response using AI
-            response_data = self.ai_client.generate_response(
+    def _category_options(self, intent_data: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Filter on the intent's categories when confident, boost them when less so"""
+        if not Config.SEARCH_INTENT_FILTERS or not intent_data:
+            return {}
+        categories = INTENT_CATEGORIES.get(intent_data.get("intent"))
+        if not categories:
+            return {}
+        confidence = intent_data.get("confidence", 0.5)
+        if confidence >= Config.SEARCH_FILTER_MIN_CONFIDENCE:
+            return {"filter_categories": categories}
+        if confidence >= Config.SEARCH_BOOST_MIN_CONFIDENCE:
+            return {"boost_categories": categories}
+        return {}
+
+    def _kb_decisive(self, kb_results: Dict[str, Any], intent_data: Dict[str, Any] = None) -> bool:
+        """Whether the top KB hit leads by enough that similar tickets would not change the answer"""
+        hits = kb_results.get("hits", {}).get("hits", [])
+        if not Config.SEARCH_EARLY_EXIT or kb_results.get("degraded") or not hits:
+            return False
+
+        intent = (intent_data or {}).get("intent")
+        # Bounded label set for metrics
+        intent = intent if intent in INTENT_CATEGORIES or intent == "general" else "other"
+        top = hits[0].get("_score") or 0.0
+        # A lone hit has no runner-up to lead, however weak it is
+        runner_up = (hits[1].get("_score") or 0.0) if len(hits) > 1 else top
+        margin = (top - runner_up) / top if top > 0 else 0.0
+        threshold = Config.SEARCH_EARLY_EXIT_INTENT_MARGINS.get(intent, Config.SEARCH_EARLY_EXIT_MARGIN)
+        decisive = len(hits) > 1 and top >= Config.SEARCH_EARLY_EXIT_MIN_SCORE and margin >= threshold
+
+        record_ticket_leg(intent, margin, decisive)
+        span = current_span()
+        span.set_attribute("intent", intent)
+        span.set_attribute("kb_margin", round(margin, 3))
+        span.set_attribute("ticket_leg", "skipped" if decisive else "ran")
+        return decisive
+
+    def _too_few_hits(self, search: Dict[str, Any], results: Dict[str, Any]) -> bool:
+        """Whether a category-filtered search came back too thin to trust"""
+        return (bool(search.get("filter_categories")) and not results.get("degraded")
+                and len(results.get("hits", {}).get("hits", [])) < Config.SEARCH_FILTER_MIN_HITS)
+
+    def _unfiltered(self, search: Dict[str, Any]) -> Dict[str, Any]:
+        """The same search over the whole index, still preferring the intent's categories"""
+        search = dict(search)
+        search["boost_categories"] = search.pop("filter_categories")
+        return search
+
+    def _search(self, search: Dict[str, Any]) -> Dict[str, Any]:
+        """Run one hybrid search, retrying without the category filter if it finds too little"""
+        results = self.elastic_client.hybrid_search(**search)
+        if self._too_few_hits(search, results):
+            record_fallback("unfiltered_search")
+            results = self.elastic_client.hybrid_search(**self._unfiltered(search))
+        return results
+
+    def _complete_answer(self,
+                         user_query: str,
+                         intent_data: Dict[str, Any],
+                         kb_results: Dict[str, Any],
+                         ticket_results: Dict[str, Any],
+                         user_context: Dict[str, Any] = None,
+                         conversation: str = "") -> Dict[str, Any]:
+        """Combine search results and generate the response (steps 6-7)"""
+        # Step 6: Combine search results
+        all_results = self._combine_search_results(kb_results, ticket_results)
+
+        # Step 7: Generate response using AI (or a cached answer while degraded)
+        search_degraded = kb_results.get("degraded", False) or ticket_results.get("degraded", False)
+        with stage_timer("generation"):
+            response_data = self._generate_response(
                 user_query=user_query,
                 search_results=all_results,
-                user_context=user_context
+                user_context=user_context,
+                search_degraded=search_degraded,
+                conversation=conversation
             )
 
-            # Step 8: Store conversation
-            conversation_entry = {
+        return {
+            "intent": intent_data,
+            "results": all_results,
+            "response": response_data,
+            "degraded": response_data.get("degraded", False) or search_degraded
+        }
+
+    def process_batch(self,
+                      items: Iterable[Dict[str, Any]],
+                      concurrency: int = None,
+                      chunk_size: int = None,
+                      traceparent: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        Answer many queries for offline processing. Each chunk embeds all its
+        queries in one batched call and runs every search in one multi-search;
+        intent analysis and generation run with bounded parallelism. Results
+        are yielded as they finish, tagged with the item's input index, and a
+        failing item yields an error entry instead of stopping the batch.
+        The whole batch is one trace.
+        """
+        concurrency = concurrency or Config.BATCH_CONCURRENCY
+        chunk_size = chunk_size or Config.BATCH_CHUNK_SIZE
+        numbered = enumerate(items)
+
+        # The generator may resume on a different thread at each step (as under
+        # StreamingResponse), so its span lives in a context of its own that
+        # pool workers run in copies of
+        context = contextvars.copy_context()
+        span = context.run(TRACER.start_span, "SupportAgent.process_batch", traceparent=traceparent)
+        context.run(span.__enter__)
+        error = None
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                while True:
+                    chunk = list(islice(numbered, chunk_size))
+                    if not chunk:
+                        break
+                    yield from self._process_chunk(chunk, pool, context)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            context.run(span.__exit__, type(error) if error else None, error, None)
+
+    def _process_chunk(self,
+                       chunk: List[tuple],
+                       pool: ThreadPoolExecutor,
+                       context: contextvars.Context) -> Iterator[Dict[str, Any]]:
+        """Run one chunk of a batch through the pipeline, inside the batch's trace context"""
+        started = time.perf_counter()
+        pending = []
+        for index, item in chunk:
+            query = (item.get("message") or "").strip() if isinstance(item, dict) else ""
+            if not query:
+                yield {"index": index, "error": "Item has no message"}
+                continue
+            session_id = item.get("session_id") or str(uuid.uuid4())
+            faq_entry = self.faq_store.lookup(query) if self.faq_store else None
+            if faq_entry:
+                yield {"index": index, **self._faq_response(session_id, query, faq_entry, started)}
+                continue
+            pending.append((index, query, session_id, item.get("user_context")))
+        if not pending:
+            return
+
+        queries = [query for _, query, _, _ in pending]
+
+        def retrieve():
+            # Steps 1-3: intents in parallel while all queries embed in one batched call
+            with stage_timer("batch_analysis"):
+                embeddings_future = pool.submit(_run_in, context, self.ai_client.batch_generate_embeddings, queries)
+                intent_futures = [pool.submit(_run_in, context, self.ai_client.analyze_intent, query)
+                                  for query in queries]
+                intents = [future.result() for future in intent_futures]
+                embeddings = embeddings_future.result()
+            enhanced = [self.ai_client.enhance_search_query(query, intent) for query, intent in zip(queries, intents)]
+
+            # Steps 4-5: every knowledge base and ticket search in one round trip
+            searches = []
+            for enhanced_query, embedding, intent in zip(enhanced, embeddings, intents):
+                searches.append(self._kb_search(enhanced_query, embedding, intent))
+                searches.append(self._ticket_search(enhanced_query, embedding, intent))
+            with stage_timer("search"):
+                responses = self.elastic_client.multi_search(searches)
+                # Thin filtered results are retried unfiltered, again in one round trip
+                retry = [i for i, (search, results) in enumerate(zip(searches, responses))
+                         if self._too_few_hits(search, results)]
+                if retry:
+                    record_fallback("unfiltered_search", len(retry))
+                    retried = self.elastic_client.multi_search([self._unfiltered(searches[i]) for i in retry])
+                    for i, results in zip(retry, retried):
+                        responses[i] = results
+            return intents, responses
+
+        try:
+            intents, responses = context.run(retrieve)
+        except Exception as e:
+            print(f"{context.run(log_prefix)}Error processing batch chunk: {e}")
+            record_fallback("error_response", len(pending))
+            for index, query, _, _ in pending:
+                yield {"index": index, "error": f"Retrieval failed: {e}"}
+            return
+
+        def finish(position: int) -> Dict[str, Any]:
+            index, query, session_id, user_context = pending[position]
+            answer = self._complete_answer(query, intents[position], responses[2 * position],
+                                           responses[2 * position + 1], user_context)
+            return self._record_answer(session_id, query, answer, started)
+
+        # Steps 6-9 per item, with bounded parallel generation
+        futures = {pool.submit(_run_in, context, finish, position): position for position in range(len(pending))}
+        for future in as_completed(futures):
+            index = pending[futures[future]][0]
+            try:
+                yield {"index": index, **future.result()}
+            except Exception as e:
+                print(f"{context.run(log_prefix)}Error processing batch item {index}: {e}")
+                record_fallback("error_response")
+                yield {"index": index, "error": str(e)}
+
+    def _generate_response(self,
+                           user_query: str,
+                           search_results: List[Dict[str, Any]],
+                           user_context: Dict[str, Any] = None,
+                           search_degraded: bool = False,
+                           conversation: str = "") -> Dict[str, Any]:
+        """Generate a response, serving cached answers while a dependency is down or time is short"""
+        if self.llm_breaker.is_open or search_degraded or budget_below(Config.DEADLINE_GENERATION_MIN_SECONDS):
+            cached = self.response_cache.get(user_query)
+            if cached:
+                record_fallback("cached_response")
+                cached["degraded"] = True
+                return cached
+
+        response_data = self.ai_client.generate_response(
+            user_query=user_query,
+            search_results=search_results,
+            user_context=user_context,
+            conversation=conversation
+        )
+        if response_data.get("degraded"):
+            record_fallback("canned_response")
+
+        # Only cache full-quality answers that stand on their own, so outages
+        # never poison the cache and follow-ups are not served out of context
+        if not (search_degraded or conversation or response_data.get("degraded") or response_data.get("escalate")
+                or response_data.get("truncated")):
+            self.background.submit("response_cache", self.response_cache.put, user_query, response_data)
+
+        return response_data
+
+    def _faq_response(self,
+                      session_id: str,
+                      user_query: str,
+                      entry: Dict[str, Any],
+                      started: float = None,
+                      record: bool = True) -> Dict[str, Any]:
+        """Serve a precomputed answer from the FAQ store"""
+        response_data = entry["response"]
+        if record:
+            self._store_turn(session_id, {
                 "timestamp": datetime.now().isoformat(),
                 "user_query": user_query,
-                "intent": intent_data,
+                "intent": entry["intent"],
                 "response": response_data,
-                "search_results_count": len(all_results)
-            }
-            self.conversation_history[session_id].append(conversation_entry)
-
-            # Step 9: Format final response
-            final_response = {
-                "session_id": session_id,
-                "response": response_data.get("response", "I'm sorry, I couldn't generate a proper response."),
-                "confidence": response_data.get("confidence", 0.5),
-                "intent": intent_data,
-                "suggested_actions": response_data.get("suggested_actions", []),
-                "escalate": response_data.get("escalate", False),
-                "follow_up_questions": response_data.get("follow_up_questions", []),
-                "sources": self._format_sources(all_results[:2]),  # Top 2 sources
-                "timestamp": datetime.now().isoformat()
-            }
+                "search_results_count": len(entry["sources"]),
+                "source_ids": self._source_ids(entry["sources"]),
+                "faq": entry["question"]
+            }, started)
 
-            return final_response
+        return {
+            "session_id": session_id,
+            "response": response_data.get("response", ""),
+            "confidence": response_data.get("confidence", 0.5),
+            "intent": entry["intent"],
+            "suggested_actions": response_data.get("suggested_actions", []),
+            "escalate": response_data.get("escalate", False),
+            "follow_up_questions": response_data.get("follow_up_questions", []),
+            "sources": self._format_sources(entry["sources"][:2]),
+            "timestamp": datetime.now().isoformat(),
+            "degraded": False,
+            "trace_id": current_trace_id()
+        }
 
-        except Exception as e:
-            print(f"Error processing query: {e}")
-            return self._error_response(session_id, user_query)
+    def _store_turn(self, session_id: str, entry: Dict[str, Any], started: float = None):
+        """Queue a turn for the session history and the analytics store"""
+        if started is not None:
+            entry["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        # History is never dropped: when the queue is full it is written inline
+        self.background.enqueue("history", self.state.append_turns, (session_id, entry), required=True)
+        self.background.enqueue("analytics", self._append_analytics, (session_id, entry))
+
+    def _append_analytics(self, turns: List[tuple]):
+        for session_id, entry in turns:
+            self.turns.append(session_id, entry)
+
+    def _source_ids(self, search_results: List[Dict[str, Any]]) -> List[str]:
+        """Article or ticket ids behind an answer, chunks mapped to their article"""
+        ids = []
+        for result in search_results:
+            source_id = result.get("_source", {}).get("parent_id") or result.get("_id")
+            if source_id is not None and str(source_id) not in ids:
+                ids.append(str(source_id))
+        return ids
 
     def get_conversation_history(self, session_id: str) -> List[Dict]:
         """Get conversation history for a session"""
-        return self.conversation_history.get(session_id, [])
+        return self.state.get_history(session_id)
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait for queued history, analytics and cache writes, then flush analytics segments"""
+        drained = self.background.drain(timeout)
+        self.turns.flush()
+        return drained
 
     def _combine_search_results(self,
                                kb_results: Dict[str, Any],
@@ -154,55 +610,14 @@ class SupportAgent:
             "follow_up_questions": [],
             "sources": [],
             "timestamp": datetime.now().isoformat(),
+            "trace_id": current_trace_id(),
             "error": True
         }
 
     def get_suggested_questions(self) -> List[str]:
         """Get list of suggested questions for users"""
-        return [
-            "How do I reset my password?",
-            "Why was I charged twice this month?",
-            "How can I integrate CloudFlow with Slack?",
-            "My dashboard is loading slowly, what should I do?",
-            "How do I manage team permissions?",
-            "How can I cancel my subscription?",
-            "How do I export my project data?",
-            "How do I set up two-factor authentication?"
-        ]
-
-    def analyze_conversation_trends(self) -> Dict[str, Any]:
-        """Analyze conversation trends across all sessions"""
-        total_conversations = sum(len(history) for history in self.conversation_history.values())
-        if total_conversations == 0:
-            return {"total_conversations": 0}
-
-        intents = []
-        confidence_scores = []
-        escalations = 0
-
-        for session_history in self.conversation_history.values():
-            for entry in session_history:
-                intent_data = entry.get("intent", {})
-                response_data = entry.get("response", {})
-
-                intents.append(intent_data.get("intent", "unknown"))
-                confidence_scores.append(response_data.get("confidence", 0))
-                if response_data.get("escalate", False):
-                    escalations += 1
-
-        # Calculate metrics
-        avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
-        escalation_rate = (escalations / total_conversations) * 100 if total_conversations > 0 else 0
-
-        # Count intent categories
-        intent_counts = {}
-        for intent in intents:
-            intent_counts[intent] = intent_counts.get(intent, 0) + 1
+        return list(SUGGESTED_QUESTIONS)
 
-        return {
-            "total_conversations": total_conversations,
-            "average_confidence": round(avg_confidence, 2),
-            "escalation_rate": round(escalation_rate, 2),
-            "top_intents": sorted(intent_counts.items(), key=lambda x: x[1], reverse=True)[:5],
-            "active_sessions": len(self.conversation_history)
-        }
\ No newline at end of file
+    def analyze_conversation_trends(self, hours: float = None) -> Dict[str, Any]:
+        """Analyze conversation trends across all sessions, optionally over the last few hours"""
+        return self.turns.summary(since=time.time() - hours * 3600 if hours else None)
\ No newline at end of file
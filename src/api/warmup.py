@@ -0,0 +1,97 @@
+"""
+Startup warm-up: initializes model clients, caches vectors for suggested
+and demo questions and opens search connections before a worker takes
+traffic, so new replicas start at steady-state latency.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any
+from ..config import Config
+from ..data.sample_data import DEMO_SCENARIOS
+from ..monitoring import log_prefix
+
+
+def warmup_queries(agent) -> List[str]:
+    """Suggested and demo questions, without duplicates"""
+    queries = list(agent.get_suggested_questions()) + [scenario["query"] for scenario in DEMO_SCENARIOS]
+    return list(dict.fromkeys(queries))
+
+
+class Warmup:
+    def __init__(self, agent, queries: List[str] = None, generations: int = None, connections: int = 8):
+        self.agent = agent
+        self.queries = queries if queries is not None else warmup_queries(agent)
+        self.generations = Config.WARMUP_GENERATIONS if generations is None else generations
+        self.connections = connections
+        self.ready = threading.Event()
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self.duration = None
+
+    def _step(self, name: str, func, *args):
+        """Run one warm-up step, recording its duration; failures only degrade warm-up"""
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+            self.steps[name] = {"ok": True, "count": result}
+        except Exception as e:
+            print(f"{log_prefix()}Warm-up step {name} failed: {e}")
+            self.steps[name] = {"ok": False, "error": str(e)}
+        self.steps[name]["seconds"] = round(time.perf_counter() - start, 3)
+
+    def _embed(self) -> int:
+        # Fills the embedding cache, so these questions never wait on the model
+        return len(self.agent.ai_client.batch_generate_embeddings(self.queries))
+
+    def _search(self) -> int:
+        # Parallel searches open several pooled connections and warm Elasticsearch caches
+        ai_client = self.agent.ai_client
+
+        def search(query: str):
+            embedding = ai_client.generate_embedding(query)
+            self.agent.elastic_client.hybrid_search(**self.agent._kb_search(query, embedding))
+            self.agent.elastic_client.hybrid_search(**self.agent._ticket_search(query, embedding))
+
+        with ThreadPoolExecutor(max_workers=max(1, min(self.connections, len(self.queries)))) as pool:
+            list(pool.map(search, self.queries))
+        return len(self.queries)
+
+    def _generate(self) -> int:
+        # A few full model calls initialize generation clients and prompt paths
+        ai_client = self.agent.ai_client
+        queries = self.queries[:self.generations]
+        for query in queries:
+            ai_client.analyze_intent(query)
+            ai_client.generate_response(query, [])
+        return len(queries)
+
+    def run(self) -> Dict[str, Any]:
+        """Run every step, then mark the worker ready"""
+        start = time.perf_counter()
+        try:
+            self._step("embeddings", self._embed)
+            self._step("search", self._search)
+            self._step("generation", self._generate)
+        finally:
+            self.duration = round(time.perf_counter() - start, 3)
+            print(f"{log_prefix()}Warm-up finished in {self.duration:.1f}s "
+                  f"({len(self.queries)} queries, {self.generations} generations)")
+            self.ready.set()
+        return self.status()
+
+    def start(self) -> threading.Thread:
+        """Run warm-up in a background thread"""
+        thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def skip(self):
+        self.steps = {}
+        self.ready.set()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready.is_set(),
+            "duration_seconds": self.duration,
+            "steps": dict(self.steps)
+        }
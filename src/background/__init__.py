@@ -0,0 +1,3 @@
+from .task_queue import BackgroundQueue, get_background_queue, close_background_queue, queue_stats
+
+__all__ = ["BackgroundQueue", "get_background_queue", "close_background_queue", "queue_stats"]
@@ -0,0 +1,175 @@
+"""
+In-process queue for side effects a response does not wait on: history and
+analytics writes, cache fills and trace export. One worker thread runs tasks
+in submission order, handing consecutive tasks of the same kind to their
+handler as one batch. The queue is bounded; when it is full, required work
+runs inline and the rest is dropped.
+"""
+import queue
+import threading
+import time
+from itertools import groupby
+from typing import Any, Callable, List, Optional
+from ..config import Config
+from ..monitoring import record_background, BACKGROUND_TASK_LATENCY
+
+_STOP = object()
+
+
+def _call_each(calls: List[tuple]):
+    """Handler for single calls queued with submit(); one failure does not skip the rest"""
+    for func, args, kwargs in calls:
+        try:
+            func(*args, **kwargs)
+        except Exception as e:
+            print(f"Background call {getattr(func, '__qualname__', func)} failed: {e}")
+
+
+class BackgroundQueue:
+    def __init__(self, name: str = "background", max_size: int = None, batch_size: int = None):
+        self.name = name
+        self.max_size = max_size or Config.BACKGROUND_QUEUE_SIZE
+        self.batch_size = batch_size or Config.BACKGROUND_BATCH_SIZE
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._idle = threading.Condition()
+        self._unfinished = 0
+        self._closed = False
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _ensure_started(self):
+        # Started on first use, so a pre-forking server starts it in each worker
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._work, name=f"{self.name}-queue", daemon=True)
+                    self._thread.start()
+
+    def enqueue(self, kind: str, handler: Callable[[List[Any]], None], item: Any, required: bool = False) -> bool:
+        """
+        Queue `item` for `handler`, which receives a list of items of the same
+        kind. Returns False if the item was dropped because the queue is full.
+        """
+        if self._closed or not Config.BACKGROUND_QUEUE_ENABLED:
+            self._run(kind, handler, [item])
+            return True
+
+        self._ensure_started()
+        with self._idle:
+            self._unfinished += 1
+        try:
+            self._queue.put_nowait((kind, handler, item))
+        except queue.Full:
+            self._task_done(1)
+            if required:
+                record_background(self.name, kind, "inline")
+                self._run(kind, handler, [item])
+                return True
+            record_background(self.name, kind, "dropped")
+            return False
+        return True
+
+    def submit(self, kind: str, func: Callable, *args, required: bool = False, **kwargs) -> bool:
+        """Queue a single call func(*args, **kwargs)"""
+        return self.enqueue(kind, _call_each, (func, args, kwargs), required)
+
+    def _run(self, kind: str, handler: Callable[[List[Any]], None], items: List[Any]):
+        start = time.perf_counter()
+        try:
+            handler(items)
+            record_background(self.name, kind, "done", len(items))
+        except Exception as e:
+            print(f"Background {kind} batch of {len(items)} failed: {e}")
+            record_background(self.name, kind, "failed", len(items))
+        BACKGROUND_TASK_LATENCY.observe(time.perf_counter() - start, kind=kind)
+
+    def _work(self):
+        while True:
+            tasks = [self._queue.get()]
+            while tasks[-1] is not _STOP and len(tasks) < self.batch_size:
+                try:
+                    tasks.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = tasks[-1] is _STOP
+            if stop:
+                tasks.pop()
+
+            # Consecutive tasks of one kind form a batch; order across kinds is kept
+            for (kind, handler), group in groupby(tasks, key=lambda task: (task[0], task[1])):
+                self._run(kind, handler, [task[2] for task in group])
+            self._task_done(len(tasks))
+            if stop:
+                return
+
+    def _task_done(self, count: int):
+        with self._idle:
+            self._unfinished -= count
+            if self._unfinished <= 0:
+                self._idle.notify_all()
+
+    def drain(self, timeout: float = None) -> bool:
+        """Wait until every queued task has run; False if the timeout passed first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._unfinished > 0:
+                left = None if deadline is None else deadline - time.monotonic()
+                if left is not None and left <= 0:
+                    return False
+                self._idle.wait(left)
+        return True
+
+    def close(self, timeout: float = None) -> bool:
+        """Run what is queued, then stop the worker; later work runs inline"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def left() -> Optional[float]:
+            return None if deadline is None else max(deadline - time.monotonic(), 0.0)
+
+        drained = self.drain(timeout)
+        self._closed = True
+        if not drained:
+            print(f"Background queue {self.name} closed with {self.depth} tasks still queued")
+        if self._thread is not None and self._thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=left())
+            except queue.Full:
+                # The worker is stuck in a slow handler; it is a daemon thread, so leave it
+                print(f"Background queue {self.name} is still full; abandoning its worker thread")
+                return drained
+            self._thread.join(left())
+        return drained
+
+
+_background: Optional[BackgroundQueue] = None
+_background_lock = threading.Lock()
+
+
+def get_background_queue() -> BackgroundQueue:
+    """The process-wide queue, created on first use"""
+    global _background
+    if _background is None:
+        with _background_lock:
+            if _background is None:
+                _background = BackgroundQueue()
+    return _background
+
+
+def close_background_queue(timeout: float = None) -> bool:
+    """Drain and stop the process-wide queue, e.g. on worker shutdown"""
+    global _background
+    with _background_lock:
+        background, _background = _background, None
+    return background.close(timeout) if background is not None else True
+
+
+def queue_stats() -> List[dict]:
+    """Depth and capacity of the process-wide queue; empty until it exists"""
+    background = _background
+    if background is None:
+        return []
+    return [{"queue": background.name, "depth": background.depth, "max": background.max_size}]
@@ -0,0 +1,15 @@
+from .runner import BenchmarkRunner, save_results, compare_results, print_report
+from .stubs import LatencyModel, StubLLMClient, StubSearchClient
+from .workload import build_workload, parse_mix
+
+__all__ = [
+    "BenchmarkRunner",
+    "save_results",
+    "compare_results",
+    "print_report",
+    "LatencyModel",
+    "StubLLMClient",
+    "StubSearchClient",
+    "build_workload",
+    "parse_mix",
+]
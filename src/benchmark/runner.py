@@ -0,0 +1,321 @@
+"""
+Load-testing harness for the chat path
+"""
+import json
+import math
+import os
+import platform
+import subprocess
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from ..config import Config
+from ..background import get_background_queue
+from ..monitoring import TRACER
+from ..monitoring.tracing import RingBufferExporter
+from .stubs import LatencyModel, StubLLMClient, StubSearchClient
+from .workload import build_workload, DEFAULT_MIX
+
+# Span names reported as pipeline stages
+STAGE_SPANS = {
+    "SupportAgent.process_query": "total",
+    "LLMClient.analyze_intent": "intent",
+    "LLMClient.generate_embedding": "embedding",
+    "ElasticSearchClient.hybrid_search": "search",
+    "LLMClient.generate_response": "generation",
+}
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct * len(ordered) / 100.0) - 1))
+    return ordered[rank]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 3),
+        "p50": round(percentile(values, 50), 3),
+        "p95": round(percentile(values, 95), 3),
+        "p99": round(percentile(values, 99), 3),
+        "max": round(max(values), 3)
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except Exception:
+        return None
+
+
+def _max_rss_kb() -> Optional[int]:
+    try:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except ImportError:
+        return None
+
+
+class BenchmarkRunner:
+    def __init__(self,
+                 target: str = "agent",
+                 concurrency: int = 4,
+                 total_requests: int = 200,
+                 mix: Dict[str, float] = None,
+                 llm_latency: float = 0.0,
+                 search_latency: float = 0.0,
+                 jitter: float = 0.0,
+                 seed: int = 42,
+                 url: str = None,
+                 warmup: int = 5,
+                 llm_backend: str = "stub"):
+        self.target = target
+        self.concurrency = concurrency
+        self.total_requests = total_requests
+        self.mix = mix or DEFAULT_MIX
+        self.llm_latency = llm_latency
+        self.search_latency = search_latency
+        self.jitter = jitter
+        self.seed = seed
+        self.url = url
+        self.warmup = warmup
+        self.llm_backend = llm_backend
+        self.llm_info = None
+        self.queries = build_workload(total_requests, self.mix, seed)
+
+    def _build_agent(self):
+        from ..api.support_agent import SupportAgent
+
+        if self.llm_backend == "stub":
+            ai_client = StubLLMClient(
+                intent_latency=LatencyModel(self.llm_latency, self.jitter, self.seed),
+                embedding_latency=LatencyModel(self.llm_latency / 4, self.jitter / 4, self.seed + 1),
+                generation_latency=LatencyModel(self.llm_latency * 2, self.jitter * 2, self.seed + 2)
+            )
+        else:
+            # A real backend through the same pipeline, so backends compare like for like
+            from ..ai import LLMClient, create_backend
+            ai_client = LLMClient(create_backend(self.llm_backend))
+        self.llm_info = ai_client.describe()
+        elastic_client = StubSearchClient(LatencyModel(self.search_latency, self.jitter, self.seed + 3))
+        return SupportAgent(elastic_client=elastic_client, ai_client=ai_client)
+
+    def _build_sender(self):
+        """Return a callable that sends one query to the configured target"""
+        if self.target == "agent":
+            agent = self._build_agent()
+            return lambda query: agent.process_query(query)
+
+        if self.target == "app":
+            from fastapi.testclient import TestClient
+            from ..api import main as api_main
+
+            # The app's lifespan keeps an agent that is already set
+            api_main.support_agent = self._build_agent()
+            # Every simulated user shares the test client's address, so the
+            # per-client rate limit would shed the benchmark's own load;
+            # run() restores the setting afterwards
+            Config.RATE_LIMIT_CLIENT_RPS = 0
+            client = TestClient(api_main.app)
+
+            def send(query):
+                response = client.post("/chat", json={"message": query})
+                response.raise_for_status()
+                return response.json()
+            return send
+
+        if self.target == "http":
+            import requests
+
+            session = requests.Session()
+            chat_url = self.url.rstrip("/") + "/chat"
+
+            def send(query):
+                response = session.post(chat_url, json={"message": query}, timeout=60)
+                response.raise_for_status()
+                return response.json()
+            return send
+
+        raise ValueError(f"Unknown benchmark target '{self.target}'")
+
+    def run(self) -> Dict[str, Any]:
+        """Run the workload and return the result document"""
+        previous_client_rps = Config.RATE_LIMIT_CLIENT_RPS
+        try:
+            return self._run()
+        finally:
+            Config.RATE_LIMIT_CLIENT_RPS = previous_client_rps
+
+    def _run(self) -> Dict[str, Any]:
+        send = self._build_sender()
+        for query in self.queries[:self.warmup]:
+            send(query)
+
+        # Capture every trace from this run in a dedicated exporter
+        exporter = RingBufferExporter(max_traces=self.total_requests + self.warmup)
+        previous_exporter, previous_rate = TRACER.exporter, TRACER.sample_rate
+        TRACER.exporter, TRACER.sample_rate = exporter, 1.0
+
+        latencies: List[float] = []
+        errors: List[str] = []
+        lock = threading.Lock()
+
+        def worker(query: str):
+            start = time.perf_counter()
+            try:
+                result = send(query)
+                failed = isinstance(result, dict) and result.get("error")
+            except Exception as e:
+                failed = str(e)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed_ms)
+                if failed:
+                    errors.append(failed if isinstance(failed, str) else "error_response")
+
+        tracemalloc.start()
+        memory_before, _ = tracemalloc.get_traced_memory()
+        started = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                list(pool.map(worker, self.queries))
+        finally:
+            wall_time = time.perf_counter() - started
+            # Traces are exported off the request path; wait for the last ones
+            get_background_queue().drain(Config.BACKGROUND_DRAIN_TIMEOUT)
+            memory_after, memory_peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            TRACER.exporter, TRACER.sample_rate = previous_exporter, previous_rate
+
+        stage_timings: Dict[str, List[float]] = {}
+        ticket_legs: Dict[str, List[int]] = {}
+        ticket_search_ms: List[float] = []
+        for trace in exporter.recent(len(self.queries) + self.warmup):
+            for span in trace["spans"]:
+                stage = STAGE_SPANS.get(span["name"])
+                if stage:
+                    stage_timings.setdefault(stage, []).append(span["durationMs"])
+                attributes = span.get("attributes", {})
+                if "ticket_leg" in attributes:
+                    counts = ticket_legs.setdefault(attributes.get("intent", "other"), [0, 0])
+                    counts[0 if attributes["ticket_leg"] == "skipped" else 1] += 1
+                if stage == "search" and attributes.get("index") == Config.SUPPORT_TICKETS_INDEX:
+                    ticket_search_ms.append(span["durationMs"])
+
+        return {
+            "meta": {
+                "commit": _git_commit(),
+                "timestamp": datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count()
+            },
+            "config": {
+                "target": self.target,
+                "concurrency": self.concurrency,
+                "requests": self.total_requests,
+                "mix": self.mix,
+                "llm_latency": self.llm_latency,
+                "search_latency": self.search_latency,
+                "jitter": self.jitter,
+                "seed": self.seed,
+                "llm": self.llm_info
+            },
+            "results": {
+                "wall_time_s": round(wall_time, 3),
+                "throughput_rps": round(len(latencies) / wall_time, 2) if wall_time else 0.0,
+                "errors": len(errors),
+                "error_samples": errors[:5],
+                "latency_ms": summarize(latencies),
+                "stages_ms": {stage: summarize(values) for stage, values in stage_timings.items()},
+                "early_exit": self._early_exit_summary(ticket_legs, ticket_search_ms),
+                "memory": {
+                    "traced_growth_kb": round((memory_after - memory_before) / 1024, 1),
+                    "traced_peak_kb": round(memory_peak / 1024, 1),
+                    "max_rss_kb": _max_rss_kb()
+                }
+            }
+        }
+
+
+    def _early_exit_summary(self, ticket_legs: Dict[str, List[int]], ticket_search_ms: List[float]) -> Dict[str, Any]:
+        """Share of ticket searches skipped, per intent, and the latency that saved"""
+        skipped = sum(counts[0] for counts in ticket_legs.values())
+        decided = sum(sum(counts) for counts in ticket_legs.values())
+        mean_ticket_ms = sum(ticket_search_ms) / len(ticket_search_ms) if ticket_search_ms else 0.0
+        return {
+            "skip_rate": round(skipped / decided, 3) if decided else 0.0,
+            "by_intent": {
+                intent: round(counts[0] / sum(counts), 3) for intent, counts in sorted(ticket_legs.items())
+            },
+            # Skipped searches priced at the mean latency of the ones that ran
+            "saved_ms_per_request": round(skipped * mean_ticket_ms / decided, 2) if decided else 0.0
+        }
+
+
+def save_results(results: Dict[str, Any], output: str = None) -> str:
+    """Write results as JSON, defaulting to benchmarks/results/<timestamp>-<commit>.json"""
+    if not output:
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        commit = results["meta"].get("commit") or "nocommit"
+        output = os.path.join("benchmarks", "results", f"{stamp}-{commit}.json")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    return output
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """Human-readable deltas between two result documents"""
+    lines = []
+
+    def delta(label, old, new, lower_is_better=True):
+        if not old:
+            return
+        change = (new - old) / old * 100
+        worse = change > 0 if lower_is_better else change < 0
+        marker = "⚠️" if worse and abs(change) >= 10 else "  "
+        lines.append(f"{marker} {label}: {old} -> {new} ({change:+.1f}%)")
+
+    old_results, new_results = baseline["results"], current["results"]
+    delta("throughput_rps", old_results["throughput_rps"], new_results["throughput_rps"], lower_is_better=False)
+    for pct in ("p50", "p95", "p99"):
+        delta(f"latency {pct} ms", old_results["latency_ms"].get(pct), new_results["latency_ms"].get(pct))
+    for stage, stats in new_results["stages_ms"].items():
+        old_stats = old_results["stages_ms"].get(stage, {})
+        delta(f"{stage} p95 ms", old_stats.get("p95"), stats.get("p95"))
+    delta("memory growth kb", old_results["memory"]["traced_growth_kb"], new_results["memory"]["traced_growth_kb"])
+    return lines
+
+
+def print_report(results: Dict[str, Any]):
+    config, res = results["config"], results["results"]
+    print(f"Target: {config['target']}  concurrency={config['concurrency']}  requests={config['requests']}")
+    llm = config.get("llm")
+    if llm:
+        print(f"LLM backend: {llm['backend']}  batch={llm['batch_enabled']}  stream={llm['stream_enabled']}")
+    print(f"Throughput: {res['throughput_rps']} req/s  errors={res['errors']}")
+    latency = res["latency_ms"]
+    print(f"Latency ms: p50={latency.get('p50')} p95={latency.get('p95')} p99={latency.get('p99')}")
+    for stage, stats in res["stages_ms"].items():
+        print(f"  {stage:<11} p50={stats.get('p50')} p95={stats.get('p95')} p99={stats.get('p99')} n={stats['count']}")
+    early_exit = res.get("early_exit")
+    if early_exit and early_exit["by_intent"]:
+        by_intent = ", ".join(f"{intent} {rate:.0%}" for intent, rate in early_exit["by_intent"].items())
+        print(f"Ticket search skipped: {early_exit['skip_rate']:.0%} ({by_intent}), "
+              f"~{early_exit['saved_ms_per_request']} ms saved per request")
+    memory = res["memory"]
+    print(f"Memory: growth={memory['traced_growth_kb']} KB peak={memory['traced_peak_kb']} KB")
@@ -0,0 +1,144 @@
+"""
+Stub LLM and search backends with injectable latency for benchmarking
+"""
+import copy
+import random
+import re
+import threading
+import time
+from typing import List, Dict, Any
+from ..ai import LLMClient
+from ..ai.backends.mock import MockBackend
+from ..config import Config
+from ..data.sample_data import KNOWLEDGE_BASE_DATA, SUPPORT_TICKETS_DATA
+from ..data.chunking import chunk_document
+from ..monitoring import traced, current_span
+
+
+class LatencyModel:
+    """Sleeps for a base latency plus uniform jitter, reproducibly seeded"""
+
+    def __init__(self, base: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.base = base
+        self.jitter = jitter
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if self.base <= 0 and self.jitter <= 0:
+            return
+        with self._lock:
+            delay = self.base + self._rng.uniform(0, self.jitter)
+        time.sleep(delay)
+
+
+class StubBackend(MockBackend):
+    """Deterministic mock backend that simulates model call latency per task"""
+    name = "stub"
+
+    def __init__(self,
+                 intent_latency: LatencyModel = None,
+                 embedding_latency: LatencyModel = None,
+                 generation_latency: LatencyModel = None):
+        self.intent_latency = intent_latency or LatencyModel()
+        self.embedding_latency = embedding_latency or LatencyModel()
+        self.generation_latency = generation_latency or LatencyModel()
+
+    def generate(self, prompt: str, temperature: float = 0.2, max_tokens: int = 1024, **hints) -> str:
+        if hints.get("task") == "intent":
+            self.intent_latency.wait()
+        else:
+            self.generation_latency.wait()
+        return super().generate(prompt, temperature, max_tokens, **hints)
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        # One round trip per request, however many texts it carries
+        self.embedding_latency.wait()
+        return super().embed(texts)
+
+
+class StubLLMClient(LLMClient):
+    """The full LLM pipeline (prompts, parsing, breaker) over StubBackend"""
+
+    def __init__(self,
+                 intent_latency: LatencyModel = None,
+                 embedding_latency: LatencyModel = None,
+                 generation_latency: LatencyModel = None):
+        super().__init__(backend=StubBackend(intent_latency, embedding_latency, generation_latency))
+
+
+def _tokenize(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+class StubSearchClient:
+    """In-memory keyword search over sample_data returning Elasticsearch-shaped hits"""
+
+    def __init__(self, latency: LatencyModel = None):
+        self.latency = latency or LatencyModel()
+        self.documents = {
+            Config.KNOWLEDGE_BASE_INDEX: KNOWLEDGE_BASE_DATA,
+            Config.SUPPORT_TICKETS_INDEX: SUPPORT_TICKETS_DATA,
+            Config.KNOWLEDGE_BASE_CHUNKS_INDEX: [
+                chunk for article in KNOWLEDGE_BASE_DATA for chunk in chunk_document(article)
+            ]
+        }
+        self._tokens = {
+            index: [set(_tokenize(" ".join(str(v) for v in doc.values()))) for doc in docs]
+            for index, docs in self.documents.items()
+        }
+
+    def list_titles(self, index: str, size: int = 10000) -> List[Dict[str, Any]]:
+        return [
+            {"id": doc["id"], "title": doc["title"], "category": doc.get("category")}
+            for doc in self.documents.get(index, [])[:size] if doc.get("title")
+        ]
+
+    @traced("ElasticSearchClient.hybrid_search")
+    def hybrid_search(self,
+                      query: str,
+                      query_embedding: List[float],
+                      index: str,
+                      size: int = 5,
+                      **options) -> Dict[str, Any]:
+        current_span().set_attribute("index", index)
+        self.latency.wait()
+        return self._search(query, index, size, **options)
+
+    @traced("ElasticSearchClient.multi_search")
+    def multi_search(self, searches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # One simulated round trip for the whole batch
+        self.latency.wait()
+        return [self._search(**search) for search in searches]
+
+    def _search(self, query: str, index: str, size: int = 5, query_embedding: List[float] = None,
+                **options) -> Dict[str, Any]:
+        """Keyword-overlap scoring shared by single and multi search"""
+        query_tokens = set(_tokenize(query))
+        filter_categories = options.get("filter_categories")
+        boost_categories = options.get("boost_categories") or []
+        scored = []
+        for doc, tokens in zip(self.documents.get(index, []), self._tokens.get(index, [])):
+            if filter_categories and doc.get("category") not in filter_categories:
+                continue
+            overlap = len(query_tokens & tokens)
+            if overlap:
+                boost = 1.25 if doc.get("category") in boost_categories else 1.0
+                scored.append((boost * overlap / (len(query_tokens) or 1), doc))
+        scored.sort(key=lambda pair: pair[0], reverse=True)
+
+        collapse_field = options.get("collapse_field")
+        if collapse_field:
+            seen = set()
+            collapsed = []
+            for score, doc in scored:
+                if doc.get(collapse_field) not in seen:
+                    seen.add(doc.get(collapse_field))
+                    collapsed.append((score, doc))
+            scored = collapsed
+
+        hits = [
+            {"_id": doc["id"], "_index": index, "_score": round(score * 2.5, 4), "_source": copy.deepcopy(doc)}
+            for score, doc in scored[:size]
+        ]
+        return {"hits": {"hits": hits}}
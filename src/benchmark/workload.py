@@ -0,0 +1,41 @@
+"""
+Query mixes drawn from the demo scenarios and sample data
+"""
+import random
+from typing import List, Dict
+from ..data.sample_data import (
+    KNOWLEDGE_BASE_DATA,
+    SUPPORT_TICKETS_DATA,
+    DEMO_SCENARIOS,
+    SUGGESTED_QUESTIONS,
+)
+
+QUERY_SOURCES = {
+    "demo": [scenario["query"] for scenario in DEMO_SCENARIOS],
+    "suggested": list(SUGGESTED_QUESTIONS),
+    "kb_titles": [item["title"] for item in KNOWLEDGE_BASE_DATA],
+    "tickets": [item["problem"] for item in SUPPORT_TICKETS_DATA],
+}
+
+DEFAULT_MIX = {"demo": 0.4, "suggested": 0.3, "kb_titles": 0.15, "tickets": 0.15}
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse a mix spec such as 'demo=0.5,tickets=0.5'"""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in QUERY_SOURCES:
+            raise ValueError(f"Unknown query source '{name}', expected one of {sorted(QUERY_SOURCES)}")
+        mix[name] = float(weight) if weight else 1.0
+    return mix
+
+
+def build_workload(total: int, mix: Dict[str, float] = None, seed: int = 42) -> List[str]:
+    """Draw a reproducible sequence of queries according to the mix weights"""
+    mix = mix or DEFAULT_MIX
+    rng = random.Random(seed)
+    sources = list(mix.keys())
+    weights = [mix[name] for name in sources]
+    return [rng.choice(QUERY_SOURCES[rng.choices(sources, weights)[0]]) for _ in range(total)]
@@ -0,0 +1,14 @@
+from .response_cache import ResponseCache, EmbeddingCache
+from .faq_store import FaqStore, FaqBuilder, content_hash, canonical_questions
+from .typeahead import TypeaheadIndex, TypeaheadBuilder
+
+__all__ = [
+    "ResponseCache",
+    "EmbeddingCache",
+    "FaqStore",
+    "FaqBuilder",
+    "content_hash",
+    "canonical_questions",
+    "TypeaheadIndex",
+    "TypeaheadBuilder",
+]
@@ -0,0 +1,235 @@
+"""
+Precomputed answers for suggested and demo questions, with exact/near-match lookup
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+from ..config import Config
+from ..monitoring import record_cache_lookup
+
+STOPWORDS = {
+    "a", "an", "the", "i", "my", "me", "we", "our", "you", "your", "do", "does", "did",
+    "is", "are", "was", "be", "to", "of", "in", "on", "for", "with", "and", "or", "it",
+    "this", "that", "can", "how", "what", "why", "should", "please", "help", "s"
+}
+
+
+def content_hash(doc: Dict[str, Any]) -> str:
+    """Version fingerprint of a KB article or ticket's searchable text"""
+    text = "\n".join(str(doc.get(field, "")) for field in ("title", "content", "problem", "solution", "category"))
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def _tokens(text: str) -> frozenset:
+    return frozenset(t for t in re.findall(r"[a-z0-9]+", text.lower()) if t not in STOPWORDS)
+
+
+class FaqStore:
+    def __init__(self, path: str = None, match_threshold: float = None):
+        self.path = path or Config.FAQ_STORE_PATH
+        self.match_threshold = match_threshold or Config.FAQ_MATCH_THRESHOLD
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # Lookup structures: normalized phrasing -> entry key, plus an
+        # inverted index from token -> phrasings for near matches
+        self._exact: Dict[str, str] = {}
+        self._phrase_tokens: Dict[str, frozenset] = {}
+        self._inverted: Dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def put(self, entry: Dict[str, Any]):
+        """Add or replace an entry and index its question and paraphrases"""
+        key = self.normalize(entry["question"])
+        with self._lock:
+            self._unindex(key)
+            self.entries[key] = entry
+            for phrase in [entry["question"]] + entry.get("paraphrases", []):
+                normalized = self.normalize(phrase)
+                tokens = _tokens(phrase)
+                self._exact[normalized] = key
+                self._phrase_tokens[normalized] = tokens
+                for token in tokens:
+                    self._inverted.setdefault(token, set()).add(normalized)
+
+    def _unindex(self, key: str):
+        """Drop lookup entries that point at `key` (lock held)"""
+        stale = [phrase for phrase, target in self._exact.items() if target == key]
+        for phrase in stale:
+            del self._exact[phrase]
+            for token in self._phrase_tokens.pop(phrase, ()):
+                self._inverted.get(token, set()).discard(phrase)
+
+    def get(self, question: str) -> Optional[Dict[str, Any]]:
+        """The entry for a question or one of its paraphrases, exact matches only"""
+        key = self._exact.get(self.normalize(question))
+        return self.entries.get(key) if key else None
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """Exact match on the normalized query, then best token-overlap match above threshold"""
+        if not self.entries:
+            return None
+
+        normalized = self.normalize(query)
+        with self._lock:
+            key = self._exact.get(normalized)
+            if key is None:
+                tokens = _tokens(query)
+                best_score = 0.0
+                candidates = set()
+                for token in tokens:
+                    candidates.update(self._inverted.get(token, ()))
+                for phrase in candidates:
+                    phrase_tokens = self._phrase_tokens[phrase]
+                    score = len(tokens & phrase_tokens) / len(tokens | phrase_tokens)
+                    if score > best_score:
+                        best_score, key = score, self._exact[phrase]
+                if best_score < self.match_threshold:
+                    key = None
+            entry = self.entries.get(key) if key else None
+
+        record_cache_lookup("faq", hit=entry is not None)
+        return entry
+
+    def referenced_documents(self) -> Dict[str, set]:
+        """Map index -> ids of every document some entry was built from"""
+        refs: Dict[str, set] = {}
+        for entry in self.entries.values():
+            for ref in entry["source_versions"]:
+                refs.setdefault(ref["index"], set()).add(ref["id"])
+        return refs
+
+    def stale_entries(self, current_versions: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Entries whose source documents changed or disappeared since they were built"""
+        stale = []
+        for entry in list(self.entries.values()):
+            if any(current_versions.get(ref["id"]) != ref["version"] for ref in entry["source_versions"]):
+                stale.append(entry)
+        return stale
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"entries": list(self.entries.values())}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    @classmethod
+    def load(cls, path: str = None) -> "FaqStore":
+        store = cls(path)
+        if os.path.exists(store.path):
+            with open(store.path) as f:
+                for entry in json.load(f).get("entries", []):
+                    store.put(entry)
+        return store
+
+
+class FaqBuilder:
+    """Runs the agent pipeline offline for canonical questions and stores the answers"""
+
+    def __init__(self, agent, store: FaqStore):
+        self.agent = agent
+        self.store = store
+
+    def build_entry(self, question: str, paraphrases: List[str] = None) -> Optional[Dict[str, Any]]:
+        answer = self.agent.answer_query(question)
+        response = answer["response"]
+        # Never freeze a degraded, escalated or truncated answer into the store
+        if answer["degraded"] or response.get("escalate") or response.get("truncated"):
+            print(f"Skipping FAQ entry for '{question}': pipeline returned a degraded answer")
+            return None
+
+        sources = []
+        source_versions = []
+        for hit in answer["results"]:
+            source = hit.get("_source", {})
+            doc_id = source.get("parent_id") or hit.get("_id")
+            sources.append({
+                "_id": doc_id,
+                "_score": hit.get("_score", 0),
+                "_source": {
+                    key: source.get(key)
+                    for key in ("title", "category", "problem", "result_type")
+                    if source.get(key) is not None
+                }
+            })
+            source_versions.append({
+                "id": doc_id,
+                "index": Config.SUPPORT_TICKETS_INDEX if source.get("result_type") == "support_ticket" else Config.KNOWLEDGE_BASE_INDEX,
+                "version": source.get("content_hash")
+            })
+
+        return {
+            "question": question,
+            "paraphrases": paraphrases or [],
+            "intent": answer["intent"],
+            "response": {k: v for k, v in response.items() if k not in ("degraded", "prompt_tokens")},
+            "sources": sources,
+            "source_versions": source_versions,
+            "built_at": datetime.now().isoformat()
+        }
+
+    def build(self, questions: Dict[str, List[str]]) -> int:
+        """Build entries for {canonical question: [paraphrases]} and persist the store"""
+        built = 0
+        for question, paraphrases in questions.items():
+            entry = self.build_entry(question, paraphrases)
+            if entry:
+                self.store.put(entry)
+                built += 1
+        self.store.save()
+        return built
+
+    def refresh(self) -> int:
+        """Rebuild entries whose referenced KB documents changed since they were built"""
+        versions = {}
+        for index, ids in self.store.referenced_documents().items():
+            versions.update(self.agent.elastic_client.get_content_hashes(index, sorted(ids)))
+
+        stale = self.store.stale_entries(versions)
+        rebuilt = 0
+        for entry in stale:
+            new_entry = self.build_entry(entry["question"], entry.get("paraphrases"))
+            if new_entry:
+                self.store.put(new_entry)
+                rebuilt += 1
+        if rebuilt:
+            self.store.save()
+            print(f"Rebuilt {rebuilt} of {len(stale)} stale FAQ answers")
+        return rebuilt
+
+    def start_auto_refresh(self, interval: float = None) -> threading.Event:
+        """Check for stale answers periodically on a daemon thread; set the event to stop"""
+        interval = interval or Config.FAQ_REFRESH_INTERVAL
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"FAQ refresh error: {e}")
+
+        threading.Thread(target=loop, name="faq-refresh", daemon=True).start()
+        return stop
+
+
+def canonical_questions() -> Dict[str, List[str]]:
+    """Suggested and demo questions with their known paraphrases"""
+    from ..data.sample_data import SUGGESTED_QUESTIONS, DEMO_SCENARIOS, FAQ_PARAPHRASES
+
+    questions = {question: list(FAQ_PARAPHRASES.get(question, [])) for question in SUGGESTED_QUESTIONS}
+    for scenario in DEMO_SCENARIOS:
+        questions.setdefault(scenario["query"], list(FAQ_PARAPHRASES.get(scenario["query"], [])))
+    return questions
@@ -0,0 +1,84 @@
+"""
+LRU cache of generated answers, used as a degraded-mode fallback. Kept in
+process memory, or in a shared state backend when running several workers.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from ..monitoring import record_cache_lookup
+
+
+class ResponseCache:
+    def __init__(self, name: str = "response", max_size: int = 512, ttl: float = 3600.0, backend=None):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        # Shared StateBackend; None keeps entries in this process only
+        self.backend = backend
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Normalize a query so trivial rephrasings share a cache key"""
+        return " ".join(re.findall(r"[a-z0-9]+", query.lower()))
+
+    def get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return a cached answer for the query, if fresh"""
+        key = self.normalize(query)
+        if self.backend is not None:
+            return self._shared_get(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                record_cache_lookup(self.name, hit=False)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            record_cache_lookup(self.name, hit=True)
+            return dict(entry[1])
+
+    def put(self, query: str, response: Dict[str, Any]):
+        """Store an answer, evicting the least recently used entry when full"""
+        key = self.normalize(query)
+        if self.backend is not None:
+            self.backend.cache_set(f"{self.name}:{key}", dict(response), self.ttl)
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), dict(response))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _shared_get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look the key up in the shared backend; expiry is handled there"""
+        entry = self.backend.cache_get(f"{self.name}:{key}")
+        hit = entry is not None
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+        record_cache_lookup(self.name, hit=hit)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class EmbeddingCache(ResponseCache):
+    """
+    Cache of embedding vectors keyed on the exact input text: a vector is
+    only reused for the text it was computed from, not a rephrasing
+    """
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
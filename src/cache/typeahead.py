@@ -0,0 +1,249 @@
+"""
+Typeahead suggestions from a prefix trie over suggested questions, KB
+titles and frequent past queries. Every node keeps its best completions, so
+a keystroke costs one walk down the typed prefix. Entries carry precomputed
+answers where the FAQ store has one, so a picked suggestion needs no /chat
+call.
+"""
+import math
+import re
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+from ..config import Config
+
+# Ranking weight of each kind of suggestion before popularity
+KIND_WEIGHTS = {"question": 3.0, "article": 2.0, "query": 1.0}
+# Matches that start mid-phrase (typing "slack" for "How can I integrate with Slack?") rank lower
+INNER_MATCH_FACTOR = 0.5
+_QUERY_SKIP = re.compile(r"@|\d{6,}")
+
+
+def normalize(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+class _Node:
+    __slots__ = ("children", "terminal", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # Entries whose indexed suffix ends at this node -> score
+        self.terminal: Dict[str, float] = {}
+        # Best (score, key) completions in this subtree, highest first
+        self.top: List[Tuple[float, str]] = []
+
+
+class TypeaheadIndex:
+    def __init__(self, node_size: int = None, max_depth: int = None, min_query_count: int = None,
+                 query_log_size: int = None):
+        self.node_size = node_size or Config.TYPEAHEAD_NODE_SIZE
+        self.max_depth = max_depth or Config.TYPEAHEAD_MAX_DEPTH
+        self.min_query_count = min_query_count or Config.TYPEAHEAD_MIN_QUERY_COUNT
+        self.query_log_size = query_log_size or Config.TYPEAHEAD_QUERY_LOG_SIZE
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        # Past queries seen fewer than min_query_count times, not yet suggested
+        self.query_counts: Dict[str, int] = {}
+        self._root = _Node()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _suffixes(self, key: str) -> List[Tuple[str, float]]:
+        """Indexed strings for an entry: the phrase and each later word onwards, with their factor"""
+        starts = [0] + [match.start() + 1 for match in re.finditer(" ", key)]
+        return [(key[start:start + self.max_depth], 1.0 if start == 0 else INNER_MATCH_FACTOR) for start in starts]
+
+    @staticmethod
+    def _extra(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in entry.items() if k not in ("text", "kind", "popularity")}
+
+    def _score(self, entry: Dict[str, Any]) -> float:
+        return KIND_WEIGHTS.get(entry["kind"], 1.0) * (1.0 + math.log1p(entry["popularity"]))
+
+    def _rank(self, node: _Node, score: float, key: str):
+        """Raise `key` to `score` in a node's completions (scores only grow here)"""
+        for existing, other in node.top:
+            if other == key and existing >= score:
+                return
+        if len(node.top) >= self.node_size and node.top[-1][0] > score:
+            return
+        top = [item for item in node.top if item[1] != key]
+        top.append((score, key))
+        top.sort(key=lambda item: (-item[0], item[1]))
+        node.top = top[:self.node_size]
+
+    def _insert(self, key: str, score: float):
+        for suffix, factor in self._suffixes(key):
+            node = self._root
+            self._rank(node, score * factor, key)
+            for char in suffix:
+                node = node.children.setdefault(char, _Node())
+                self._rank(node, score * factor, key)
+            node.terminal[key] = max(node.terminal.get(key, 0.0), score * factor)
+
+    def _delete(self, key: str):
+        """Drop every path of `key`, recomputing completions bottom-up from the children"""
+        for suffix, _ in self._suffixes(key):
+            path = [self._root]
+            for char in suffix:
+                child = path[-1].children.get(char)
+                if child is None:
+                    break
+                path.append(child)
+            path[-1].terminal.pop(key, None)
+            for depth in range(len(path) - 1, -1, -1):
+                node = path[depth]
+                best: Dict[str, float] = dict(node.terminal)
+                for child in node.children.values():
+                    for score, other in child.top:
+                        best[other] = max(best.get(other, 0.0), score)
+                node.top = sorted(((score, other) for other, score in best.items()),
+                                  key=lambda item: (-item[0], item[1]))[:self.node_size]
+                if depth and not node.top and not node.children:
+                    del path[depth - 1].children[suffix[depth - 1]]
+
+    def add(self, text: str, kind: str, popularity: float = 0.0, **extra) -> str:
+        """Add or update a suggestion; `extra` (answer, article_id) is returned with it"""
+        key = normalize(text)
+        if not key:
+            return key
+        with self._lock:
+            current = self.entries.get(key)
+            if current is not None and KIND_WEIGHTS.get(current["kind"], 1.0) > KIND_WEIGHTS.get(kind, 1.0):
+                # A curated question is not demoted by the same text arriving as a query
+                current["popularity"] = max(current["popularity"], popularity)
+                current.update(extra)
+                self._insert(key, self._score(current))
+                return key
+            entry = {"text": text.strip(), "kind": kind, "popularity": popularity, **extra}
+            if current is not None:
+                entry["popularity"] = max(current["popularity"], popularity)
+                if self._score(entry) < self._score(current):
+                    self._delete(key)
+            self.entries[key] = entry
+            self._insert(key, self._score(entry))
+        return key
+
+    def remove(self, text: str):
+        key = normalize(text)
+        with self._lock:
+            if self.entries.pop(key, None) is not None:
+                self._delete(key)
+
+    def sync(self, kind: str, items: Dict[str, Dict[str, Any]]):
+        """Make the entries of one kind match {text: extra}, adding and removing only what changed"""
+        wanted = {normalize(text): (text, extra) for text, extra in items.items() if normalize(text)}
+        with self._lock:
+            for key in [key for key, entry in self.entries.items() if entry["kind"] == kind and key not in wanted]:
+                del self.entries[key]
+                self._delete(key)
+            for key, (text, extra) in wanted.items():
+                current = self.entries.get(key)
+                if current is None or current["kind"] != kind or self._extra(current) != extra:
+                    self.add(text, kind, **extra)
+
+    def record_query(self, query: str):
+        """Count a query a user sent; repeated ones become suggestions and suggestions gain popularity"""
+        key = normalize(query)
+        if not 2 <= len(key.split()) <= 20 or _QUERY_SKIP.search(query):
+            return
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry["popularity"] += 1
+                self._insert(key, self._score(entry))
+                return
+            count = self.query_counts.get(key, 0) + 1
+            if count >= self.min_query_count:
+                self.query_counts.pop(key, None)
+                self.add(query, "query", popularity=count)
+                return
+            self.query_counts[key] = count
+            if len(self.query_counts) > self.query_log_size:
+                # Forget queries seen only once
+                self.query_counts = {k: v for k, v in self.query_counts.items() if v > 1}
+
+    def suggest(self, prefix: str, limit: int = 8) -> List[Dict[str, Any]]:
+        """Best completions for what has been typed so far"""
+        typed = normalize(prefix)
+        if not typed:
+            return []
+        with self._lock:
+            node = self._root
+            for char in typed[:self.max_depth]:
+                node = node.children.get(char)
+                if node is None:
+                    return []
+            results = []
+            for score, key in node.top:
+                # Beyond the indexed depth, check the rest of the prefix directly
+                if len(typed) > self.max_depth and not (key.startswith(typed) or f" {typed}" in key):
+                    continue
+                entry = self.entries[key]
+                results.append({
+                    "text": entry["text"],
+                    "kind": entry["kind"],
+                    "score": round(score, 3),
+                    **self._extra(entry)
+                })
+                if len(results) >= limit:
+                    break
+        return results
+
+
+class TypeaheadBuilder:
+    """Fills a TypeaheadIndex from the suggested questions, FAQ answers and KB titles and keeps it current"""
+
+    def __init__(self, agent, index: TypeaheadIndex):
+        self.agent = agent
+        self.index = index
+
+    def _answer(self, question: str) -> Optional[Dict[str, Any]]:
+        """The FAQ store's precomputed answer, shaped like a /chat response"""
+        store = self.agent.faq_store
+        entry = store.get(question) if store is not None else None
+        if entry is None:
+            return None
+        return {
+            **entry["response"],
+            "intent": entry["intent"],
+            "sources": self.agent._format_sources(entry["sources"][:2]),
+            "faq": entry["question"]
+        }
+
+    def refresh(self) -> int:
+        """Sync questions and KB titles; returns the number of suggestions"""
+        questions = list(self.agent.get_suggested_questions())
+        if self.agent.faq_store is not None:
+            questions += [entry["question"] for entry in list(self.agent.faq_store.entries.values())]
+        self.index.sync("question", {
+            question: {"answer": answer} if (answer := self._answer(question)) else {}
+            for question in dict.fromkeys(questions)
+        })
+
+        try:
+            titles = self.agent.elastic_client.list_titles(Config.KNOWLEDGE_BASE_INDEX)
+        except Exception as e:
+            # Keep the current titles until the index answers again
+            print(f"Typeahead KB title refresh failed: {e}")
+        else:
+            self.index.sync("article", {
+                doc["title"]: {"article_id": doc["id"], "category": doc.get("category")} for doc in titles
+            })
+        return len(self.index)
+
+    def start_auto_refresh(self, interval: float = None) -> threading.Event:
+        """Re-sync periodically on a daemon thread; set the event to stop"""
+        interval = interval or Config.TYPEAHEAD_REFRESH_INTERVAL
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Typeahead refresh error: {e}")
+
+        threading.Thread(target=loop, name="typeahead-refresh", daemon=True).start()
+        return stop
@@ -11,15 +11,181 @@ class Config:
     ELASTIC_PASSWORD = os.getenv("ELASTIC_PASSWORD")
     ELASTIC_API_KEY = os.getenv("ELASTIC_API_KEY")
 
+    # Elasticsearch transport: connections per node, gzip bodies, timeouts (seconds) and retries
+    ELASTIC_POOL_SIZE = int(os.getenv("ELASTIC_POOL_SIZE", 16))
+    ELASTIC_HTTP_COMPRESS = os.getenv("ELASTIC_HTTP_COMPRESS", "true").lower() == "true"
+    ELASTIC_REQUEST_TIMEOUT = float(os.getenv("ELASTIC_REQUEST_TIMEOUT", 10))
+    ELASTIC_SEARCH_TIMEOUT = float(os.getenv("ELASTIC_SEARCH_TIMEOUT", 5))
+    ELASTIC_BULK_TIMEOUT = float(os.getenv("ELASTIC_BULK_TIMEOUT", 120))
+    ELASTIC_MAX_RETRIES = int(os.getenv("ELASTIC_MAX_RETRIES", 2))
+    ELASTIC_RETRY_ON_TIMEOUT = os.getenv("ELASTIC_RETRY_ON_TIMEOUT", "true").lower() == "true"
+    # Discover cluster nodes (self-managed clusters only, ignored for cloud_id)
+    ELASTIC_SNIFF = os.getenv("ELASTIC_SNIFF", "false").lower() == "true"
+    ELASTIC_SNIFF_INTERVAL = float(os.getenv("ELASTIC_SNIFF_INTERVAL", 60))
+
     # Google Cloud Configuration
     GOOGLE_CLOUD_PROJECT = os.getenv("GOOGLE_CLOUD_PROJECT")
     GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+    VERTEX_LOCATION = os.getenv("VERTEX_LOCATION", "us-central1")
+    GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-pro")
+    GEMINI_EMBEDDING_MODEL = os.getenv("GEMINI_EMBEDDING_MODEL", "text-embedding-004")
+
+    # LLM Backend (mock, vertex, vertex_rest or openai)
+    LLM_BACKEND = os.getenv("LLM_BACKEND", "mock")
+    LLM_BATCH_EMBEDDINGS = os.getenv("LLM_BATCH_EMBEDDINGS", "true").lower() == "true"
+    LLM_STREAMING = os.getenv("LLM_STREAMING", "false").lower() == "true"
+    LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", 30))
+
+    # OpenAI-compatible local server (llama.cpp, vLLM, Ollama, ...)
+    LLM_BASE_URL = os.getenv("LLM_BASE_URL", "http://localhost:8080/v1")
+    LLM_MODEL = os.getenv("LLM_MODEL", "local-model")
+    LLM_EMBEDDING_MODEL = os.getenv("LLM_EMBEDDING_MODEL", "local-embedding")
+    LLM_API_KEY = os.getenv("LLM_API_KEY")
 
     # Application Configuration
     API_HOST = os.getenv("API_HOST", "localhost")
     API_PORT = int(os.getenv("API_PORT", 8000))
+    API_WORKERS = int(os.getenv("API_WORKERS", os.cpu_count() or 1))
 
-    # Index Names
+    # Shared State (memory, sqlite or redis)
+    STATE_BACKEND = os.getenv("STATE_BACKEND", "memory")
+    STATE_SQLITE_PATH = os.getenv("STATE_SQLITE_PATH", "state/support_agent.db")
+    # Entry cap for the memory backend's cache (cached answers, conversation summaries)
+    STATE_MEMORY_CACHE_SIZE = int(os.getenv("STATE_MEMORY_CACHE_SIZE", 10000))
+    REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    # Directory for columnar analytics segments shared by workers; empty keeps them in memory.
+    # Defaults to on-disk whenever state is shared, so analytics cover every worker and survive restarts
+    TURN_STORE_DIR = os.getenv("TURN_STORE_DIR", "" if STATE_BACKEND == "memory" else "state/turns")
+
+    # Index Names (aliases over versioned physical indices, swapped by `main.py setup`)
     KNOWLEDGE_BASE_INDEX = "cloudflow_knowledge_base"
     SUPPORT_TICKETS_INDEX = "cloudflow_support_tickets"
-    PRODUCT_CATALOG_INDEX = "cloudflow_product_catalog"
\ No newline at end of file
+    PRODUCT_CATALOG_INDEX = "cloudflow_product_catalog"
+    KNOWLEDGE_BASE_CHUNKS_INDEX = "cloudflow_knowledge_base_chunks"
+
+    # Index Settings: vector index type (hnsw, int8_hnsw, flat, int8_flat) and HNSW graph parameters
+    INDEX_VECTOR_TYPE = os.getenv("INDEX_VECTOR_TYPE", "hnsw")
+    INDEX_HNSW_M = int(os.getenv("INDEX_HNSW_M", 16))
+    INDEX_HNSW_EF_CONSTRUCTION = int(os.getenv("INDEX_HNSW_EF_CONSTRUCTION", 100))
+    INDEX_SHARDS = int(os.environ["INDEX_SHARDS"]) if os.getenv("INDEX_SHARDS") else None
+    INDEX_REPLICAS = int(os.environ["INDEX_REPLICAS"]) if os.getenv("INDEX_REPLICAS") else None
+    # Bulk loading: documents per bulk request, and whether to merge segments afterwards
+    BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", 500))
+    BULK_FORCE_MERGE = os.getenv("BULK_FORCE_MERGE", "true").lower() == "true"
+    # Previous index versions kept after an alias swap, for rollback
+    INDEX_KEEP_VERSIONS = int(os.getenv("INDEX_KEEP_VERSIONS", 1))
+
+    # Batch Processing (/chat/batch and `main.py batch`)
+    BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 8))
+    BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", 32))
+    BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", 5000))
+
+    # Passage Chunking
+    CHUNKING_ENABLED = os.getenv("CHUNKING_ENABLED", "true").lower() == "true"
+    CHUNK_WINDOW_WORDS = int(os.getenv("CHUNK_WINDOW_WORDS", 120))
+    CHUNK_OVERLAP_WORDS = int(os.getenv("CHUNK_OVERLAP_WORDS", 30))
+    SEARCH_USE_CHUNKS = os.getenv("SEARCH_USE_CHUNKS", "false").lower() == "true"
+
+    # Hybrid Search Tuning
+    SEARCH_TITLE_BOOST = float(os.getenv("SEARCH_TITLE_BOOST", 2.0))
+    SEARCH_KEYWORD_BOOST = float(os.getenv("SEARCH_KEYWORD_BOOST", 1.0))
+    SEARCH_VECTOR_BOOST = float(os.getenv("SEARCH_VECTOR_BOOST", 1.5))
+    SEARCH_VECTOR_MODE = os.getenv("SEARCH_VECTOR_MODE", "script_score")
+    SEARCH_NUM_CANDIDATES = int(os.getenv("SEARCH_NUM_CANDIDATES", 50))
+
+    # Intent-aware retrieval: filter on the intent's categories when the intent
+    # is confident, boost them when it is less so, and retry unfiltered when a
+    # filtered search returns fewer than SEARCH_FILTER_MIN_HITS hits
+    SEARCH_INTENT_FILTERS = os.getenv("SEARCH_INTENT_FILTERS", "true").lower() == "true"
+    SEARCH_FILTER_MIN_CONFIDENCE = float(os.getenv("SEARCH_FILTER_MIN_CONFIDENCE", 0.8))
+    SEARCH_BOOST_MIN_CONFIDENCE = float(os.getenv("SEARCH_BOOST_MIN_CONFIDENCE", 0.4))
+    SEARCH_CATEGORY_BOOST = float(os.getenv("SEARCH_CATEGORY_BOOST", 2.0))
+    SEARCH_FILTER_MIN_HITS = int(os.getenv("SEARCH_FILTER_MIN_HITS", 2))
+
+    # Early exit: skip the ticket search when the top KB hit leads the runner-up by
+    # this relative score margin, optionally per intent ("billing=0.3,technical=0.5")
+    SEARCH_EARLY_EXIT = os.getenv("SEARCH_EARLY_EXIT", "true").lower() == "true"
+    SEARCH_EARLY_EXIT_MARGIN = float(os.getenv("SEARCH_EARLY_EXIT_MARGIN", 0.4))
+    SEARCH_EARLY_EXIT_MIN_SCORE = float(os.getenv("SEARCH_EARLY_EXIT_MIN_SCORE", 0.0))
+    SEARCH_EARLY_EXIT_INTENT_MARGINS = {
+        intent.strip(): float(margin)
+        for intent, margin in (pair.split("=", 1) for pair in os.getenv("SEARCH_EARLY_EXIT_INTENT_MARGINS", "").split(",") if "=" in pair)
+    }
+
+    # Prompt Assembly (token budgets for generate_response)
+    PROMPT_CONTEXT_TOKENS = int(os.getenv("PROMPT_CONTEXT_TOKENS", 1200))
+    # Multi-turn context: the last N turns plus a rolling summary of earlier
+    # ones, updated in the background after each turn
+    CONVERSATION_CONTEXT_ENABLED = os.getenv("CONVERSATION_CONTEXT_ENABLED", "true").lower() == "true"
+    CONVERSATION_RECENT_TURNS = int(os.getenv("CONVERSATION_RECENT_TURNS", 3))
+    CONVERSATION_CONTEXT_TOKENS = int(os.getenv("CONVERSATION_CONTEXT_TOKENS", 500))
+    CONVERSATION_SUMMARY_TOKENS = int(os.getenv("CONVERSATION_SUMMARY_TOKENS", 200))
+    CONVERSATION_SUMMARY_TTL = float(os.getenv("CONVERSATION_SUMMARY_TTL", 86400))
+    PROMPT_PASSAGE_TOKENS = int(os.getenv("PROMPT_PASSAGE_TOKENS", 400))
+    PROMPT_MAX_PASSAGES = int(os.getenv("PROMPT_MAX_PASSAGES", 4))
+
+    # Precomputed FAQ answers
+    FAQ_ENABLED = os.getenv("FAQ_ENABLED", "true").lower() == "true"
+    FAQ_STORE_PATH = os.getenv("FAQ_STORE_PATH", "faq_store.json")
+    FAQ_MATCH_THRESHOLD = float(os.getenv("FAQ_MATCH_THRESHOLD", 0.75))
+    FAQ_REFRESH_INTERVAL = float(os.getenv("FAQ_REFRESH_INTERVAL", 300))
+
+    # Circuit Breakers
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", 5))
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_SECONDS", 5.0))
+    CIRCUIT_BREAKER_SLOW_CALL_RATE = float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_RATE", 0.5))
+    CIRCUIT_BREAKER_WINDOW_SIZE = int(os.getenv("CIRCUIT_BREAKER_WINDOW_SIZE", 20))
+    CIRCUIT_BREAKER_RESET_TIMEOUT = float(os.getenv("CIRCUIT_BREAKER_RESET_TIMEOUT", 30.0))
+
+    # Request deadline (seconds; X-Request-Timeout may only shorten it per request; REQUEST_TIMEOUT=0 disables).
+    # Below these remaining budgets a stage takes its cheaper path: keyword intent,
+    # a smaller KB search without tickets, and a cached or canned answer
+    REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", 20))
+    DEADLINE_INTENT_MIN_SECONDS = float(os.getenv("DEADLINE_INTENT_MIN_SECONDS", 6))
+    DEADLINE_SEARCH_MIN_SECONDS = float(os.getenv("DEADLINE_SEARCH_MIN_SECONDS", 4))
+    DEADLINE_GENERATION_MIN_SECONDS = float(os.getenv("DEADLINE_GENERATION_MIN_SECONDS", 2))
+
+    # Admission control for /chat routes (per worker): concurrency limit with a
+    # bounded queue, then token buckets per client and per session (0 rps disables)
+    ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_PATHS = [path.strip() for path in os.getenv("ADMISSION_PATHS", "/chat").split(",") if path.strip()]
+    ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", 16))
+    ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", 32))
+    ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", 2.0))
+    RATE_LIMIT_CLIENT_RPS = float(os.getenv("RATE_LIMIT_CLIENT_RPS", 5))
+    RATE_LIMIT_CLIENT_BURST = float(os.getenv("RATE_LIMIT_CLIENT_BURST", 20))
+    RATE_LIMIT_SESSION_RPS = float(os.getenv("RATE_LIMIT_SESSION_RPS", 0.5))
+    RATE_LIMIT_SESSION_BURST = float(os.getenv("RATE_LIMIT_SESSION_BURST", 3))
+    # Reverse proxies in front of the app; X-Forwarded-For is only trusted when set
+    RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv("RATE_LIMIT_TRUSTED_PROXIES", 0))
+
+    # Typeahead suggestions (/suggestions/typeahead): completions kept per trie
+    # node, indexed prefix length, and how often a past query must recur to be suggested
+    TYPEAHEAD_ENABLED = os.getenv("TYPEAHEAD_ENABLED", "true").lower() == "true"
+    TYPEAHEAD_NODE_SIZE = int(os.getenv("TYPEAHEAD_NODE_SIZE", 10))
+    TYPEAHEAD_MAX_DEPTH = int(os.getenv("TYPEAHEAD_MAX_DEPTH", 40))
+    TYPEAHEAD_MIN_QUERY_COUNT = int(os.getenv("TYPEAHEAD_MIN_QUERY_COUNT", 3))
+    TYPEAHEAD_QUERY_LOG_SIZE = int(os.getenv("TYPEAHEAD_QUERY_LOG_SIZE", 20000))
+    TYPEAHEAD_REFRESH_INTERVAL = float(os.getenv("TYPEAHEAD_REFRESH_INTERVAL", 300))
+
+    # Background queue for history, analytics, cache and trace writes
+    BACKGROUND_QUEUE_ENABLED = os.getenv("BACKGROUND_QUEUE_ENABLED", "true").lower() == "true"
+    BACKGROUND_QUEUE_SIZE = int(os.getenv("BACKGROUND_QUEUE_SIZE", 10000))
+    BACKGROUND_BATCH_SIZE = int(os.getenv("BACKGROUND_BATCH_SIZE", 200))
+    BACKGROUND_DRAIN_TIMEOUT = float(os.getenv("BACKGROUND_DRAIN_TIMEOUT", 10))
+
+    # Response Cache (degraded-mode answers)
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 512))
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 3600))
+
+    # Query embedding cache and startup warm-up
+    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", 2048))
+    EMBEDDING_CACHE_TTL = float(os.getenv("EMBEDDING_CACHE_TTL", 86400))
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    WARMUP_GENERATIONS = int(os.getenv("WARMUP_GENERATIONS", 2))
+    # Seconds startup waits for warm-up before serving; /health/ready stays 503 until it ends
+    WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", 60))
+
+    # Tracing
+    TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", 1.0))
+    TRACE_BUFFER_SIZE = int(os.getenv("TRACE_BUFFER_SIZE", 200))
\ No newline at end of file
@@ -1,4 +1,17 @@
 from .data_loader import DataLoader
-from .sample_data import KNOWLEDGE_BASE_DATA, SUPPORT_TICKETS_DATA, PRODUCT_CATALOG_DATA
+from .sample_data import (
+    KNOWLEDGE_BASE_DATA,
+    SUPPORT_TICKETS_DATA,
+    PRODUCT_CATALOG_DATA,
+    DEMO_SCENARIOS,
+    SUGGESTED_QUESTIONS,
+)
 
-__all__ = ["DataLoader", "KNOWLEDGE_BASE_DATA", "SUPPORT_TICKETS_DATA", "PRODUCT_CATALOG_DATA"]
\ No newline at end of file
+__all__ = [
+    "DataLoader",
+    "KNOWLEDGE_BASE_DATA",
+    "SUPPORT_TICKETS_DATA",
+    "PRODUCT_CATALOG_DATA",
+    "DEMO_SCENARIOS",
+    "SUGGESTED_QUESTIONS",
+]
\ No newline at end of file
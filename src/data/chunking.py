@@ -0,0 +1,61 @@
+"""
+Passage-level chunking of knowledge base articles
+"""
+import re
+from typing import List, Dict, Any
+from ..config import Config
+
+_SENTENCE_END = re.compile(r"[.!?]$")
+
+
+def chunk_text(text: str, window: int = None, overlap: int = None) -> List[str]:
+    """
+    Split text into overlapping windows of `window` words. Each window is
+    extended to the next sentence end when one is close, so passages rarely
+    stop mid-sentence.
+    """
+    window = window or Config.CHUNK_WINDOW_WORDS
+    overlap = Config.CHUNK_OVERLAP_WORDS if overlap is None else overlap
+    if overlap >= window:
+        raise ValueError("Chunk overlap must be smaller than the window")
+
+    words = text.split()
+    if len(words) <= window:
+        return [text] if words else []
+
+    chunks = []
+    start = 0
+    while start < len(words):
+        end = min(start + window, len(words))
+        # Stretch up to 20% past the window to finish the current sentence
+        limit = min(len(words), end + window // 5)
+        stretch = end
+        while stretch < limit and not _SENTENCE_END.search(words[stretch - 1]):
+            stretch += 1
+        if _SENTENCE_END.search(words[stretch - 1]):
+            end = stretch
+
+        chunks.append(" ".join(words[start:end]))
+        if end >= len(words):
+            break
+        start = end - overlap
+    return chunks
+
+
+def chunk_document(doc: Dict[str, Any], window: int = None, overlap: int = None) -> List[Dict[str, Any]]:
+    """Turn a knowledge base article into chunk documents that point back to it"""
+    chunks = []
+    for i, text in enumerate(chunk_text(doc.get("content", ""), window, overlap)):
+        chunks.append({
+            "id": f"{doc['id']}#chunk{i}",
+            "parent_id": doc["id"],
+            "chunk_index": i,
+            "title": doc.get("title", ""),
+            "content": text,
+            "category": doc.get("category"),
+            "tags": doc.get("tags", []),
+            "confidence_score": doc.get("confidence_score"),
+            # Chunks carry their article's version so answers can be invalidated per article
+            "content_hash": doc.get("content_hash")
+        })
+    return chunks
@@ -3,21 +3,44 @@ Data loading and indexing utilities
 """
 from typing import List, Dict, Any
 from ..search import ElasticSearchClient
-from ..ai import GeminiClient
+from ..ai import LLMClient
 from .sample_data import KNOWLEDGE_BASE_DATA, SUPPORT_TICKETS_DATA, PRODUCT_CATALOG_DATA
+from .chunking import chunk_document
+from ..cache.faq_store import content_hash
 from ..config import Config
 import time
 
+# Query every complete build must answer before its aliases are swapped
+VALIDATION_QUERY = "How do I reset my password?"
+
 class DataLoader:
     def __init__(self):
         self.elastic_client = ElasticSearchClient()
-        self.ai_client = GeminiClient()
+        self.ai_client = LLMClient()
+        # Alias -> physical index being built; loads write to the alias when unset
+        self.targets: Dict[str, str] = {}
+        self.loaded: Dict[str, int] = {}
+
+    def _index(self, alias: str) -> str:
+        return self.targets.get(alias, alias)
+
+    def _bulk_index(self, alias: str, documents: List[Dict[str, Any]]):
+        indexed = self.elastic_client.bulk_index(self._index(alias), documents)
+        self.loaded[alias] = self.loaded.get(alias, 0) + indexed
+
+    def aliases(self) -> List[str]:
+        aliases = [Config.KNOWLEDGE_BASE_INDEX, Config.SUPPORT_TICKETS_INDEX]
+        if Config.CHUNKING_ENABLED:
+            aliases.append(Config.KNOWLEDGE_BASE_CHUNKS_INDEX)
+        return aliases
 
     def setup_indices(self):
         """Create all necessary indices"""
         print("Creating Elasticsearch indices...")
-        self.elastic_client.create_knowledge_base_index()
-        self.elastic_client.create_support_tickets_index()
+        self.elastic_client.create_knowledge_base_index(self._index(Config.KNOWLEDGE_BASE_INDEX))
+        self.elastic_client.create_support_tickets_index(self._index(Config.SUPPORT_TICKETS_INDEX))
+        if Config.CHUNKING_ENABLED:
+            self.elastic_client.create_knowledge_base_chunks_index(self._index(Config.KNOWLEDGE_BASE_CHUNKS_INDEX))
         print("Indices created successfully!")
 
     def load_knowledge_base(self):
@@ -33,16 +56,31 @@ class DataLoader:
         documents_with_embeddings = []
         for i, item in enumerate(KNOWLEDGE_BASE_DATA):
             doc = item.copy()
+            doc['content_hash'] = content_hash(item)
             doc['content_embedding'] = embeddings[i]
             documents_with_embeddings.append(doc)
 
         # Index documents
-        self.elastic_client.bulk_index(
-            Config.KNOWLEDGE_BASE_INDEX,
-            documents_with_embeddings
-        )
+        self._bulk_index(Config.KNOWLEDGE_BASE_INDEX, documents_with_embeddings)
         print(f"Loaded {len(documents_with_embeddings)} knowledge base articles")
 
+        if Config.CHUNKING_ENABLED:
+            self.load_chunks(documents_with_embeddings)
+
+    def load_chunks(self, articles: List[Dict[str, Any]]):
+        """Split articles into overlapping passages and index them with their own embeddings"""
+        chunks = [chunk for article in articles for chunk in chunk_document(article)]
+        if not chunks:
+            return
+
+        texts = [f"{chunk['title']} {chunk['content']}" for chunk in chunks]
+        embeddings = self.ai_client.batch_generate_embeddings(texts)
+        for chunk, embedding in zip(chunks, embeddings):
+            chunk['content_embedding'] = embedding
+
+        self._bulk_index(Config.KNOWLEDGE_BASE_CHUNKS_INDEX, chunks)
+        print(f"Loaded {len(chunks)} passages from {len(articles)} articles")
+
     def load_support_tickets(self):
         """Load historical support tickets with embeddings"""
         print("Loading support tickets...")
@@ -56,14 +94,12 @@ class DataLoader:
         documents_with_embeddings = []
         for i, item in enumerate(SUPPORT_TICKETS_DATA):
             doc = item.copy()
+            doc['content_hash'] = content_hash(item)
             doc['problem_embedding'] = embeddings[i]
             documents_with_embeddings.append(doc)
 
         # Index documents
-        self.elastic_client.bulk_index(
-            Config.SUPPORT_TICKETS_INDEX,
-            documents_with_embeddings
-        )
+        self._bulk_index(Config.SUPPORT_TICKETS_INDEX, documents_with_embeddings)
         print(f"Loaded {len(documents_with_embeddings)} support tickets")
 
     def load_product_catalog(self):
@@ -81,6 +117,7 @@ class DataLoader:
                 "tags": ["product", "pricing", "features"],
                 "confidence_score": 0.95
             }
+            doc["content_hash"] = content_hash(doc)
             product_docs.append(doc)
 
         # Generate embeddings
@@ -92,23 +129,49 @@ class DataLoader:
             doc['content_embedding'] = embeddings[i]
 
         # Index documents
-        self.elastic_client.bulk_index(Config.KNOWLEDGE_BASE_INDEX, product_docs)
+        self._bulk_index(Config.KNOWLEDGE_BASE_INDEX, product_docs)
         print(f"Loaded {len(product_docs)} product catalog items")
 
+        if Config.CHUNKING_ENABLED:
+            self.load_chunks(product_docs)
+
     def load_all_data(self):
-        """Load all sample data"""
+        """
+        Load all sample data into new index versions, then swap the aliases
+        so searches move over atomically. The live indices keep serving
+        until the swap, and a build that fails validation is discarded.
+        """
         print("Starting data loading process...")
+        self.targets = {alias: self.elastic_client.versioned_index(alias) for alias in self.aliases()}
+        self.loaded = {}
 
         # Setup indices first
-        self.setup_indices()
+        try:
+            self.setup_indices()
+        except RuntimeError:
+            self.discard()
+            raise
 
         # Small delay to ensure indices are ready
         time.sleep(2)
 
-        # Load all data
-        self.load_knowledge_base()
-        self.load_support_tickets()
-        self.load_product_catalog()
+        # Load all data with refresh and replicas off, restored afterwards
+        with self.elastic_client.bulk_loading(list(self.targets.values())):
+            self.load_knowledge_base()
+            self.load_support_tickets()
+            self.load_product_catalog()
+
+        problems = self.validate()
+        if problems:
+            for problem in problems:
+                print(f"Validation failed: {problem}")
+            self.discard()
+            raise RuntimeError("New indices failed validation; aliases left unchanged")
+
+        self.elastic_client.swap_aliases(self.targets)
+        for alias in self.targets:
+            self.elastic_client.prune_versions(alias)
+        self.targets = {}
 
         print("All data loaded successfully!")
         print("\nData Summary:")
@@ -116,6 +179,39 @@ class DataLoader:
         print(f"- Support Tickets: {len(SUPPORT_TICKETS_DATA)} tickets")
         print(f"- Product Catalog: {len(PRODUCT_CATALOG_DATA)} products")
 
+    def validate(self) -> List[str]:
+        """Check the new indices hold every loaded document and answer a sample query"""
+        problems = []
+        for alias, index in self.targets.items():
+            expected = self.loaded.get(alias, 0)
+            try:
+                actual = self.elastic_client.count(index)
+            except Exception as e:
+                problems.append(f"{index}: count failed ({e})")
+                continue
+            if expected == 0 or actual != expected:
+                problems.append(f"{index}: {actual} documents, expected {expected}")
+
+        query = VALIDATION_QUERY
+        results = self.elastic_client.hybrid_search(
+            query=query,
+            query_embedding=self.ai_client.generate_embedding(query),
+            index=self._index(Config.KNOWLEDGE_BASE_INDEX),
+            size=3
+        )
+        if results.get("degraded") or not results["hits"]["hits"]:
+            problems.append(f"sample query '{query}' returned no results")
+        return problems
+
+    def discard(self):
+        """Delete the indices of a failed build"""
+        for index in self.targets.values():
+            try:
+                self.elastic_client.client.indices.delete(index=index, ignore_unavailable=True)
+            except Exception as e:
+                print(f"Could not delete {index}: {e}")
+        self.targets = {}
+
     def search_test(self, query: str):
         """Test search functionality"""
         print(f"\nTesting search for: '{query}'")
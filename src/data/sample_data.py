@@ -155,4 +155,55 @@ PRODUCT_CATALOG_DATA = [
         "troubleshooting": "Enterprise features require admin setup. Dedicated onboarding specialist assigned.",
         "price": "$99/month"
     }
-]
\ No newline at end of file
+]
+
+DEMO_SCENARIOS = [
+    {
+        "title": "Password Reset",
+        "query": "I can't log into my account, I think I need to reset my password",
+        "expected_category": "account"
+    },
+    {
+        "title": "Billing Issue",
+        "query": "Why was I charged twice this month? I only have one subscription",
+        "expected_category": "billing"
+    },
+    {
+        "title": "Integration Problem",
+        "query": "My Slack integration stopped working, notifications aren't coming through",
+        "expected_category": "integrations"
+    },
+    {
+        "title": "Performance Issue",
+        "query": "The dashboard is really slow, taking forever to load my projects",
+        "expected_category": "technical"
+    },
+    {
+        "title": "Team Management",
+        "query": "How do I give my team member access to edit our shared project?",
+        "expected_category": "team_management"
+    }
+]
+
+SUGGESTED_QUESTIONS = [
+    "How do I reset my password?",
+    "Why was I charged twice this month?",
+    "How can I integrate CloudFlow with Slack?",
+    "My dashboard is loading slowly, what should I do?",
+    "How do I manage team permissions?",
+    "How can I cancel my subscription?",
+    "How do I export my project data?",
+    "How do I set up two-factor authentication?"
+]
+
+# Known phrasings of the canonical questions (including the UI quick suggestions)
+FAQ_PARAPHRASES = {
+    "How do I reset my password?": ["I forgot my password", "How can I reset my password?"],
+    "Why was I charged twice this month?": ["I was charged twice", "Why was I billed twice this month?"],
+    "How can I integrate CloudFlow with Slack?": ["How can I integrate with Slack?", "How do I connect Slack?"],
+    "My dashboard is loading slowly, what should I do?": ["My dashboard is loading slowly", "Dashboard is loading slowly"],
+    "How do I manage team permissions?": ["How do I change team member roles?"],
+    "How can I cancel my subscription?": ["How do I cancel my subscription?"],
+    "How do I export my project data?": ["How can I export my project data?"],
+    "How do I set up two-factor authentication?": ["How do I enable 2FA?"]
+}
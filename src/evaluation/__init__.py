@@ -0,0 +1,4 @@
+from .retrieval_eval import RetrievalEvaluator, DEFAULT_CONFIGS, print_summary
+from .dataset import build_eval_set
+
+__all__ = ["RetrievalEvaluator", "DEFAULT_CONFIGS", "print_summary", "build_eval_set"]
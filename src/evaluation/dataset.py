@@ -0,0 +1,71 @@
+"""
+Labeled query -> document relevance judgments built from the sample data
+"""
+from typing import List, Dict, Any
+from ..data.sample_data import (
+    KNOWLEDGE_BASE_DATA,
+    SUPPORT_TICKETS_DATA,
+    PRODUCT_CATALOG_DATA,
+    DEMO_SCENARIOS,
+)
+
+# Graded relevance: the document a query was written from is a perfect
+# match, other documents in the same category are partially relevant
+EXACT = 2
+SAME_CATEGORY = 1
+
+
+def _documents() -> List[Dict[str, Any]]:
+    docs = [{"id": item["id"], "category": item["category"]} for item in KNOWLEDGE_BASE_DATA]
+    docs += [{"id": item["id"], "category": item["category"]} for item in SUPPORT_TICKETS_DATA]
+    docs += [{"id": item["id"], "category": "product"} for item in PRODUCT_CATALOG_DATA]
+    return docs
+
+
+def _category_judgments(category: str, exact_id: str = None) -> Dict[str, int]:
+    judgments = {doc["id"]: SAME_CATEGORY for doc in _documents() if doc["category"] == category}
+    if exact_id:
+        judgments[exact_id] = EXACT
+    return judgments
+
+
+def build_eval_set() -> List[Dict[str, Any]]:
+    """
+    Each entry is {"query", "source", "category", "judgments": {doc_id: grade}}.
+    Queries come from KB titles and tags, ticket problem statements and the
+    /demo scenarios.
+    """
+    eval_set = []
+
+    for item in KNOWLEDGE_BASE_DATA:
+        judgments = _category_judgments(item["category"], item["id"])
+        eval_set.append({
+            "query": item["title"],
+            "source": "kb_title",
+            "category": item["category"],
+            "judgments": judgments
+        })
+        eval_set.append({
+            "query": " ".join(item.get("tags", [])),
+            "source": "kb_tags",
+            "category": item["category"],
+            "judgments": judgments
+        })
+
+    for item in SUPPORT_TICKETS_DATA:
+        eval_set.append({
+            "query": item["problem"],
+            "source": "ticket",
+            "category": item["category"],
+            "judgments": _category_judgments(item["category"], item["id"])
+        })
+
+    for scenario in DEMO_SCENARIOS:
+        eval_set.append({
+            "query": scenario["query"],
+            "source": "demo",
+            "category": scenario["expected_category"],
+            "judgments": _category_judgments(scenario["expected_category"])
+        })
+
+    return eval_set
@@ -0,0 +1,29 @@
+"""
+Ranking quality metrics
+"""
+import math
+from typing import List, Dict
+
+
+def recall_at_k(ranked_ids: List[str], judgments: Dict[str, int], k: int) -> float:
+    relevant = {doc_id for doc_id, grade in judgments.items() if grade > 0}
+    if not relevant:
+        return 0.0
+    return len(relevant.intersection(ranked_ids[:k])) / len(relevant)
+
+
+def reciprocal_rank(ranked_ids: List[str], judgments: Dict[str, int]) -> float:
+    for rank, doc_id in enumerate(ranked_ids, start=1):
+        if judgments.get(doc_id, 0) > 0:
+            return 1.0 / rank
+    return 0.0
+
+
+def ndcg_at_k(ranked_ids: List[str], judgments: Dict[str, int], k: int) -> float:
+    dcg = sum(
+        (2 ** judgments.get(doc_id, 0) - 1) / math.log2(rank + 1)
+        for rank, doc_id in enumerate(ranked_ids[:k], start=1)
+    )
+    ideal = sorted(judgments.values(), reverse=True)[:k]
+    idcg = sum((2 ** grade - 1) / math.log2(rank + 1) for rank, grade in enumerate(ideal, start=1))
+    return dcg / idcg if idcg else 0.0
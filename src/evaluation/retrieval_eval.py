@@ -0,0 +1,158 @@
+"""
+Offline retrieval quality + latency evaluation over the sample data
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
+from ..config import Config
+from ..benchmark.runner import percentile
+from .dataset import build_eval_set
+from .metrics import recall_at_k, reciprocal_rank, ndcg_at_k
+
+# Search options forwarded to ElasticSearchClient.hybrid_search
+SEARCH_OPTIONS = ("title_boost", "keyword_boost", "vector_boost", "vector_mode", "num_candidates")
+
+DEFAULT_CONFIGS = [
+    {"name": "baseline", "legs": ["kb", "tickets"], "kb_size": 5, "ticket_size": 3, "vector_mode": "script_score"},
+    {"name": "knn", "legs": ["kb", "tickets"], "kb_size": 5, "ticket_size": 3, "vector_mode": "knn"},
+    {"name": "keyword_only", "legs": ["kb", "tickets"], "kb_size": 5, "ticket_size": 3, "vector_mode": "none"},
+    {"name": "kb_only", "legs": ["kb"], "kb_size": 5, "vector_mode": "script_score"},
+    {"name": "knn_small_k", "legs": ["kb", "tickets"], "kb_size": 3, "ticket_size": 2, "vector_mode": "knn"},
+    {"name": "no_title_boost", "legs": ["kb", "tickets"], "kb_size": 5, "ticket_size": 3, "title_boost": 1.0},
+    {"name": "vector_heavy", "legs": ["kb", "tickets"], "kb_size": 5, "ticket_size": 3, "vector_boost": 3.0},
+]
+
+
+class RetrievalEvaluator:
+    def __init__(self, search_client=None, ai_client=None, k: int = 5, workers: int = 8, enhance: bool = True):
+        if search_client is None:
+            from ..search import ElasticSearchClient
+            search_client = ElasticSearchClient()
+        if ai_client is None:
+            from ..ai import LLMClient
+            ai_client = LLMClient()
+        self.search_client = search_client
+        self.ai_client = ai_client
+        self.k = k
+        self.workers = workers
+        self.enhance = enhance
+        self.eval_set = build_eval_set()
+
+    def _prepare_queries(self) -> List[Dict[str, Any]]:
+        """Compute search strings and embeddings once, shared by every configuration"""
+        queries = [entry["query"] for entry in self.eval_set]
+        embeddings = self.ai_client.batch_generate_embeddings(queries)
+
+        prepared = []
+        for entry, embedding in zip(self.eval_set, embeddings):
+            search_text = entry["query"]
+            if self.enhance:
+                intent = self.ai_client.analyze_intent(entry["query"])
+                search_text = self.ai_client.enhance_search_query(entry["query"], intent)
+            prepared.append(dict(entry, search_text=search_text, embedding=embedding))
+        return prepared
+
+    def _run_query(self, config: Dict[str, Any], entry: Dict[str, Any]) -> Dict[str, Any]:
+        options = {key: config[key] for key in SEARCH_OPTIONS if key in config}
+        legs = [
+            (Config.KNOWLEDGE_BASE_INDEX, config.get("kb_size", 5)),
+            (Config.SUPPORT_TICKETS_INDEX, config.get("ticket_size", 3))
+        ]
+        legs = [leg for leg, name in zip(legs, ("kb", "tickets")) if name in config.get("legs", ["kb", "tickets"])]
+
+        start = time.perf_counter()
+        hits = []
+        for index, size in legs:
+            response = self.search_client.hybrid_search(
+                query=entry["search_text"],
+                query_embedding=entry["embedding"],
+                index=index,
+                size=size,
+                **options
+            )
+            hits.extend(response.get("hits", {}).get("hits", []))
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        # Same fusion as SupportAgent._combine_search_results
+        hits.sort(key=lambda hit: hit.get("_score", 0), reverse=True)
+        ranked_ids = [hit.get("_id") for hit in hits]
+
+        return {
+            "config": config["name"],
+            "query": entry["query"],
+            "source": entry["source"],
+            "ranked_ids": ranked_ids[:self.k],
+            "latency_ms": round(latency_ms, 3),
+            "recall": recall_at_k(ranked_ids, entry["judgments"], self.k),
+            "mrr": reciprocal_rank(ranked_ids[:self.k], entry["judgments"]),
+            "ndcg": ndcg_at_k(ranked_ids, entry["judgments"], self.k)
+        }
+
+    def run(self, configs: List[Dict[str, Any]] = None, repeats: int = 1) -> Dict[str, Any]:
+        """Evaluate every configuration over the eval set, in parallel"""
+        configs = configs or DEFAULT_CONFIGS
+        prepared = self._prepare_queries()
+        tasks = [(config, entry) for config in configs for entry in prepared for _ in range(repeats)]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            rows = list(pool.map(lambda task: self._run_query(*task), tasks))
+
+        summary = {}
+        for config in configs:
+            config_rows = [row for row in rows if row["config"] == config["name"]]
+            latencies = [row["latency_ms"] for row in config_rows]
+            count = len(config_rows) or 1
+            summary[config["name"]] = {
+                "config": config,
+                f"recall@{self.k}": round(sum(row["recall"] for row in config_rows) / count, 4),
+                "mrr": round(sum(row["mrr"] for row in config_rows) / count, 4),
+                f"ndcg@{self.k}": round(sum(row["ndcg"] for row in config_rows) / count, 4),
+                "latency_p50_ms": round(percentile(latencies, 50), 3),
+                "latency_p95_ms": round(percentile(latencies, 95), 3)
+            }
+
+        return {
+            "k": self.k,
+            "queries": len(prepared),
+            "summary": summary,
+            "recommendation": self.recommend(summary),
+            "per_query": rows
+        }
+
+    def recommend(self, summary: Dict[str, Dict[str, Any]], tolerance: float = 0.02) -> Dict[str, Any]:
+        """Cheapest configuration whose quality is within `tolerance` of the best"""
+        ndcg_key, recall_key = f"ndcg@{self.k}", f"recall@{self.k}"
+        best_ndcg = max(stats[ndcg_key] for stats in summary.values())
+        best_recall = max(stats[recall_key] for stats in summary.values())
+
+        candidates = [
+            (name, stats) for name, stats in summary.items()
+            if stats[ndcg_key] >= best_ndcg * (1 - tolerance)
+            and stats[recall_key] >= best_recall * (1 - tolerance)
+        ]
+
+        def cost(item):
+            config = item[1]["config"]
+            legs = config.get("legs", ["kb", "tickets"])
+            fetched = config.get("kb_size", 5) + (config.get("ticket_size", 3) if "tickets" in legs else 0)
+            return (item[1]["latency_p50_ms"], len(legs), fetched)
+
+        name, stats = min(candidates, key=cost)
+        return {
+            "config": name,
+            "tolerance": tolerance,
+            ndcg_key: stats[ndcg_key],
+            "best_" + ndcg_key: best_ndcg,
+            "latency_p50_ms": stats["latency_p50_ms"]
+        }
+
+
+def print_summary(report: Dict[str, Any]):
+    k = report["k"]
+    print(f"{'config':<16} {'recall@' + str(k):>9} {'mrr':>7} {'ndcg@' + str(k):>8} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, stats in report["summary"].items():
+        print(f"{name:<16} {stats[f'recall@{k}']:>9.3f} {stats['mrr']:>7.3f} {stats[f'ndcg@{k}']:>8.3f} "
+              f"{stats['latency_p50_ms']:>9.2f} {stats['latency_p95_ms']:>9.2f}")
+    recommendation = report["recommendation"]
+    print(f"\nRecommended: {recommendation['config']} "
+          f"(ndcg@{k}={recommendation[f'ndcg@{k}']} vs best {recommendation[f'best_ndcg@{k}']})")
@@ -0,0 +1,40 @@
+from .metrics import (
+    REGISTRY,
+    STAGE_LATENCY,
+    SEARCH_LATENCY,
+    ADMISSION_QUEUE_WAIT,
+    BACKGROUND_TASK_LATENCY,
+    stage_timer,
+    record_fallback,
+    record_cache_lookup,
+    record_prompt_tokens,
+    record_ticket_leg,
+    record_admission,
+    record_background,
+    record_typeahead,
+    render_metrics,
+)
+from .tracing import TRACER, EXPORTER, traced, current_span, current_trace_id, log_prefix
+
+__all__ = [
+    "REGISTRY",
+    "STAGE_LATENCY",
+    "SEARCH_LATENCY",
+    "ADMISSION_QUEUE_WAIT",
+    "BACKGROUND_TASK_LATENCY",
+    "stage_timer",
+    "record_fallback",
+    "record_cache_lookup",
+    "record_prompt_tokens",
+    "record_ticket_leg",
+    "record_admission",
+    "record_background",
+    "record_typeahead",
+    "render_metrics",
+    "TRACER",
+    "EXPORTER",
+    "traced",
+    "current_span",
+    "current_trace_id",
+    "log_prefix",
+]
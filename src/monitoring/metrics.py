@@ -0,0 +1,397 @@
+"""
+Lightweight in-process metrics with Prometheus text exposition
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Any, Tuple, Callable, Sequence
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labelnames: Sequence[str], values: Tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        self._add(self._key(labels), amount)
+
+    def _add(self, key: Tuple, amount: float):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Counter):
+    metric_type = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (last slot is +Inf), sum, count]
+        self._values: Dict[Tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        self._observe(self._key(labels), value)
+
+    def _observe(self, key: Tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def time(self, **labels) -> "Timer":
+        """Context manager that observes the elapsed wall time"""
+        return Timer(self, labels)
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = [(key, list(entry[0]), entry[1], entry[2]) for key, entry in self._values.items()]
+
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Timer:
+    """Span timer; optionally tracks an in-flight gauge for the same labels"""
+    __slots__ = ("histogram", "key", "in_flight", "start", "elapsed")
+
+    def __init__(self, histogram: Histogram, labels: Dict[str, str], in_flight: Gauge = None):
+        self.histogram = histogram
+        # Label keys are resolved once per span rather than on every update
+        self.key = histogram._key(labels)
+        self.in_flight = in_flight
+        self.elapsed = 0.0
+
+    def __enter__(self) -> "Timer":
+        if self.in_flight is not None:
+            self.in_flight._add(self.key, 1.0)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.elapsed = time.perf_counter() - self.start
+        self.histogram._observe(self.key, self.elapsed)
+        if self.in_flight is not None:
+            self.in_flight._add(self.key, -1.0)
+        return False
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self,
+                  name: str,
+                  documentation: str,
+                  labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        """Register a callback that refreshes gauges right before each scrape"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every metric in Prometheus text exposition format"""
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception as e:
+                print(f"Metrics collector error: {e}")
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_LATENCY = REGISTRY.histogram(
+    "support_agent_stage_seconds",
+    "Latency of each chat pipeline stage",
+    ["stage"]
+)
+SEARCH_LATENCY = REGISTRY.histogram(
+    "support_agent_search_seconds",
+    "Latency of Elasticsearch hybrid search per index",
+    ["index"]
+)
+IN_FLIGHT = REGISTRY.gauge(
+    "support_agent_in_flight",
+    "Operations currently in progress",
+    ["stage"]
+)
+FALLBACKS = REGISTRY.counter(
+    "support_agent_fallbacks_total",
+    "Fallback paths taken instead of the primary dependency",
+    ["kind"]
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "support_agent_cache_requests_total",
+    "Cache lookups by cache and result",
+    ["cache", "result"]
+)
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "support_agent_cache_hit_ratio",
+    "Fraction of cache lookups that were hits",
+    ["cache"]
+)
+CIRCUIT_STATE = REGISTRY.gauge(
+    "support_agent_circuit_open",
+    "1 when a dependency circuit breaker is open, 0.5 half-open, 0 closed",
+    ["dependency"]
+)
+
+ES_POOL_CONNECTIONS = REGISTRY.gauge(
+    "support_agent_es_pool_connections",
+    "Elasticsearch pooled connections per node by state (in_use, idle, max)",
+    ["node", "state"]
+)
+ES_POOL_UTILIZATION = REGISTRY.gauge(
+    "support_agent_es_pool_utilization",
+    "Fraction of each node's Elasticsearch connection slots in use",
+    ["node"]
+)
+
+TICKET_LEG = REGISTRY.counter(
+    "support_agent_ticket_leg_total",
+    "Ticket searches run or skipped because the knowledge base hit was decisive",
+    ["intent", "decision"]
+)
+KB_TOP_MARGIN = REGISTRY.histogram(
+    "support_agent_kb_top_margin",
+    "Relative score lead of the top knowledge base hit over the runner-up",
+    ["intent"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+)
+
+ADMISSION = REGISTRY.counter(
+    "support_agent_admission_total",
+    "Requests admitted or rejected by admission control, by reason",
+    ["decision"]
+)
+ADMISSION_SLOTS = REGISTRY.gauge(
+    "support_agent_admission_slots",
+    "Requests running (active) and waiting (queued) behind the concurrency limit",
+    ["state"]
+)
+ADMISSION_QUEUE_WAIT = REGISTRY.histogram(
+    "support_agent_admission_queue_seconds",
+    "Time admitted requests waited for a concurrency slot"
+)
+
+BACKGROUND_TASKS = REGISTRY.counter(
+    "support_agent_background_tasks_total",
+    "Background tasks by kind and result (done, failed, dropped, inline when the queue was full)",
+    ["queue", "kind", "result"]
+)
+BACKGROUND_QUEUE_DEPTH = REGISTRY.gauge(
+    "support_agent_background_queue_depth",
+    "Tasks waiting in the background queue, and its capacity",
+    ["queue", "state"]
+)
+BACKGROUND_TASK_LATENCY = REGISTRY.histogram(
+    "support_agent_background_batch_seconds",
+    "Time to run one batch of background tasks",
+    ["kind"]
+)
+
+TYPEAHEAD_LATENCY = REGISTRY.histogram(
+    "support_agent_typeahead_seconds",
+    "Time to look up typeahead suggestions for one keystroke",
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01)
+)
+TYPEAHEAD_REQUESTS = REGISTRY.counter(
+    "support_agent_typeahead_requests_total",
+    "Typeahead lookups by whether the best suggestion has a precomputed answer",
+    ["result"]
+)
+
+PROMPT_TOKENS = REGISTRY.histogram(
+    "support_agent_prompt_tokens",
+    "Estimated prompt tokens sent for response generation",
+    buckets=(128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096, 8192)
+)
+
+
+def stage_timer(stage: str) -> Timer:
+    """Time a pipeline stage and track it as in flight"""
+    return Timer(STAGE_LATENCY, {"stage": stage}, IN_FLIGHT)
+
+
+def record_fallback(kind: str, amount: int = 1):
+    FALLBACKS.inc(amount, kind=kind)
+
+
+def record_prompt_tokens(tokens: int):
+    PROMPT_TOKENS.observe(tokens)
+
+
+def record_ticket_leg(intent: str, margin: float, skipped: bool):
+    KB_TOP_MARGIN.observe(margin, intent=intent)
+    TICKET_LEG.inc(intent=intent, decision="skipped" if skipped else "ran")
+
+
+def record_admission(decision: str, active: int, queued: int):
+    ADMISSION.inc(decision=decision)
+    ADMISSION_SLOTS.set(active, state="active")
+    ADMISSION_SLOTS.set(queued, state="queued")
+
+
+def record_background(queue: str, kind: str, result: str, amount: int = 1):
+    BACKGROUND_TASKS.inc(amount, queue=queue, kind=kind, result=result)
+
+
+def record_typeahead(seconds: float, suggestions: List[Dict[str, Any]]):
+    TYPEAHEAD_LATENCY.observe(seconds)
+    if not suggestions:
+        result = "empty"
+    else:
+        result = "answered" if suggestions[0].get("answer") else "suggested"
+    TYPEAHEAD_REQUESTS.inc(result=result)
+
+
+def record_cache_lookup(cache: str, hit: bool):
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def _collect_cache_ratios():
+    lookups: Dict[str, List[float]] = {}
+    for (cache, result), value in list(CACHE_REQUESTS._values.items()):
+        totals = lookups.setdefault(cache, [0.0, 0.0])
+        totals[0 if result == "hit" else 1] += value
+    for cache, (hits, misses) in lookups.items():
+        CACHE_HIT_RATIO.set(hits / (hits + misses) if hits + misses else 0.0, cache=cache)
+
+
+def _collect_breakers():
+    from ..reliability import breaker_states
+
+    levels = {"closed": 0.0, "half_open": 0.5, "open": 1.0}
+    for name, state in breaker_states().items():
+        CIRCUIT_STATE.set(levels.get(state["state"], 0.0), dependency=name)
+
+
+def _collect_es_pool():
+    from ..search.transport import pool_stats
+
+    for node in pool_stats():
+        for state in ("in_use", "idle", "max"):
+            ES_POOL_CONNECTIONS.set(node[state], node=node["node"], state=state)
+        ES_POOL_UTILIZATION.set(node["in_use"] / node["max"] if node["max"] else 0.0, node=node["node"])
+
+
+def _collect_background_queue():
+    from ..background import queue_stats
+
+    for stats in queue_stats():
+        BACKGROUND_QUEUE_DEPTH.set(stats["depth"], queue=stats["queue"], state="queued")
+        BACKGROUND_QUEUE_DEPTH.set(stats["max"], queue=stats["queue"], state="max")
+
+
+REGISTRY.add_collector(_collect_cache_ratios)
+REGISTRY.add_collector(_collect_breakers)
+REGISTRY.add_collector(_collect_es_pool)
+REGISTRY.add_collector(_collect_background_queue)
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,242 @@
+"""
+Minimal OpenTelemetry-compatible tracing with an in-process ring-buffer exporter
+"""
+import contextvars
+import functools
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Any, Optional
+from ..config import Config
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+def _new_trace_id() -> str:
+    return os.urandom(16).hex()
+
+
+def _new_span_id() -> str:
+    return os.urandom(8).hex()
+
+
+class Span:
+    """A timed operation; field names follow the OTLP JSON span layout"""
+    __slots__ = ("name", "trace_id", "span_id", "parent_span_id", "attributes",
+                 "start_ns", "end_ns", "status", "error", "_trace", "_token")
+
+    sampled = True
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str], trace: "_TraceBuffer"):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_span_id()
+        self.parent_span_id = parent_span_id
+        self.attributes: Dict[str, Any] = {}
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.status = "OK"
+        self.error: Optional[str] = None
+        self._trace = trace
+        self._token = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_exception(self, exc: BaseException):
+        self.status = "ERROR"
+        self.error = f"{type(exc).__name__}: {exc}"
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns or time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def __enter__(self) -> "Span":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.record_exception(exc)
+        self.end_ns = time.time_ns()
+        _current_span.reset(self._token)
+        self._trace.finish(self)
+        return False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round(self.duration_ms, 3),
+            "attributes": self.attributes,
+            "status": {"code": self.status, "message": self.error}
+        }
+
+
+class _NoopSpan:
+    """Stand-in for unsampled requests; children of a noop span are noops too"""
+    __slots__ = ("_token",)
+
+    sampled = False
+    trace_id = None
+    span_id = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def record_exception(self, exc: BaseException):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        return False
+
+
+class _TraceBuffer:
+    """Collects the spans of one trace until its local root span ends"""
+
+    def __init__(self, exporter: "RingBufferExporter"):
+        self.exporter = exporter
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+        self._lock = threading.Lock()
+
+    def finish(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+        if span is self.root:
+            # Serializing the trace is left to the background queue
+            from ..background import get_background_queue
+            get_background_queue().submit("trace_export", self.exporter.export, span, list(self.spans))
+
+
+class RingBufferExporter:
+    """Keeps the most recent completed traces in memory for /debug/traces"""
+
+    def __init__(self, max_traces: int = 200):
+        self._traces: deque = deque(maxlen=max_traces)
+        self._lock = threading.Lock()
+
+    def export(self, root: Span, spans: List[Span]):
+        trace = {
+            "trace_id": root.trace_id,
+            "name": root.name,
+            "start_time": root.start_ns,
+            "duration_ms": round(root.duration_ms, 3),
+            "status": root.status,
+            "spans": sorted((span.to_dict() for span in spans), key=lambda s: s["startTimeUnixNano"])
+        }
+        with self._lock:
+            self._traces.append(trace)
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            traces = list(self._traces)
+        return traces[::-1][:limit]
+
+    def slowest(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            traces = list(self._traces)
+        return sorted(traces, key=lambda t: t["duration_ms"], reverse=True)[:limit]
+
+    def get(self, trace_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for trace in self._traces:
+                if trace["trace_id"] == trace_id:
+                    return trace
+        return None
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+
+
+class Tracer:
+    def __init__(self, exporter: RingBufferExporter, sample_rate: float = 1.0):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+
+    def start_span(self, name: str, traceparent: str = None, **attributes):
+        """
+        Start a span as a child of the current span. Root spans make the
+        sampling decision; an incoming W3C `traceparent` header continues
+        the caller's trace.
+        """
+        parent = _current_span.get()
+        if parent is not None:
+            if not parent.sampled:
+                return _NoopSpan()
+            span = Span(name, parent.trace_id, parent.span_id, parent._trace)
+        else:
+            remote = parse_traceparent(traceparent) if traceparent else None
+            if remote is not None:
+                trace_id, parent_span_id, sampled = remote
+                if not sampled:
+                    return _NoopSpan()
+            elif self.sample_rate >= 1.0 or random.random() < self.sample_rate:
+                trace_id, parent_span_id = _new_trace_id(), None
+            else:
+                return _NoopSpan()
+            trace = _TraceBuffer(self.exporter)
+            span = Span(name, trace_id, parent_span_id, trace)
+            trace.root = span
+
+        if attributes:
+            span.attributes.update(attributes)
+        return span
+
+
+def parse_traceparent(header: str):
+    """Parse a W3C traceparent header into (trace_id, span_id, sampled)"""
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        flags = int(parts[3], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], bool(flags & 0x01)
+
+
+def current_span():
+    """The active span; a noop span outside any request, so callers can set attributes unconditionally"""
+    span = _current_span.get()
+    return span if span is not None else _NoopSpan()
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace id of the active span, or None when untraced or unsampled"""
+    span = _current_span.get()
+    return span.trace_id if span is not None else None
+
+
+def log_prefix() -> str:
+    """Prefix for log lines so they can be joined to a trace"""
+    trace_id = current_trace_id()
+    return f"[trace={trace_id}] " if trace_id else ""
+
+
+def traced(name: str):
+    """Decorator that wraps a function call in a span"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with TRACER.start_span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+EXPORTER = RingBufferExporter(max_traces=Config.TRACE_BUFFER_SIZE)
+TRACER = Tracer(EXPORTER, sample_rate=Config.TRACE_SAMPLE_RATE)
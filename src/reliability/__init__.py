@@ -0,0 +1,13 @@
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, get_breaker, breaker_states
+from .deadline import deadline_scope, remaining, timeout_for, budget_below
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "get_breaker",
+    "breaker_states",
+    "deadline_scope",
+    "remaining",
+    "timeout_for",
+    "budget_below",
+]
@@ -0,0 +1,197 @@
+"""
+Per-dependency circuit breakers with latency-based tripping
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Callable, Optional
+from ..config import Config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is attempted through an open breaker"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit '{name}' is open, retry in {retry_after:.1f}s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Closed -> open when too many recent calls failed or ran slower than
+    `slow_call_seconds`; open -> half-open after `reset_timeout`; a successful
+    probe closes the breaker again, a failed one re-opens it.
+    """
+
+    def __init__(self,
+                 name: str,
+                 failure_threshold: int = None,
+                 slow_call_seconds: float = None,
+                 slow_call_rate: float = None,
+                 window_size: int = None,
+                 reset_timeout: float = None,
+                 half_open_max_calls: int = 1):
+        self.name = name
+        self.failure_threshold = failure_threshold or Config.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+        self.slow_call_seconds = slow_call_seconds or Config.CIRCUIT_BREAKER_SLOW_CALL_SECONDS
+        self.slow_call_rate = slow_call_rate or Config.CIRCUIT_BREAKER_SLOW_CALL_RATE
+        self.window_size = window_size or Config.CIRCUIT_BREAKER_WINDOW_SIZE
+        self.reset_timeout = reset_timeout or Config.CIRCUIT_BREAKER_RESET_TIMEOUT
+        self.half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._consecutive_failures = 0
+        # Each entry is (failed, slow) for the most recent calls
+        self._window: deque = deque(maxlen=self.window_size)
+
+        self.total_calls = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == OPEN
+
+    def _current_state(self) -> str:
+        """Resolve open -> half-open once the reset timeout has elapsed (lock held)"""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._half_open_calls = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Return True if a call may go through to the dependency"""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            self.total_rejected += 1
+            return False
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker will let a probe through"""
+        with self._lock:
+            if self._current_state() != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def record_success(self, latency: float = 0.0):
+        """Record a completed call; slow calls count against the breaker"""
+        slow = latency >= self.slow_call_seconds
+        with self._lock:
+            self.total_calls += 1
+            self._consecutive_failures = 0
+            self._window.append((False, slow))
+            if self._state == HALF_OPEN:
+                if slow:
+                    self._trip()
+                else:
+                    self._reset()
+            elif self._state == CLOSED and self._slow_rate_exceeded():
+                self._trip()
+
+    def record_failure(self, latency: float = 0.0):
+        """Record a failed call"""
+        with self._lock:
+            self.total_calls += 1
+            self.total_failures += 1
+            self._consecutive_failures += 1
+            self._window.append((True, latency >= self.slow_call_seconds))
+            if self._state == HALF_OPEN:
+                self._trip()
+            elif self._state == CLOSED and (
+                self._consecutive_failures >= self.failure_threshold
+                or self._slow_rate_exceeded()
+            ):
+                self._trip()
+
+    def _slow_rate_exceeded(self) -> bool:
+        """Check the rolling window for too many slow or failed calls (lock held)"""
+        if len(self._window) < self.window_size // 2:
+            return False
+        bad = sum(1 for failed, slow in self._window if failed or slow)
+        return bad / len(self._window) >= self.slow_call_rate
+
+    def _trip(self):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._half_open_calls = 0
+        self.times_opened += 1
+        print(f"⚠️ Circuit '{self.name}' opened")
+
+    def _reset(self):
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._window.clear()
+        print(f"✅ Circuit '{self.name}' closed")
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Run func through the breaker, raising CircuitOpenError when open"""
+        if not self.allow_request():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure(time.perf_counter() - start)
+            raise
+        self.record_success(time.perf_counter() - start)
+        return result
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Export breaker state for health and metrics endpoints"""
+        with self._lock:
+            state = self._current_state()
+            bad = sum(1 for failed, slow in self._window if failed or slow)
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "window_bad_rate": round(bad / len(self._window), 3) if self._window else 0.0,
+                "total_calls": self.total_calls,
+                "total_failures": self.total_failures,
+                "total_rejected": self.total_rejected,
+                "times_opened": self.times_opened,
+                "retry_after": round(
+                    max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 2
+                ) if state == OPEN else 0.0
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_breaker(name: str, **kwargs) -> CircuitBreaker:
+    """Get or create the shared breaker for a dependency"""
+    with _registry_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, **kwargs)
+            _breakers[name] = breaker
+        return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Snapshot every registered breaker"""
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in breakers}
@@ -0,0 +1,52 @@
+"""
+Per-request latency budget. The API layer opens a deadline scope; every
+downstream call sizes its timeout from the time left and switches to a
+cheaper fallback when too little remains.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar("deadline", default=None)
+
+# Timeouts are never sized below this, so a call always gets a real attempt
+MIN_TIMEOUT = 0.05
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """Run the block with a deadline `seconds` from now; None or <= 0 means no deadline"""
+    if not seconds or seconds <= 0:
+        yield
+        return
+    expires = time.monotonic() + seconds
+    current = _deadline.get()
+    # A nested scope can only tighten the budget
+    token = _deadline.set(expires if current is None else min(current, expires))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current request, or None without a deadline"""
+    expires = _deadline.get()
+    if expires is None:
+        return None
+    return max(expires - time.monotonic(), 0.0)
+
+
+def timeout_for(default: float) -> float:
+    """A call's timeout: its default, capped by the time left"""
+    left = remaining()
+    if left is None:
+        return default
+    return max(min(default, left), MIN_TIMEOUT)
+
+
+def budget_below(seconds: float) -> bool:
+    """True when a deadline is set and less than `seconds` remain"""
+    left = remaining()
+    return left is not None and left < seconds
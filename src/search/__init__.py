@@ -1,3 +1,4 @@
 from .elastic_client import ElasticSearchClient
+from .transport import create_es_client, get_es_client, close_es_client, pool_stats
 
-__all__ = ["ElasticSearchClient"]
\ No newline at end of file
+__all__ = ["ElasticSearchClient", "create_es_client", "get_es_client", "close_es_client", "pool_stats"]
\ No newline at end of file
@@ -1,143 +1,455 @@
-from elasticsearch import Elasticsearch
 from typing import Dict, List, Any, Optional
 import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
 from ..config import Config
+from ..reliability import get_breaker, remaining, timeout_for, budget_below
+from ..monitoring import SEARCH_LATENCY, traced, current_span, log_prefix
+from .transport import get_es_client
 
 class ElasticSearchClient:
     def __init__(self):
-        self.client = self._create_client()
-
-    def _create_client(self) -> Elasticsearch:
-        """Create Elasticsearch client with cloud configuration"""
-        if Config.ELASTIC_CLOUD_ID and Config.ELASTIC_PASSWORD:
-            return Elasticsearch(
-                cloud_id=Config.ELASTIC_CLOUD_ID,
-                basic_auth=(Config.ELASTIC_USERNAME, Config.ELASTIC_PASSWORD)
-            )
-        elif Config.ELASTIC_API_KEY and Config.ELASTIC_ENDPOINT:
-            # Elastic Serverless configuration
-            return Elasticsearch(
-                hosts=[Config.ELASTIC_ENDPOINT],
-                api_key=Config.ELASTIC_API_KEY
-            )
-        elif Config.ELASTIC_API_KEY and Config.ELASTIC_CLOUD_ID:
-            # Elastic Cloud with API key
-            return Elasticsearch(
-                cloud_id=Config.ELASTIC_CLOUD_ID,
-                api_key=Config.ELASTIC_API_KEY
-            )
-        else:
-            # Local development fallback
-            return Elasticsearch(
-                [{"host": "localhost", "port": 9200}]
-            )
+        # The elasticsearch package is imported and the client built on first use
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._search_client = None
+        self._bulk_client = None
+        self.breaker = get_breaker("elasticsearch")
 
-    def create_knowledge_base_index(self):
-        """Create the knowledge base index with proper mappings"""
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    def _create_client(self):
+        """Use the process-wide client so all instances share one connection pool"""
+        return get_es_client()
+
+    @property
+    def search_client(self):
+        """Client with the search timeout, sharing the pooled transport"""
+        if self._search_client is None:
+            self._search_client = self.client.options(request_timeout=Config.ELASTIC_SEARCH_TIMEOUT)
+        return self._search_client
+
+    def _budgeted_search_client(self):
+        """Search client whose timeout fits the request's remaining budget"""
+        if remaining() is None:
+            return self.search_client
+        # No retries when another full attempt would not fit
+        retries = 0 if budget_below(2 * Config.ELASTIC_SEARCH_TIMEOUT) else Config.ELASTIC_MAX_RETRIES
+        return self.search_client.options(request_timeout=timeout_for(Config.ELASTIC_SEARCH_TIMEOUT),
+                                          max_retries=retries)
+
+    @property
+    def bulk_client(self):
+        """Client with the longer bulk indexing timeout"""
+        if self._bulk_client is None:
+            self._bulk_client = self.client.options(request_timeout=Config.ELASTIC_BULK_TIMEOUT)
+        return self._bulk_client
+
+    def _vector_mapping(self) -> Dict[str, Any]:
+        """dense_vector mapping with the configured HNSW and quantization options"""
         mapping = {
-            "mappings": {
-                "properties": {
-                    "title": {"type": "text", "analyzer": "standard"},
-                    "content": {"type": "text", "analyzer": "standard"},
-                    "category": {"type": "keyword"},
-                    "tags": {"type": "keyword"},
-                    "last_updated": {"type": "date"},
-                    "confidence_score": {"type": "float"},
-                    "content_embedding": {
-                        "type": "dense_vector",
-                        "dims": 768,
-                        "index": True,
-                        "similarity": "cosine"
-                    }
-                }
-            }
+            "type": "dense_vector",
+            "dims": 768,
+            "index": True,
+            "similarity": "cosine"
         }
+        index_options = {"type": Config.INDEX_VECTOR_TYPE}
+        if Config.INDEX_VECTOR_TYPE.endswith("hnsw"):
+            index_options["m"] = Config.INDEX_HNSW_M
+            index_options["ef_construction"] = Config.INDEX_HNSW_EF_CONSTRUCTION
+        mapping["index_options"] = index_options
+        return mapping
+
+    def _index_settings(self) -> Dict[str, Any]:
+        """Shard and replica counts, when configured (Serverless manages its own)"""
+        settings = {}
+        if Config.INDEX_SHARDS is not None:
+            settings["number_of_shards"] = Config.INDEX_SHARDS
+        if Config.INDEX_REPLICAS is not None:
+            settings["number_of_replicas"] = Config.INDEX_REPLICAS
+        return settings
+
+    def _create_index(self, index: str, properties: Dict[str, Any]):
+        """Create an index with the given field mappings"""
+        body = {"mappings": {"properties": properties}}
+        settings = self._index_settings()
+        if settings:
+            body["settings"] = {"index": settings}
 
         try:
-            self.client.indices.create(
-                index=Config.KNOWLEDGE_BASE_INDEX,
-                body=mapping
-            )
-            print(f"Created index: {Config.KNOWLEDGE_BASE_INDEX}")
+            self.client.indices.create(index=index, body=body)
+            print(f"Created index: {index}")
         except Exception as e:
-            print(f"Index might already exist: {e}")
+            if "resource_already_exists_exception" in str(getattr(e, "error", "")) + str(e):
+                print(f"Index already exists: {index}")
+                return
+            # e.g. an int8 vector type on Elasticsearch older than 8.12
+            print(f"Failed to create index {index}: {e}")
+            raise RuntimeError(f"Could not create index {index}: {e}") from e
+
+    def create_knowledge_base_index(self, index: str = None):
+        """Create the knowledge base index with proper mappings"""
+        self._create_index(index or Config.KNOWLEDGE_BASE_INDEX, {
+            "title": {"type": "text", "analyzer": "standard"},
+            "content": {"type": "text", "analyzer": "standard"},
+            "category": {"type": "keyword"},
+            "tags": {"type": "keyword"},
+            "last_updated": {"type": "date"},
+            "confidence_score": {"type": "float"},
+            "content_hash": {"type": "keyword"},
+            "content_embedding": self._vector_mapping()
+        })
 
-    def create_support_tickets_index(self):
+    def create_support_tickets_index(self, index: str = None):
         """Create the support tickets index"""
-        mapping = {
-            "mappings": {
-                "properties": {
-                    "ticket_id": {"type": "keyword"},
-                    "problem": {"type": "text", "analyzer": "standard"},
-                    "solution": {"type": "text", "analyzer": "standard"},
-                    "category": {"type": "keyword"},
-                    "priority": {"type": "keyword"},
-                    "resolution_time": {"type": "integer"},
-                    "satisfaction_score": {"type": "float"},
-                    "created_date": {"type": "date"},
-                    "problem_embedding": {
-                        "type": "dense_vector",
-                        "dims": 768,
-                        "index": True,
-                        "similarity": "cosine"
-                    }
+        self._create_index(index or Config.SUPPORT_TICKETS_INDEX, {
+            "ticket_id": {"type": "keyword"},
+            "problem": {"type": "text", "analyzer": "standard"},
+            "solution": {"type": "text", "analyzer": "standard"},
+            "category": {"type": "keyword"},
+            "priority": {"type": "keyword"},
+            "resolution_time": {"type": "integer"},
+            "satisfaction_score": {"type": "float"},
+            "created_date": {"type": "date"},
+            "content_hash": {"type": "keyword"},
+            "problem_embedding": self._vector_mapping()
+        })
+
+    def create_knowledge_base_chunks_index(self, index: str = None):
+        """Create the passage index; each chunk points back to its article via parent_id"""
+        self._create_index(index or Config.KNOWLEDGE_BASE_CHUNKS_INDEX, {
+            "parent_id": {"type": "keyword"},
+            "chunk_index": {"type": "integer"},
+            "title": {"type": "text", "analyzer": "standard"},
+            "content": {"type": "text", "analyzer": "standard"},
+            "category": {"type": "keyword"},
+            "tags": {"type": "keyword"},
+            "confidence_score": {"type": "float"},
+            "content_hash": {"type": "keyword"},
+            "content_embedding": self._vector_mapping()
+        })
+
+    def versioned_index(self, alias: str) -> str:
+        """New physical index name for an alias, e.g. cloudflow_knowledge_base-20250101120000"""
+        return f"{alias}-{datetime.utcnow():%Y%m%d%H%M%S}"
+
+    def alias_indices(self, alias: str) -> List[str]:
+        """Physical indices an alias currently points to"""
+        if not self.client.indices.exists_alias(name=alias):
+            return []
+        return sorted(self.client.indices.get_alias(name=alias).keys())
+
+    def swap_aliases(self, targets: Dict[str, str]):
+        """
+        Point each alias at its new index in one atomic update. A concrete
+        index still using an alias name (from before aliases) is dropped in
+        the same update.
+        """
+        actions = []
+        for alias, index in targets.items():
+            current = self.alias_indices(alias)
+            if current:
+                actions.extend({"remove": {"index": old, "alias": alias}} for old in current if old != index)
+            elif self.client.indices.exists(index=alias):
+                actions.append({"remove_index": {"index": alias}})
+            actions.append({"add": {"index": index, "alias": alias, "is_write_index": True}})
+        self.client.indices.update_aliases(actions=actions)
+        for alias, index in targets.items():
+            print(f"Alias {alias} -> {index}")
+
+    def prune_versions(self, alias: str, keep: int = None) -> List[str]:
+        """Delete old versions of an alias's index, keeping the newest few for rollback"""
+        keep = Config.INDEX_KEEP_VERSIONS if keep is None else keep
+        prefix = f"{alias}-"
+        versions = sorted(
+            name for name in self.client.indices.get(index=f"{prefix}*").keys()
+            if name[len(prefix):].isdigit()
+        )
+        live = set(self.alias_indices(alias))
+        previous = [name for name in versions if name not in live]
+        stale = previous[:max(len(previous) - keep, 0)]
+        for name in stale:
+            self.client.indices.delete(index=name)
+            print(f"Deleted old index: {name}")
+        return stale
+
+    def count(self, index: str) -> int:
+        return self.client.count(index=index)["count"]
+
+    @contextmanager
+    def bulk_loading(self, indices: List[str], force_merge: bool = None):
+        """
+        Disable refresh and replicas on the indices while bulk loading, then
+        restore them, refresh once and optionally force-merge to one segment.
+        Settings the cluster rejects (e.g. on Serverless) are skipped.
+        """
+        force_merge = Config.BULK_FORCE_MERGE if force_merge is None else force_merge
+        previous = {}
+        for index in indices:
+            try:
+                settings = self.client.indices.get_settings(index=index, flat_settings=True)
+                current = settings[index]["settings"]
+                previous[index] = {
+                    "refresh_interval": current.get("index.refresh_interval"),
+                    "number_of_replicas": current.get("index.number_of_replicas")
                 }
-            }
-        }
+                self.client.indices.put_settings(
+                    index=index,
+                    settings={"index": {"refresh_interval": "-1", "number_of_replicas": 0}}
+                )
+            except Exception as e:
+                print(f"Keeping live settings on {index} during load: {e}")
 
+        start = time.perf_counter()
         try:
-            self.client.indices.create(
-                index=Config.SUPPORT_TICKETS_INDEX,
-                body=mapping
-            )
-            print(f"Created index: {Config.SUPPORT_TICKETS_INDEX}")
-        except Exception as e:
-            print(f"Index might already exist: {e}")
+            yield
+        finally:
+            for index, settings in previous.items():
+                try:
+                    # None resets a setting to the cluster default
+                    self.client.indices.put_settings(index=index, settings={"index": settings})
+                except Exception as e:
+                    print(f"Could not restore settings on {index}: {e}")
+            try:
+                self.bulk_client.indices.refresh(index=",".join(indices))
+                if force_merge:
+                    self.bulk_client.indices.forcemerge(index=",".join(indices), max_num_segments=1)
+            except Exception as e:
+                print(f"Post-load refresh/force merge failed: {e}")
+            print(f"Bulk load of {len(indices)} indices finished in {time.perf_counter() - start:.1f}s")
 
-    def hybrid_search(self,
-                     query: str,
-                     query_embedding: List[float],
-                     index: str,
-                     size: int = 5) -> Dict[str, Any]:
-        """Perform hybrid search combining keyword and semantic search"""
+    def vector_field(self, index: str) -> str:
+        """Name of the dense_vector field for an index"""
+        if index == Config.SUPPORT_TICKETS_INDEX:
+            return "problem_embedding"
+        return "content_embedding"
+
+    def build_search_body(self,
+                          query: str,
+                          query_embedding: List[float],
+                          index: str,
+                          size: int = 5,
+                          title_boost: float = None,
+                          keyword_boost: float = None,
+                          vector_boost: float = None,
+                          vector_mode: str = None,
+                          num_candidates: int = None,
+                          collapse_field: str = None,
+                          filter_categories: List[str] = None,
+                          boost_categories: List[str] = None) -> Dict[str, Any]:
+        """
+        Build the hybrid search request. vector_mode is "script_score" (exact
+        brute-force cosine), "knn" (approximate HNSW) or "none" (keyword only).
+        collapse_field keeps only the best hit per value, e.g. one passage per
+        parent article. filter_categories restricts both legs to those
+        categories (the kNN leg pre-filters its HNSW candidates);
+        boost_categories only ranks them higher.
+        """
+        title_boost = Config.SEARCH_TITLE_BOOST if title_boost is None else title_boost
+        keyword_boost = Config.SEARCH_KEYWORD_BOOST if keyword_boost is None else keyword_boost
+        vector_boost = Config.SEARCH_VECTOR_BOOST if vector_boost is None else vector_boost
+        vector_mode = vector_mode or Config.SEARCH_VECTOR_MODE
+        num_candidates = num_candidates or Config.SEARCH_NUM_CANDIDATES
+        vector_field = self.vector_field(index)
+
+        # Keyword search
+        keyword_query = {
+            "multi_match": {
+                "query": query,
+                "fields": [f"title^{title_boost:g}", "content", "problem", "solution"],
+                "type": "best_fields",
+                "boost": keyword_boost
+            }
+        }
 
         search_body = {
             "size": size,
-            "query": {
+            "_source": ["title", "content", "category", "confidence_score", "problem", "solution",
+                        "parent_id", "chunk_index", "content_hash"]
+        }
+        if collapse_field:
+            search_body["collapse"] = {"field": collapse_field}
+
+        category_filter = {"terms": {"category": filter_categories}} if filter_categories else None
+        category_boost = {
+            "terms": {"category": boost_categories, "boost": Config.SEARCH_CATEGORY_BOOST}
+        } if boost_categories else None
+
+        if vector_mode == "knn":
+            # Approximate kNN runs alongside the keyword query and scores are summed
+            search_body["query"] = self._with_categories(keyword_query, category_filter, category_boost)
+            search_body["knn"] = {
+                "field": vector_field,
+                "query_vector": query_embedding,
+                "k": size,
+                "num_candidates": max(num_candidates, size),
+                "boost": vector_boost
+            }
+            if category_filter:
+                search_body["knn"]["filter"] = category_filter
+        elif vector_mode == "script_score":
+            search_body["query"] = {
                 "bool": {
                     "should": [
-                        # Keyword search
-                        {
-                            "multi_match": {
-                                "query": query,
-                                "fields": ["title^2", "content", "problem", "solution"],
-                                "type": "best_fields",
-                                "boost": 1.0
-                            }
-                        },
-                        # Semantic search
+                        keyword_query,
+                        # Semantic search, scripted only over the filtered documents
                         {
                             "script_score": {
-                                "query": {"match_all": {}},
+                                "query": {"bool": {"filter": category_filter}} if category_filter else {"match_all": {}},
                                 "script": {
-                                    "source": "cosineSimilarity(params.query_vector, 'content_embedding') + 1.0",
+                                    "source": f"cosineSimilarity(params.query_vector, '{vector_field}') + 1.0",
                                     "params": {"query_vector": query_embedding}
                                 },
-                                "boost": 1.5
+                                "boost": vector_boost
                             }
                         }
                     ]
                 }
-            },
-            "_source": ["title", "content", "category", "confidence_score", "problem", "solution"]
-        }
+            }
+            if category_filter:
+                search_body["query"]["bool"]["filter"] = category_filter
+            if category_boost:
+                search_body["query"]["bool"]["should"].append(category_boost)
+        else:
+            search_body["query"] = self._with_categories(keyword_query, category_filter, category_boost)
+
+        return search_body
+
+    def _with_categories(self,
+                         query: Dict[str, Any],
+                         category_filter: Dict[str, Any] = None,
+                         category_boost: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Wrap a keyword query with an optional category filter and boost"""
+        if not category_filter and not category_boost:
+            return query
+        wrapped = {"bool": {"must": [query]}}
+        if category_filter:
+            wrapped["bool"]["filter"] = category_filter
+        if category_boost:
+            wrapped["bool"]["should"] = [category_boost]
+        return wrapped
+
+    @traced("ElasticSearchClient.hybrid_search")
+    def hybrid_search(self,
+                     query: str,
+                     query_embedding: List[float],
+                     index: str,
+                     size: int = 5,
+                     **options) -> Dict[str, Any]:
+        """
+        Perform hybrid search combining keyword and semantic search.
+        Extra options (boosts, vector_mode, num_candidates) are passed to
+        build_search_body.
+        """
+        span = current_span()
+        span.set_attribute("index", index)
+        span.set_attribute("size", size)
+
+        search_body = self.build_search_body(query, query_embedding, index, size, **options)
 
+        # Skip the round trip entirely while the cluster is known to be unhealthy
+        if not self.breaker.allow_request():
+            span.set_attribute("circuit_open", True)
+            return {"hits": {"hits": []}, "degraded": True}
+
+        start = time.perf_counter()
         try:
-            response = self.client.search(index=index, body=search_body)
+            response = self._budgeted_search_client().search(index=index, body=search_body)
+            elapsed = time.perf_counter() - start
+            self.breaker.record_success(elapsed)
+            SEARCH_LATENCY.observe(elapsed, index=index)
+            span.set_attribute("hits", len(response["hits"]["hits"]))
             return response
         except Exception as e:
-            print(f"Search error: {e}")
-            return {"hits": {"hits": []}}
+            elapsed = time.perf_counter() - start
+            self.breaker.record_failure(elapsed)
+            SEARCH_LATENCY.observe(elapsed, index=index)
+            span.record_exception(e)
+            print(f"{log_prefix()}Search error: {e}")
+            return {"hits": {"hits": []}, "degraded": True}
+
+    @traced("ElasticSearchClient.multi_search")
+    def multi_search(self, searches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run many hybrid searches in one _msearch round trip. Each entry holds
+        hybrid_search keyword arguments (query, query_embedding, index, size
+        and options); responses come back in the same order, with failed
+        searches marked degraded.
+        """
+        span = current_span()
+        span.set_attribute("searches", len(searches))
+        if not searches:
+            return []
+
+        # Skip the round trip entirely while the cluster is known to be unhealthy
+        if not self.breaker.allow_request():
+            span.set_attribute("circuit_open", True)
+            return [{"hits": {"hits": []}, "degraded": True} for _ in searches]
+
+        lines = []
+        for search in searches:
+            options = dict(search)
+            query = options.pop("query")
+            query_embedding = options.pop("query_embedding")
+            index = options.pop("index")
+            size = options.pop("size", 5)
+            lines.append({"index": index})
+            lines.append(self.build_search_body(query, query_embedding, index, size, **options))
+
+        start = time.perf_counter()
+        try:
+            response = self._budgeted_search_client().msearch(searches=lines)
+            elapsed = time.perf_counter() - start
+            self.breaker.record_success(elapsed)
+            SEARCH_LATENCY.observe(elapsed, index="_msearch")
+        except Exception as e:
+            elapsed = time.perf_counter() - start
+            self.breaker.record_failure(elapsed)
+            SEARCH_LATENCY.observe(elapsed, index="_msearch")
+            span.record_exception(e)
+            print(f"{log_prefix()}Multi-search error: {e}")
+            return [{"hits": {"hits": []}, "degraded": True} for _ in searches]
+
+        results = []
+        for item in response["responses"]:
+            if "error" in item:
+                print(f"{log_prefix()}Multi-search item error: {item['error']}")
+                results.append({"hits": {"hits": []}, "degraded": True})
+            else:
+                results.append(item)
+        return results
+
+    def get_content_hashes(self, index: str, ids: List[str]) -> Dict[str, str]:
+        """Fetch the content_hash of each document, for change detection"""
+        if not ids:
+            return {}
+        response = self.client.mget(index=index, ids=ids, source=["content_hash"])
+        return {
+            doc["_id"]: doc.get("_source", {}).get("content_hash")
+            for doc in response["docs"]
+            if doc.get("found")
+        }
+
+    def list_titles(self, index: str, size: int = 10000) -> List[Dict[str, Any]]:
+        """Id, title and category of every document that has a title"""
+        response = self.search_client.search(
+            index=index,
+            query={"exists": {"field": "title"}},
+            source=["title", "category"],
+            size=size
+        )
+        return [
+            {"id": hit["_id"], "title": hit["_source"]["title"], "category": hit["_source"].get("category")}
+            for hit in response["hits"]["hits"]
+        ]
 
     def index_document(self, index: str, doc_id: str, document: Dict[str, Any]):
         """Index a single document"""
@@ -147,8 +459,8 @@ class ElasticSearchClient:
         except Exception as e:
             print(f"Error indexing document: {e}")
 
-    def bulk_index(self, index: str, documents: List[Dict[str, Any]]):
-        """Bulk index multiple documents"""
+    def bulk_index(self, index: str, documents: List[Dict[str, Any]]) -> int:
+        """Bulk index multiple documents, returning how many were indexed"""
         actions = []
         for i, doc in enumerate(documents):
             actions.append({
@@ -159,7 +471,9 @@ class ElasticSearchClient:
 
         try:
             from elasticsearch.helpers import bulk
-            bulk(self.client, actions)
-            print(f"Bulk indexed {len(documents)} documents to {index}")
+            indexed, _ = bulk(self.bulk_client, actions, chunk_size=Config.BULK_CHUNK_SIZE)
+            print(f"Bulk indexed {indexed} documents to {index}")
+            return indexed
         except Exception as e:
-            print(f"Bulk index error: {e}")
\ No newline at end of file
+            print(f"Bulk index error: {e}")
+            return 0
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Shared, tuned Elasticsearch client. Every ElasticSearchClient in a process
+uses the same connection pool, with gzip request bodies, retries on
+timeouts and optional node sniffing for self-managed clusters.
+"""
+import threading
+from typing import Dict, List, Any
+from ..config import Config
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _connection_options() -> Dict[str, Any]:
+    """Where to connect and how to authenticate"""
+    if Config.ELASTIC_CLOUD_ID and Config.ELASTIC_PASSWORD:
+        return {
+            "cloud_id": Config.ELASTIC_CLOUD_ID,
+            "basic_auth": (Config.ELASTIC_USERNAME, Config.ELASTIC_PASSWORD)
+        }
+    elif Config.ELASTIC_API_KEY and Config.ELASTIC_ENDPOINT:
+        # Elastic Serverless configuration
+        return {"hosts": [Config.ELASTIC_ENDPOINT], "api_key": Config.ELASTIC_API_KEY}
+    elif Config.ELASTIC_API_KEY and Config.ELASTIC_CLOUD_ID:
+        # Elastic Cloud with API key
+        return {"cloud_id": Config.ELASTIC_CLOUD_ID, "api_key": Config.ELASTIC_API_KEY}
+    else:
+        # Local development fallback
+        return {"hosts": ["http://localhost:9200"]}
+
+
+def create_es_client():
+    """Build a client with the configured pool size, compression, timeouts and retries"""
+    from elasticsearch import Elasticsearch
+
+    options = _connection_options()
+    options.update(
+        connections_per_node=Config.ELASTIC_POOL_SIZE,
+        http_compress=Config.ELASTIC_HTTP_COMPRESS,
+        request_timeout=Config.ELASTIC_REQUEST_TIMEOUT,
+        max_retries=Config.ELASTIC_MAX_RETRIES,
+        retry_on_timeout=Config.ELASTIC_RETRY_ON_TIMEOUT
+    )
+    # Cloud and Serverless sit behind a proxy, so sniffing only applies to host lists
+    if Config.ELASTIC_SNIFF and "hosts" in options:
+        options.update(
+            sniff_on_start=True,
+            sniff_on_node_failure=True,
+            min_delay_between_sniffing=Config.ELASTIC_SNIFF_INTERVAL
+        )
+    return Elasticsearch(**options)
+
+
+def get_es_client():
+    """The process-wide client, created on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = create_es_client()
+    return _client
+
+
+def close_es_client():
+    """Close the shared client's connections, e.g. on worker shutdown"""
+    global _client
+    with _client_lock:
+        client, _client = _client, None
+    if client is not None:
+        client.close()
+
+
+def pool_stats() -> List[Dict[str, Any]]:
+    """Connections in use and idle per node; empty until the client exists"""
+    client = _client
+    if client is None:
+        return []
+
+    stats = []
+    for node in client.transport.node_pool.all():
+        pool = getattr(node, "pool", None)
+        if pool is None or not hasattr(pool, "pool"):
+            continue
+        # urllib3 keeps maxsize slots; checked-out connections leave the queue
+        queue = pool.pool
+        if queue is None:
+            continue
+        maxsize = queue.maxsize
+        in_use = maxsize - queue.qsize()
+        idle = sum(1 for connection in list(queue.queue) if connection is not None)
+        stats.append({
+            "node": node.base_url,
+            "in_use": in_use,
+            "idle": idle,
+            "max": maxsize
+        })
+    return stats
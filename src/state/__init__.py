@@ -0,0 +1,3 @@
+from .backends import StateBackend, MemoryBackend, SqliteBackend, RedisBackend, create_state_backend
+
+__all__ = ["StateBackend", "MemoryBackend", "SqliteBackend", "RedisBackend", "create_state_backend"]
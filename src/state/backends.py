@@ -0,0 +1,282 @@
+"""
+Pluggable storage for conversation history and shared caches, so several
+API workers can serve the same sessions
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+from ..config import Config
+
+
+class StateBackend:
+    """Interface shared by every backend"""
+    name = "base"
+
+    def append_turn(self, session_id: str, entry: Dict[str, Any]):
+        raise NotImplementedError
+
+    def append_turns(self, turns: List[Tuple[str, Dict[str, Any]]]):
+        """Append several (session_id, entry) turns, in order"""
+        for session_id, entry in turns:
+            self.append_turn(session_id, entry)
+
+    def get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def get_recent(self, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        """The last `limit` turns of a session, oldest first"""
+        return self.get_history(session_id)[-limit:] if limit > 0 else []
+
+    def iter_histories(self) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """Yield (session_id, turns) for every session"""
+        raise NotImplementedError
+
+    def session_count(self) -> int:
+        raise NotImplementedError
+
+    def cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def cache_set(self, key: str, value: Dict[str, Any], ttl: float):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class MemoryBackend(StateBackend):
+    """Process-local dictionaries; state is lost on restart and not shared between workers"""
+    name = "memory"
+
+    def __init__(self, cache_size: int = None):
+        self.sessions: Dict[str, List[Dict[str, Any]]] = {}
+        # Least recently used first; bounded so per-session records cannot grow without limit
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.cache_size = cache_size or Config.STATE_MEMORY_CACHE_SIZE
+        self._lock = threading.Lock()
+
+    def append_turn(self, session_id: str, entry: Dict[str, Any]):
+        with self._lock:
+            self.sessions.setdefault(session_id, []).append(entry)
+
+    def get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        return list(self.sessions.get(session_id, []))
+
+    def get_recent(self, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        return self.sessions.get(session_id, [])[-limit:] if limit > 0 else []
+
+    def iter_histories(self):
+        with self._lock:
+            items = [(session_id, list(turns)) for session_id, turns in self.sessions.items()]
+        return iter(items)
+
+    def session_count(self) -> int:
+        return len(self.sessions)
+
+    def cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry[1]
+
+    def cache_set(self, key: str, value: Dict[str, Any], ttl: float):
+        with self._lock:
+            self._cache[key] = (time.time() + ttl, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+
+class SqliteBackend(StateBackend):
+    """SQLite in WAL mode; shared by all workers on one host"""
+    name = "sqlite"
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.STATE_SQLITE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        # Every thread's connection, so close() can reach those of worker and queue threads
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._generation = 0
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS turns (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                entry TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS turns_session ON turns(session_id, seq);
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires REAL NOT NULL
+            );
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        """One connection per thread; WAL lets readers run alongside a writer"""
+        conn = getattr(self._local, "conn", None)
+        # A connection from before close() is stale; the thread opens a new one
+        if conn is None or self._local.generation != self._generation:
+            # Only its own thread uses it, but close() runs on another
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._connections_lock:
+                self._connections.append(conn)
+                self._local.generation = self._generation
+            self._local.conn = conn
+        return conn
+
+    def append_turn(self, session_id: str, entry: Dict[str, Any]):
+        self._conn().execute(
+            "INSERT INTO turns (session_id, entry) VALUES (?, ?)",
+            (session_id, json.dumps(entry, default=str))
+        )
+
+    def append_turns(self, turns: List[Tuple[str, Dict[str, Any]]]):
+        # One transaction, so a batch costs a single WAL commit
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT INTO turns (session_id, entry) VALUES (?, ?)",
+                [(session_id, json.dumps(entry, default=str)) for session_id, entry in turns]
+            )
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            "SELECT entry FROM turns WHERE session_id = ? ORDER BY seq", (session_id,)
+        ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_recent(self, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        if limit <= 0:
+            return []
+        rows = self._conn().execute(
+            "SELECT entry FROM turns WHERE session_id = ? ORDER BY seq DESC LIMIT ?", (session_id, limit)
+        ).fetchall()
+        return [json.loads(row[0]) for row in reversed(rows)]
+
+    def iter_histories(self):
+        rows = self._conn().execute("SELECT session_id, entry FROM turns ORDER BY session_id, seq")
+        current_id, turns = None, []
+        for session_id, entry in rows:
+            if session_id != current_id and current_id is not None:
+                yield current_id, turns
+                turns = []
+            current_id = session_id
+            turns.append(json.loads(entry))
+        if current_id is not None:
+            yield current_id, turns
+
+    def session_count(self) -> int:
+        return self._conn().execute("SELECT COUNT(DISTINCT session_id) FROM turns").fetchone()[0]
+
+    def cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires >= ?", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def cache_set(self, key: str, value: Dict[str, Any], ttl: float):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+            (key, json.dumps(value, default=str), time.time() + ttl)
+        )
+
+    def close(self):
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Error closing SQLite connection: {e}")
+
+
+class RedisBackend(StateBackend):
+    """Redis; shared across hosts. Requires `pip install redis`."""
+    name = "redis"
+
+    def __init__(self, url: str = None, prefix: str = "support_agent"):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("STATE_BACKEND=redis requires the redis package: pip install redis")
+        self.client = redis.Redis.from_url(url or Config.REDIS_URL)
+        self.prefix = prefix
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix,) + parts)
+
+    def append_turn(self, session_id: str, entry: Dict[str, Any]):
+        pipe = self.client.pipeline()
+        pipe.rpush(self._key("session", session_id), json.dumps(entry, default=str))
+        pipe.sadd(self._key("sessions"), session_id)
+        pipe.execute()
+
+    def append_turns(self, turns: List[Tuple[str, Dict[str, Any]]]):
+        pipe = self.client.pipeline()
+        for session_id, entry in turns:
+            pipe.rpush(self._key("session", session_id), json.dumps(entry, default=str))
+            pipe.sadd(self._key("sessions"), session_id)
+        pipe.execute()
+
+    def get_history(self, session_id: str) -> List[Dict[str, Any]]:
+        return [json.loads(item) for item in self.client.lrange(self._key("session", session_id), 0, -1)]
+
+    def get_recent(self, session_id: str, limit: int) -> List[Dict[str, Any]]:
+        if limit <= 0:
+            return []
+        return [json.loads(item) for item in self.client.lrange(self._key("session", session_id), -limit, -1)]
+
+    def iter_histories(self):
+        for raw_id in self.client.sscan_iter(self._key("sessions")):
+            session_id = raw_id.decode() if isinstance(raw_id, bytes) else raw_id
+            yield session_id, self.get_history(session_id)
+
+    def session_count(self) -> int:
+        return self.client.scard(self._key("sessions"))
+
+    def cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.client.get(self._key("cache", key))
+        return json.loads(value) if value else None
+
+    def cache_set(self, key: str, value: Dict[str, Any], ttl: float):
+        self.client.set(self._key("cache", key), json.dumps(value, default=str), ex=max(1, int(ttl)))
+
+    def close(self):
+        self.client.close()
+
+
+BACKENDS = {
+    "memory": MemoryBackend,
+    "sqlite": SqliteBackend,
+    "redis": RedisBackend,
+}
+
+
+def create_state_backend(name: str = None) -> StateBackend:
+    """Build the backend selected by STATE_BACKEND"""
+    name = (name or Config.STATE_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown STATE_BACKEND '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name]()
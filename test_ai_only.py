@@ -6,13 +6,13 @@ import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.ai import GeminiClient
+from src.ai import LLMClient
 
 def test_ai_components():
     print("Testing Google Cloud AI components...")
 
     try:
-        ai_client = GeminiClient()
+        ai_client = LLMClient()
         print("✅ Vertex AI client initialized successfully!")
 
         # Test intent analysis
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Check the benchmark's nearest-rank percentiles against known values
+"""
+import sys
+
+from src.benchmark.runner import percentile
+
+
+def test_percentile():
+    print("Checking nearest-rank percentiles...")
+
+    hundred = list(range(1, 101))
+    assert percentile(hundred, 50) == 50
+    assert percentile(hundred, 95) == 95
+    assert percentile(hundred, 99) == 99
+    assert percentile(hundred, 100) == 100
+    assert percentile(hundred, 7) == 7
+
+    ten = list(range(10, 0, -1))
+    assert percentile(ten, 50) == 5
+    assert percentile(ten, 95) == 10
+    assert percentile(ten, 0) == 1
+    assert percentile([42.0], 99) == 42.0
+    assert percentile([], 50) == 0.0
+
+    print("✅ Percentiles match nearest rank")
+
+
+if __name__ == "__main__":
+    try:
+        test_percentile()
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
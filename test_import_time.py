@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Check that CLI entry points import quickly and without the web stack or SDKs
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Modules loaded by `main.py setup`, `main.py test` and a worker building its agent
+CLI_MODULES = ["main", "src.data", "src.api", "src.api.support_agent"]
+
+# Packages that must only be imported when actually used
+HEAVY_PACKAGES = ["fastapi", "starlette", "uvicorn", "elasticsearch", "vertexai", "google.cloud.aiplatform"]
+
+# Cumulative import budget per module, in milliseconds
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", 250))
+
+
+def measure_import(module: str):
+    """Import a module in a fresh interpreter with -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    loaded = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            loaded[name.strip()] = int(cumulative) / 1000
+    return loaded
+
+
+def test_import_time():
+    print("Measuring import time of CLI entry points...")
+
+    for module in CLI_MODULES:
+        loaded = measure_import(module)
+        elapsed = loaded[module]
+        heavy = [package for package in HEAVY_PACKAGES if package in loaded]
+
+        print(f"   {module}: {elapsed:.1f} ms")
+        assert not heavy, f"{module} imports {', '.join(heavy)} eagerly"
+        assert elapsed < IMPORT_BUDGET_MS, f"{module} took {elapsed:.1f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)"
+
+    print("✅ All entry points within budget")
+
+
+if __name__ == "__main__":
+    try:
+        test_import_time()
+    except AssertionError as e:
+        print(f"❌ {e}")
+        sys.exit(1)